@@ -0,0 +1,156 @@
+"""Typed, memory-compact actions frame for prepare_actions_data.py.
+
+clean_frame() leaves every column as Python objects: a string per cell,
+a list per cell for the semicolon lists, ISO strings for dates. clean_typed()
+applies the same cleaners but keeps each column in the type given by
+COLUMN_KINDS (falling back to cleaning.COLUMN_TYPES):
+
+- category: low-cardinality text (workstream, work package name and goal,
+  status, ...) as pandas categoricals, i.e. small integer codes
+- date: Excel serials as datetime64 (NaT if missing), only formatted as
+  ISO 8601 strings on export
+- boolean: the nullable "boolean" dtype
+- list: an int32 list id per row into a ListColumn, which stores each
+  distinct list once as offset-encoded arrays
+- string: squished Python strings, as before
+
+ActionsFrame.to_json() turns rows back into the objects to_json() expects,
+one batch at a time, so actions.json is byte-identical to the object path.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from cleaning import CLEANERS, COLUMN_TYPES, excel_datetimes, split_list
+from instrument import span
+from stream_actions import write_records_json
+
+# Column -> kind where it differs from cleaning.COLUMN_TYPES
+COLUMN_KINDS = {
+    "report": "category",
+    "work_package_name": "category",
+    "work_package_goal": "category",
+    "public_action_status": "category",
+    "updates": "category",
+    "sub_action_details": "category",
+}
+
+EXPORT_BATCH_ROWS = 10_000
+
+
+class ListColumn:
+    """Distinct lists as offset-encoded arrays.
+
+    List i holds the items categories[codes[offsets[i]:offsets[i + 1]]]; a
+    frame column of list ids says which list each row has.
+    """
+
+    def __init__(self, offsets: np.ndarray, codes: np.ndarray, categories: np.ndarray):
+        self.offsets = offsets
+        self.codes = codes
+        self.categories = categories
+
+    @classmethod
+    def encode(cls, s: pd.Series) -> tuple[pd.Series, ListColumn]:
+        """Clean *s* like cleaning.split_list; return (list id per row, ListColumn)."""
+        ids, distinct = pd.factorize(s, use_na_sentinel=True)
+        # Missing values become the empty list, stored last
+        lists = [*split_list(pd.Series(distinct, dtype=object)), []]
+        ids = np.where(ids < 0, len(lists) - 1, ids).astype(np.int32)
+
+        lengths = np.fromiter((len(items) for items in lists), dtype=np.int64, count=len(lists))
+        offsets = np.zeros(len(lists) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+        flat = [item for items in lists for item in items]
+        codes, categories = pd.factorize(pd.Series(flat, dtype=object))
+        return pd.Series(ids, index=s.index, name=s.name), cls(
+            offsets, codes.astype(np.int32), np.asarray(categories, dtype=object)
+        )
+
+    def decode(self, ids: Iterable[int]) -> list[list]:
+        """A new list per row for the given list ids."""
+        items = self.categories[self.codes].tolist()
+        offsets = self.offsets.tolist()
+        return [items[offsets[i] : offsets[i + 1]] for i in ids]
+
+    def nunique(self) -> int:
+        """Distinct items over all lists (what explode().nunique() gives)."""
+        return len(self.categories)
+
+    @property
+    def nbytes(self) -> int:
+        return (
+            self.offsets.nbytes
+            + self.codes.nbytes
+            + int(pd.Series(self.categories, dtype=object).memory_usage(deep=True, index=False))
+        )
+
+
+class ActionsFrame:
+    """A typed actions frame: scalar columns in *df*, list columns as ids into *lists*."""
+
+    def __init__(self, df: pd.DataFrame, lists: dict[str, ListColumn]):
+        self.df = df
+        self.lists = lists
+
+    def __len__(self) -> int:
+        return len(self.df)
+
+    def memory_usage(self) -> int:
+        """Bytes held by the frame and the list storage (strings counted per reference)."""
+        return int(self.df.memory_usage(deep=True).sum()) + sum(col.nbytes for col in self.lists.values())
+
+    def object_frame(self, df: pd.DataFrame | None = None) -> pd.DataFrame:
+        """Rows of *df* (default: all) with the column values clean_frame() would give."""
+        df = self.df if df is None else df
+        out = {}
+        for col in df.columns:
+            s = df[col]
+            if col in self.lists:
+                out[col] = self.lists[col].decode(s.to_numpy())
+            elif isinstance(s.dtype, pd.DatetimeTZDtype) or pd.api.types.is_datetime64_any_dtype(s):
+                out[col] = s.dt.strftime("%Y-%m-%d").astype(object).where(s.notna(), None)
+            elif isinstance(s.dtype, (pd.CategoricalDtype, pd.BooleanDtype)):
+                out[col] = s.astype(object).where(s.notna(), None)
+            else:
+                out[col] = s
+        return pd.DataFrame(out, index=df.index)
+
+    def batches(self, rows: int = EXPORT_BATCH_ROWS) -> Iterator[pd.DataFrame]:
+        for start in range(0, len(self.df), rows):
+            yield self.object_frame(self.df.iloc[start : start + rows])
+
+    def to_json(self, path: Path, rows: int = EXPORT_BATCH_ROWS) -> int:
+        """Write the records like DataFrame.to_json(orient="records", indent=2)."""
+        return write_records_json(self.batches(rows), path)
+
+
+def clean_typed(df: pd.DataFrame, column_kinds: dict[str, str] | None = None) -> ActionsFrame:
+    """clean_frame() into typed columns (see module docstring)."""
+    kinds = {**COLUMN_TYPES, **COLUMN_KINDS} if column_kinds is None else column_kinds
+    df = df.reset_index(drop=True)
+    lists: dict[str, ListColumn] = {}
+    columns = {}
+    for col in df.columns:
+        kind = kinds.get(col)
+        if kind is None:
+            if df[col].dtype != "object":
+                columns[col] = df[col]
+                continue
+            kind = "string"
+        with span(f"clean:{kind}", values=len(df)):
+            if kind == "list":
+                columns[col], lists[col] = ListColumn.encode(df[col])
+            elif kind == "date":
+                columns[col] = excel_datetimes(df[col])
+            elif kind == "boolean":
+                columns[col] = CLEANERS["boolean"](df[col]).astype("boolean")
+            elif kind == "category":
+                columns[col] = CLEANERS["string"](df[col]).astype("category")
+            else:
+                columns[col] = CLEANERS[kind](df[col])
+    return ActionsFrame(pd.DataFrame(columns, index=df.index), lists)
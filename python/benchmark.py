@@ -0,0 +1,310 @@
+"""Synthetic-scale benchmarks for the data scripts.
+
+Generates inputs far larger than the real ones and times each script on
+them in a fresh process and working directory, recording wall time and peak
+memory (peak RSS) per stage:
+
+- prepare / prepare-stream: prepare_actions_data.py (in memory / --stream,
+  with --no-derived) on actions_raw.json scaled from the real export. Each
+  copy of the 90 real records gets its own work package and action numbers,
+  so the duplicate (subaction) ratio stays realistic.
+- bundle: bundle.py on actions.json scaled the same way from the published
+  one, so the derived files are timed on their own rather than inside
+  prepare.
+- extract / split: extract_pdf_tables.py and split_progress_pdf.py on a
+  generated progress PDF of N pages: one work package every
+  PAGES_PER_WP pages, each starting with a QUICK SUMMARY table.
+
+Results are compared with python/benchmark_baseline.json; the run fails
+(exit 1) if any stage is slower or larger than its baseline by more than the
+tolerance. Timings depend on the machine, so refresh the baseline with
+--update-baseline when the hardware changes, not to hide a regression.
+
+Usage:
+    python python/benchmark.py [--stages prepare,extract] [--rows 10000,100000]
+        [--pages 60,300] [--update-baseline]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import resource
+import runpy
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+PYTHON_DIR = Path(__file__).resolve().parent
+REPO_DIR = PYTHON_DIR.parent
+RAW_PATH = REPO_DIR / "data/input/actions_raw.json"
+ACTIONS_PATH = REPO_DIR / "public/data/actions.json"
+PROGRESS_PATH = REPO_DIR / "public/data/actions_progress.json"
+# Repository files the scripts read relative to the working directory
+CONFIG_FILES = (
+    "python/validation_rules.json",
+    "python/products_timeline_overrides.json",
+    "sql/schema/un80actions_schema.sql",
+)
+BASELINE_PATH = PYTHON_DIR / "benchmark_baseline.json"
+
+STAGES = {
+    # stage -> (script, arguments)
+    "prepare": ("prepare_actions_data.py", ["--no-validate", "--no-derived"]),
+    "prepare-stream": ("prepare_actions_data.py", ["--no-validate", "--no-derived", "--stream"]),
+    "bundle": ("bundle.py", []),
+    "extract": ("extract_pdf_tables.py", ["--no-cache"]),
+    "split": ("split_progress_pdf.py", []),
+}
+# Stages sized by --rows; the others by --pages
+ROW_STAGES = {"prepare", "prepare-stream", "bundle"}
+DEFAULT_ROWS = [10_000, 100_000]
+DEFAULT_PAGES = [60, 300]
+
+# Numbering of the generated copies of the real export
+WP_STRIDE = 100
+ACTION_STRIDE = 1_000
+
+PAGES_PER_WP = 3
+SUMMARY_ROWS = 3
+
+# A stage regresses if it exceeds its baseline by the tolerance plus this slack
+TIME_SLACK_SECONDS = 0.5
+MEMORY_SLACK_MB = 20.0
+
+
+def _offset(value, by: int):
+    """Shift a numeric export value ("14", 14, 14.0) by *by*, keeping other values."""
+    try:
+        return str(int(float(value)) + by)
+    except (TypeError, ValueError):
+        return value
+
+
+def generate_actions_raw(rows: int, path: Path, source: Path = RAW_PATH) -> None:
+    """Write *rows* records made of renumbered copies of the real export."""
+    records = json.loads(source.read_text(encoding="utf-8"))
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("[")
+        for i in range(rows):
+            copy, j = divmod(i, len(records))
+            record = dict(records[j])
+            if copy:
+                record["work_package_number"] = _offset(record["work_package_number"], WP_STRIDE * copy)
+                record["action_number"] = _offset(record["action_number"], ACTION_STRIDE * copy)
+            f.write(("," if i else "") + "\n  " + json.dumps(record, ensure_ascii=False))
+        f.write("\n]")
+
+
+def generate_actions_json(rows: int, path: Path, source: Path = ACTIONS_PATH) -> None:
+    """Write *rows* actions.json records made of renumbered copies of the published ones."""
+    records = json.loads(source.read_text(encoding="utf-8"))
+    copies = []
+    for i in range(rows):
+        copy, j = divmod(i, len(records))
+        record = dict(records[j])
+        record["work_package_number"] += WP_STRIDE * copy
+        record["action_number"] += ACTION_STRIDE * copy
+        copies.append(record)
+    path.write_text(json.dumps(copies, ensure_ascii=False), encoding="utf-8")
+
+
+def _summary_table(page, wp: int, top: float) -> None:
+    """Draw a ruled 4-column QUICK SUMMARY table like the real report's."""
+    import fitz
+
+    cols = [50, 200, 330, 460, 545]
+    row_height = 60
+    header = ["Action", "Pathway to decision", "Written products", "Intergovernmental consideration"]
+    rows = [header] + [
+        [
+            f"Action {wp * 10 + r}: Synthetic action {r} of work package {wp}",
+            "Work package leads → Secretary-General → General Assembly",
+            f"● Report {wp}.{r} (June) ● Note {wp}.{r}",
+            "General Assembly (eightieth session)",
+        ]
+        for r in range(1, SUMMARY_ROWS + 1)
+    ]
+    bottom = top + row_height * len(rows)
+    for x in cols:
+        page.draw_line((x, top), (x, bottom), width=0.5)
+    for r in range(len(rows) + 1):
+        y = top + r * row_height
+        page.draw_line((cols[0], y), (cols[-1], y), width=0.5)
+    for r, cells in enumerate(rows):
+        y = top + r * row_height
+        for c, text in enumerate(cells):
+            rect = fitz.Rect(cols[c] + 3, y + 3, cols[c + 1] - 3, y + row_height - 3)
+            # htmlbox falls back to a font with → and ● (the base 14 fonts have neither)
+            page.insert_htmlbox(rect, f'<p style="font-size:7px">{text}</p>')
+
+
+def generate_progress_pdf(pages: int, pdf_path: Path, json_path: Path) -> int:
+    """Write a progress PDF of *pages* pages and a matching actions_progress.json.
+
+    Returns the number of work packages.
+    """
+    import fitz
+
+    filler = " ".join(["Progress to date on the synthetic work package, with next steps."] * 40)
+    doc = fitz.open()
+    work_packages = 0
+    for p in range(pages):
+        wp, k = divmod(p, PAGES_PER_WP)
+        page = doc.new_page(width=595, height=842)
+        if k == 0:
+            work_packages = wp + 1
+            page.insert_text((50, 60), f"Work Package {wp + 1} | Synthetic work package {wp + 1}", fontsize=12)
+            page.insert_text((50, 90), "QUICK SUMMARY", fontsize=11)
+            _summary_table(page, wp + 1, top=110)
+        else:
+            page.insert_textbox(fitz.Rect(50, 60, 545, 780), f"{filler} ({wp + 1}.{k})", fontsize=9)
+    doc.save(pdf_path, garbage=4, deflate=True)
+    doc.close()
+
+    progress = [
+        {"workPackageNumber": n, "workPackageName": f"Synthetic work package {n}", "progressPerAction": []}
+        for n in range(1, work_packages + 1)
+    ]
+    json_path.write_text(json.dumps(progress), encoding="utf-8")
+    return work_packages
+
+
+def prepare_workdir(stage: str, size: int, workdir: Path) -> None:
+    """Lay out the inputs *stage* expects, relative to *workdir*."""
+    (workdir / "data/input").mkdir(parents=True)
+    (workdir / "public/data").mkdir(parents=True)
+    for name in CONFIG_FILES:
+        (workdir / name).parent.mkdir(parents=True, exist_ok=True)
+        shutil.copy(REPO_DIR / name, workdir / name)
+    if stage.startswith("prepare"):
+        generate_actions_raw(size, workdir / "data/input/actions_raw.json")
+        return
+    if stage == "bundle":
+        generate_actions_json(size, workdir / "public/data/actions.json")
+        shutil.copy(PROGRESS_PATH, workdir / "public/data/actions_progress.json")
+        return
+    # extract also refreshes the bundle and search index, which read actions.json
+    shutil.copy(ACTIONS_PATH, workdir / "public/data/actions.json")
+    pdf_path = workdir / ("data/input" if stage == "extract" else "public/data") / "actions_progress.pdf"
+    generate_progress_pdf(size, pdf_path, workdir / "public/data/actions_progress.json")
+
+
+def run_stage(stage: str, size: int, keep: Path | None = None) -> dict:
+    """Run one stage on generated input in a child process; return its measurements."""
+    script, args = STAGES[stage]
+    with tempfile.TemporaryDirectory(prefix=f"bench-{stage}-") as tmp:
+        workdir = Path(tmp)
+        prepare_workdir(stage, size, workdir)
+        result_path = workdir / "result.json"
+        log_path = workdir / "stage.log"
+        with open(log_path, "w", encoding="utf-8") as log:
+            completed = subprocess.run(
+                [sys.executable, __file__, "--run-stage", script, str(result_path), "--", *args],
+                cwd=workdir,
+                stdout=log,
+                stderr=subprocess.STDOUT,
+            )
+        if keep is not None:
+            shutil.copytree(workdir, keep / f"{stage}@{size}", dirs_exist_ok=True)
+        if completed.returncode != 0:
+            tail = log_path.read_text(encoding="utf-8").splitlines()[-15:]
+            raise RuntimeError(f"{stage}@{size} failed:\n" + "\n".join(tail))
+        return json.loads(result_path.read_text(encoding="utf-8"))
+
+
+def _peak_rss_mb() -> float:
+    """Peak resident memory of this process in MB.
+
+    ru_maxrss survives fork and exec, so it would report the benchmark
+    process's own peak (e.g. from generating the PDF); VmHWM starts afresh
+    with the exec'd program.
+    """
+    try:
+        for line in Path("/proc/self/status").read_text().splitlines():
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1]) / 1024  # kB
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # KiB on Linux
+
+
+def _stage_child(script: str, result_path: Path, args: list[str]) -> None:
+    """Body of the child process: run *script* as __main__ and record time and peak RSS."""
+    sys.path.insert(0, str(PYTHON_DIR))
+    sys.argv = [script, *args]
+    start = time.perf_counter()
+    try:
+        runpy.run_path(str(PYTHON_DIR / script), run_name="__main__")
+    except SystemExit as e:
+        if e.code not in (None, 0):
+            raise
+    seconds = time.perf_counter() - start
+    result_path.write_text(json.dumps({"seconds": round(seconds, 3), "peak_mb": round(_peak_rss_mb(), 1)}))
+
+
+def regressions(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    problems = []
+    for key, measured in results.items():
+        base = baseline.get(key)
+        if base is None:
+            continue
+        if measured["seconds"] > base["seconds"] * (1 + tolerance) + TIME_SLACK_SECONDS:
+            problems.append(f"{key}: {measured['seconds']:.2f}s vs baseline {base['seconds']:.2f}s")
+        if measured["peak_mb"] > base["peak_mb"] * (1 + tolerance) + MEMORY_SLACK_MB:
+            problems.append(f"{key}: {measured['peak_mb']:.0f} MB vs baseline {base['peak_mb']:.0f} MB")
+    return problems
+
+
+def _sizes(text: str) -> list[int]:
+    return [int(s.replace("_", "")) for s in text.split(",") if s]
+
+
+def main(argv: list[str] | None = None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv[:1] == ["--run-stage"]:
+        script, result_path, _, *args = argv[1:]
+        _stage_child(script, Path(result_path), args)
+        return
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--stages", default=",".join(STAGES), help="comma-separated (default: all)")
+    parser.add_argument("--rows", type=_sizes, default=DEFAULT_ROWS, help="export sizes for prepare and bundle")
+    parser.add_argument("--pages", type=_sizes, default=DEFAULT_PAGES, help="PDF sizes for extract/split")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed relative slowdown (default: 0.25)")
+    parser.add_argument("--update-baseline", action="store_true", help="store these results as the baseline")
+    parser.add_argument("--keep", type=Path, metavar="DIR", help="copy each stage's working directory here")
+    args = parser.parse_args(argv)
+
+    baseline = json.loads(BASELINE_PATH.read_text(encoding="utf-8")) if BASELINE_PATH.exists() else {}
+    results = {}
+    for stage in args.stages.split(","):
+        if stage not in STAGES:
+            raise SystemExit(f"Unknown stage {stage!r} (choose from {', '.join(STAGES)})")
+        for size in args.rows if stage in ROW_STAGES else args.pages:
+            key = f"{stage}@{size}"
+            results[key] = run_stage(stage, size, args.keep)
+            base = baseline.get(key)
+            versus = f"  (baseline {base['seconds']:.2f}s, {base['peak_mb']:.0f} MB)" if base else ""
+            print(f"{key:<24} {results[key]['seconds']:8.2f}s {results[key]['peak_mb']:8.0f} MB{versus}")
+
+    if args.update_baseline:
+        baseline.update(results)
+        BASELINE_PATH.write_text(json.dumps(dict(sorted(baseline.items())), indent=2) + "\n", encoding="utf-8")
+        print(f"\n✓ Baseline updated: {BASELINE_PATH}")
+        return
+
+    problems = regressions(results, baseline, args.tolerance)
+    if problems:
+        print("\n❌ Regressions against the baseline:")
+        for problem in problems:
+            print(f"  - {problem}")
+        raise SystemExit(1)
+    print("\n✓ No regressions against the baseline")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""Minified, per-work-package data bundle for the dashboard.
+
+Writes public/data/bundle/ from actions.json and actions_progress.json:
+
+- actions.json / progress.json: the full datasets, minified
+- wpN.json: the actions and progress entry of one work package
+- index.json: every file with its content hash (for cache-busting URLs such
+  as wp3.json?v=<hash>) and its raw/gzip/brotli sizes
+
+Each data file gets precompressed .gz and .br siblings for static hosts
+that serve them. Only files whose bytes changed are rewritten and files that
+are no longer produced are removed, so rerunning on unchanged data leaves the
+bundle untouched.
+
+Usage (also run at the end of prepare_actions_data.py and
+extract_pdf_tables.py):
+    python python/bundle.py
+"""
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+from pathlib import Path
+
+import brotli
+
+ACTIONS_PATH = Path("public/data/actions.json")
+PROGRESS_PATH = Path("public/data/actions_progress.json")
+BUNDLE_DIR = Path("public/data/bundle")
+
+BUNDLE_VERSION = 1
+
+COMPRESSED_SUFFIXES = (".gz", ".br")
+
+# Brotli quality 11 is ~40x slower than 9 for a few percent smaller output:
+# worth it for the two full datasets, not for every work package shard
+BROTLI_QUALITY = {"actions.json": 11, "progress.json": 11}
+SHARD_BROTLI_QUALITY = 9
+
+
+def minify(data) -> bytes:
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def content_hash(payload: bytes) -> str:
+    return hashlib.sha256(payload).hexdigest()[:16]
+
+
+def compressed_variants(payload: bytes, brotli_quality: int = SHARD_BROTLI_QUALITY) -> dict[str, bytes]:
+    """Precompressed siblings by suffix; gzip with mtime=0 so output is deterministic."""
+    return {
+        ".gz": gzip.compress(payload, compresslevel=9, mtime=0),
+        ".br": brotli.compress(payload, quality=brotli_quality),
+    }
+
+
+def build_files(actions: list[dict], progress: list[dict]) -> dict[str, bytes]:
+    """File name -> minified bytes for every data file in the bundle."""
+    files = {"actions.json": minify(actions), "progress.json": minify(progress)}
+
+    progress_by_wp = {entry["workPackageNumber"]: entry for entry in progress}
+    actions_by_wp: dict[int, list[dict]] = {}
+    for action in actions:
+        actions_by_wp.setdefault(action["work_package_number"], []).append(action)
+
+    for wp_num in sorted(actions_by_wp.keys() | progress_by_wp.keys()):
+        shard = {
+            "workPackageNumber": wp_num,
+            "actions": actions_by_wp.get(wp_num, []),
+            "progress": progress_by_wp.get(wp_num),
+        }
+        files[f"wp{wp_num}.json"] = minify(shard)
+    return files
+
+
+def write_if_changed(path: Path, payload: bytes) -> bool:
+    if path.exists() and path.read_bytes() == payload:
+        return False
+    tmp_path = path.with_name(path.name + ".tmp")
+    tmp_path.write_bytes(payload)
+    tmp_path.replace(path)
+    return True
+
+
+def write_bundle(
+    actions_path: Path = ACTIONS_PATH,
+    progress_path: Path = PROGRESS_PATH,
+    bundle_dir: Path = BUNDLE_DIR,
+) -> dict:
+    """Write the bundle into *bundle_dir* and return its index."""
+    actions = json.loads(actions_path.read_text(encoding="utf-8"))
+    progress = json.loads(progress_path.read_text(encoding="utf-8")) if progress_path.exists() else []
+
+    bundle_dir.mkdir(parents=True, exist_ok=True)
+    files = build_files(actions, progress)
+
+    index_path = bundle_dir / "index.json"
+    previous = json.loads(index_path.read_text(encoding="utf-8"))["files"] if index_path.exists() else {}
+
+    index = {"version": BUNDLE_VERSION, "files": {}}
+    outputs: dict[str, bytes] = {}
+    kept: set[str] = set()
+    for name, payload in files.items():
+        entry = {"hash": content_hash(payload), "bytes": len(payload)}
+        siblings = [name + suffix for suffix in COMPRESSED_SUFFIXES]
+        old = previous.get(name, {})
+        if (
+            old.get("hash") == entry["hash"]
+            and all((bundle_dir / n).exists() for n in siblings)
+            and (bundle_dir / name).read_bytes() == payload
+        ):
+            # Unchanged: keep the existing files instead of compressing again
+            entry.update({suffix.lstrip("."): old[suffix.lstrip(".")] for suffix in COMPRESSED_SUFFIXES})
+            kept.update([name, *siblings])
+        else:
+            outputs[name] = payload
+            quality = BROTLI_QUALITY.get(name, SHARD_BROTLI_QUALITY)
+            for suffix, compressed in compressed_variants(payload, quality).items():
+                entry[suffix.lstrip(".")] = len(compressed)
+                outputs[name + suffix] = compressed
+        index["files"][name] = entry
+    outputs["index.json"] = json.dumps(index, indent=2).encode("utf-8") + b"\n"
+
+    written = sum(write_if_changed(bundle_dir / name, payload) for name, payload in outputs.items())
+    removed = 0
+    for path in bundle_dir.iterdir():
+        if path.name not in outputs and path.name not in kept:
+            path.unlink()
+            removed += 1
+
+    raw = sum(entry["bytes"] for entry in index["files"].values())
+    br = sum(entry["br"] for entry in index["files"].values())
+    print(
+        f"✓ Bundle: {len(files)} files in {bundle_dir}/ ({written} written, {removed} removed; "
+        f"{raw:,} bytes minified, {br:,} brotli)"
+    )
+    return index
+
+
+if __name__ == "__main__":
+    write_bundle()
@@ -0,0 +1,107 @@
+"""Column-type-driven cleaning for the Power Automate actions export.
+
+Each cleaner runs vectorized pandas string operations over the *distinct*
+values of a column and maps the results back. Leads, budgets, dates, flags
+and most text columns repeat heavily, so cost grows with the number of
+distinct values rather than with Python-level calls per row.
+"""
+
+from __future__ import annotations
+
+import re
+
+import pandas as pd
+from instrument import span
+
+# Excel serial dates count days from this epoch (1900 leap-year bug included)
+EXCEL_EPOCH = "1899-12-30"
+
+# Column name -> type; object columns not listed here are cleaned as "string"
+COLUMN_TYPES = {
+    "first_milestone_deadline": "date",
+    "final_milestone_deadline": "date",
+    "delivery_date": "date",
+    "work_package_leads": "list",
+    "action_leads": "list",
+    "un_budget": "list",
+    "ms_body": "list",
+    "big_ticket": "boolean",
+}
+
+
+def _by_distinct(s: pd.Series, convert) -> pd.Series:
+    """Apply *convert* (Series -> Series) to the distinct non-null values of *s*
+    and map the results back onto every row; nulls map to NaN.
+
+    Mostly-unique columns (free text) skip the lookup and are converted directly.
+    """
+    values = s.dropna()
+    distinct = values.unique()
+    if 2 * len(distinct) > len(values):
+        return convert(values.astype(object)).reindex(s.index)
+    distinct = pd.Series(distinct, dtype=object)
+    return s.map(dict(zip(distinct, convert(distinct))))
+
+
+def excel_dates(s: pd.Series) -> pd.Series:
+    """Excel serial numbers -> ISO 8601 date strings ("" if missing or invalid)."""
+    serials = pd.to_numeric(s, errors="coerce")
+    return _by_distinct(
+        serials,
+        lambda d: pd.to_datetime(d.astype(float), origin=EXCEL_EPOCH, unit="D", errors="coerce").dt.strftime(
+            "%Y-%m-%d"
+        ),
+    ).fillna("")
+
+
+def excel_datetimes(s: pd.Series) -> pd.Series:
+    """Excel serial numbers -> datetime64 (NaT if missing or invalid); see excel_dates."""
+    serials = pd.to_numeric(s, errors="coerce").astype(float)
+    return pd.to_datetime(serials, origin=EXCEL_EPOCH, unit="D", errors="coerce")
+
+
+def split_list(s: pd.Series, sep: str = ";") -> pd.Series:
+    """Separator-delimited strings -> lists of stripped, non-empty items ([] if missing)."""
+    s_ = re.escape(sep)
+
+    def convert(d: pd.Series) -> pd.Series:
+        # Drop whitespace around separators and empty items, then split once
+        text = d.astype(str).str.replace(rf"\s*{s_}[\s{s_}]*", sep, regex=True).str.strip().str.strip(sep)
+        return text.str.split(sep).where(text != "", None)
+
+    # Copy per row so no two rows share a list object
+    return _by_distinct(s, convert).map(lambda v: list(v) if isinstance(v, list) else [])
+
+
+def yes_no(s: pd.Series) -> pd.Series:
+    """"Yes"/"No" (any case, padded) -> True/False; anything else -> None."""
+    flags = _by_distinct(s, lambda d: d.astype(str).str.strip().str.lower().map({"yes": True, "no": False}))
+    return flags.astype(object).where(flags.notna(), None)
+
+
+def squish(s: pd.Series) -> pd.Series:
+    """Collapse internal whitespace and strip; blank or missing values -> None."""
+    text = _by_distinct(s, lambda d: d.astype(str).str.split().str.join(" "))
+    return text.where(text.notna() & (text != ""), None)
+
+
+CLEANERS = {
+    "date": excel_dates,
+    "list": split_list,
+    "boolean": yes_no,
+    "string": squish,
+}
+
+
+def clean_frame(df: pd.DataFrame, column_types: dict[str, str] = COLUMN_TYPES) -> pd.DataFrame:
+    """Apply the cleaner for each column's type and return a new frame."""
+    df = df.copy()
+    for col in df.columns:
+        kind = column_types.get(col)
+        if kind is None:
+            if df[col].dtype != "object":
+                continue
+            kind = "string"
+        with span(f"clean:{kind}", values=len(df)):
+            df[col] = CLEANERS[kind](df[col])
+    return df
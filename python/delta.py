@@ -0,0 +1,92 @@
+"""Publish actions.json only when its records change, and record what changed.
+
+Each side of the comparison is reduced to one digest per (work_package_number,
+action_number, report) key, which covers every row with that key (subactions
+share their parent's key), so neither file has to be held in memory.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+from datetime import datetime, timezone
+from pathlib import Path
+
+from stream_actions import iter_json_array
+
+KEY_FIELDS = ("work_package_number", "action_number", "report")
+
+
+def record_digest(record: dict) -> bytes:
+    """Digest of a record's content, independent of key order and formatting."""
+    normalized = json.dumps(record, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(normalized.encode("utf-8")).digest()
+
+
+def key_digests(path: Path) -> dict[tuple, str]:
+    """Map each record key in the JSON array at *path* to a digest of its rows, in order."""
+    hashes = {}
+    for record in iter_json_array(path):
+        key = tuple(record.get(field) for field in KEY_FIELDS)
+        hashes.setdefault(key, hashlib.sha256()).update(record_digest(record))
+    return {key: h.hexdigest() for key, h in hashes.items()}
+
+
+def _sort_key(key: tuple) -> tuple:
+    return tuple((value is None, value if value is not None else "") for value in key)
+
+
+def diff_digests(old: dict[tuple, str], new: dict[tuple, str]) -> dict[str, list[dict]]:
+    """Added, removed and modified keys between two key_digests() results."""
+
+    def entries(keys) -> list[dict]:
+        return [dict(zip(KEY_FIELDS, key)) for key in sorted(keys, key=_sort_key)]
+
+    return {
+        "added": entries(new.keys() - old.keys()),
+        "removed": entries(old.keys() - new.keys()),
+        "modified": entries(k for k in new.keys() & old.keys() if new[k] != old[k]),
+    }
+
+
+def write_json_atomic(path: Path, data) -> None:
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    tmp_path.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+    tmp_path.replace(path)
+
+
+def publish(tmp_path: Path, output_path: Path, force: bool = False) -> dict | None:
+    """Move the freshly written *tmp_path* over *output_path* if its records changed.
+
+    On a change (or with *force*) also stamps last-updated.json and writes
+    actions-changelog.json next to the output, and returns the changelog.
+    Otherwise discards *tmp_path*, leaves both files untouched and returns None.
+    """
+    new = key_digests(tmp_path)
+    old = key_digests(output_path) if output_path.exists() else {}
+    changes = diff_digests(old, new)
+    changed = not output_path.exists() or any(changes.values())
+
+    if not (changed or force):
+        tmp_path.unlink()
+        print(f"\n✓ No changes to {len(new)} actions — {output_path} left untouched")
+        return None
+
+    tmp_path.replace(output_path)
+    print(f"✓ Cleaned JSON written to {output_path.resolve()}")
+
+    # Write last-updated timestamp for the dashboard header
+    stamp = datetime.now(timezone.utc).isoformat()
+    last_updated_path = output_path.parent / "last-updated.json"
+    write_json_atomic(last_updated_path, {"lastUpdated": stamp})
+    print(f"✓ Last updated written to {last_updated_path.resolve()}")
+
+    changelog = {"lastUpdated": stamp, **changes}
+    changelog_path = output_path.parent / "actions-changelog.json"
+    write_json_atomic(changelog_path, changelog)
+    print(
+        f"✓ Changelog written to {changelog_path.resolve()} "
+        f"({len(changes['added'])} added, {len(changes['removed'])} removed, "
+        f"{len(changes['modified'])} modified)"
+    )
+    return changelog
@@ -2,15 +2,76 @@
 
 from __future__ import annotations
 
+import argparse
 import json
 import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
 from pathlib import Path
 
-import fitz
+from bundle import write_bundle
+from instrument import add_arguments, configure, finish, span
+from page_cache import PageCache
+from pdf_index import load_index, summary_pages, wp_start_pages
+from search_index import write_search_index
 
 PDF_PATH = Path("data/input/actions_progress.pdf")
 JSON_PATH = Path("public/data/actions_progress.json")
 
+# find_tables() with no arguments uses the "lines" strategy, so the default
+# detection and the fallback's explicit strategy="lines" pass are the same call.
+DEFAULT_STRATEGY = "lines"
+
+# Part of the page cache key: bump whenever a change to the extraction code
+# could change the rows produced for an unchanged page.
+# 2: page hashes cover the page's resources, not only its content stream
+EXTRACTOR_VERSION = "2"
+
+# Word-coordinate engine: rules are hairlines (0.25-1.0pt); thicker strokes
+# are heading underlines and decorative bars.
+RULE_MAX_STROKE = 1.0
+RULE_TOLERANCE = 2.0
+
+ENGINES = ("tables", "words")
+
+
+class PageTables:
+    """find_tables()/extract() results for one page, computed at most once.
+
+    The 4-column path and the partial-column fallback both read from the same
+    instance, so each QUICK SUMMARY page is detected and extracted once per
+    strategy instead of once per caller (and once per cell).
+    """
+
+    def __init__(self, page, text: str | None = None):
+        self.page = page
+        self.text = page.get_text() if text is None else text
+        self.find_tables_calls = 0
+        self.extract_calls = 0
+        self._tables: dict[str, list] = {}
+        self._rows: dict[tuple[str, int], list[list[str | None]]] = {}
+
+    def tables(self, strategy: str = DEFAULT_STRATEGY) -> list:
+        """Tables detected with *strategy*, running find_tables() on first use."""
+        if strategy not in self._tables:
+            self.find_tables_calls += 1
+            self._tables[strategy] = self.page.find_tables(strategy=strategy).tables
+        return self._tables[strategy]
+
+    def rows(self, index: int = 0, strategy: str = DEFAULT_STRATEGY) -> list[list[str | None]]:
+        """Cell text of table *index*, running extract() on first use."""
+        key = (strategy, index)
+        if key not in self._rows:
+            self.extract_calls += 1
+            self._rows[key] = self.tables(strategy)[index].extract()
+        return self._rows[key]
+
+    def has_summary_table(self) -> bool:
+        """True if the first detected table has the full 4-column layout."""
+        tables = self.tables()
+        return bool(tables) and tables[0].col_count == 4 and tables[0].row_count <= 10
+
 
 def parse_action_cell(text: str) -> tuple[str, str]:
     """Split an action cell into (action_numbers, description)."""
@@ -38,26 +99,16 @@ def parse_products(text: str) -> list[str]:
     return [p.strip() for p in parts if p.strip() and p.strip() != "-"]
 
 
-def extract_table_from_page(page) -> list[dict]:
-    """Extract the QUICK SUMMARY table from a single page using find_tables()."""
-    tabs = page.find_tables()
-    if not tabs.tables:
-        return []
-
-    table = tabs.tables[0]
-    if table.row_count > 10:
-        return []
-
+def rows_from_cells(cell_rows: list[list[str]]) -> list[dict]:
+    """Turn 4-column (or action-less 2-column) cell rows into summaryTable rows."""
     rows = []
-    for ri in range(table.row_count):
-        cells = [table.extract()[ri][ci] or "" for ci in range(table.col_count)]
-
-        if table.col_count == 4:
+    for cells in cell_rows:
+        if len(cells) == 4:
             action_text = cells[0]
             pathway = cells[1]
             products = cells[2]
             intergov = cells[3]
-        elif table.col_count == 2:
+        elif len(cells) == 2:
             action_text = ""
             pathway = cells[0]
             products = cells[1]
@@ -86,13 +137,27 @@ def extract_table_from_page(page) -> list[dict]:
     return rows
 
 
-def extract_table_partial_columns(page) -> list[dict]:
+def extract_table_from_page(tables: PageTables) -> list[dict]:
+    """Extract the QUICK SUMMARY table from a single page using find_tables()."""
+    if not tables.tables():
+        return []
+
+    table = tables.tables()[0]
+    if table.row_count > 10:
+        return []
+
+    return rows_from_cells(
+        [[cell or "" for cell in row_data[: table.col_count]] for row_data in tables.rows()]
+    )
+
+
+def extract_table_partial_columns(tables: PageTables) -> list[dict]:
     """Fallback for pages where find_tables() returns fewer than 4 columns.
 
     Uses the 'lines' strategy (gives clean pathway + products) and parses
     action numbers from the page text to reassemble full rows.
     """
-    text = page.get_text()
+    text = tables.text
     if "QUICK SUMMARY" not in text.upper():
         return []
 
@@ -132,10 +197,9 @@ def extract_table_partial_columns(page) -> list[dict]:
         action_entries.append((nums, desc, parse_products(products_text)))
 
     # Get pathway + products from lines-strategy table
-    tabs = page.find_tables(strategy="lines")
     table_rows: list[tuple[str, list[str]]] = []
-    if tabs.tables:
-        for row_data in tabs.tables[0].extract():
+    if tables.tables("lines"):
+        for row_data in tables.rows(strategy="lines"):
             pathway = clean_cell(row_data[0] or "")
             products = parse_products(row_data[1] or "") if len(row_data) > 1 else []
             if "Pathway" in pathway and "decision" in pathway:
@@ -164,62 +228,342 @@ def extract_table_partial_columns(page) -> list[dict]:
     return rows
 
 
-def main():
-    doc = fitz.open(str(PDF_PATH))
-    print(f"Opened {PDF_PATH} ({doc.page_count} pages)")
+def _cluster(values, tol: float = RULE_TOLERANCE) -> list[float]:
+    """Sorted values with near-duplicates (within *tol*) collapsed to the first."""
+    out: list[float] = []
+    for v in sorted(values):
+        if not out or v - out[-1] > tol:
+            out.append(v)
+    return out
 
-    # Track current WP across pages
-    current_wp: list[int] | None = None
-    wp_tables: dict[int, list[dict]] = {}
 
-    for i in range(doc.page_count):
-        page = doc[i]
-        text = page.get_text()
+def word_table_cells(page) -> list[list[str]]:
+    """Rebuild the QUICK SUMMARY table from word coordinates and ruling lines.
 
-        m = re.search(r"Work Packages?\s+([\d,\s]+(?:and\s+\d+)?)\s*\|", text)
-        if m:
-            nums = re.findall(r"\d+", m.group(1))
-            current_wp = [int(n) for n in nums]
+    Thin vertical rules below the "QUICK SUMMARY" heading give the column
+    bands (the Action column has none on its left, so the page's horizontal
+    rules supply the outer edges). Horizontal rules that span a whole column
+    close a cell in that column; a column without a rule keeps its cell open,
+    so merged cells land in their first row as with find_tables(). Words are
+    placed by their centre point and joined line by line.
+    """
+    words = page.get_text("words")
+    headings = [w for w in words if w[4].upper() == "QUICK"]
+    if not headings:
+        return []
+    heading_bottom = headings[-1][3]
 
-        if "QUICK SUMMARY" not in text.upper():
+    vertical, horizontal = [], []
+    for drawing in page.get_drawings():
+        r = drawing["rect"]
+        if r.y0 < heading_bottom or (drawing.get("width") or 0) > RULE_MAX_STROKE:
             continue
+        if r.width <= RULE_TOLERANCE < r.height:
+            vertical.append(r)
+        elif r.height <= RULE_TOLERANCE < r.width:
+            horizontal.append(r)
+    if not vertical:
+        return []
 
-        tabs = page.find_tables()
-        has_good_table = tabs.tables and tabs.tables[0].col_count == 4 and tabs.tables[0].row_count <= 10
+    top = min(r.y0 for r in vertical)
+    bottom = max(r.y1 for r in vertical)
+    horizontal = [r for r in horizontal if top - RULE_TOLERANCE <= r.y0 <= bottom + RULE_TOLERANCE]
+    inner = _cluster(r.x0 for r in vertical)
+    cols = [min([r.x0 for r in horizontal] + inner), *inner, max([r.x1 for r in horizontal] + inner)]
 
-        if has_good_table:
-            rows = extract_table_from_page(page)
-        else:
-            rows = extract_table_partial_columns(page)
+    def spans(r, c: int) -> bool:
+        return r.x0 <= cols[c] + RULE_TOLERANCE and r.x1 >= cols[c + 1] - RULE_TOLERANCE
+
+    # Shorter strokes inside a cell (e.g. link underlines) are not row rules
+    horizontal = [r for r in horizontal if any(spans(r, c) for c in range(len(cols) - 1))]
+    ys = _cluster(
+        [top, bottom]
+        + [r.y0 for r in horizontal if top + RULE_TOLERANCE < r.y0 < bottom - RULE_TOLERANCE]
+    )
+    n_rows, n_cols = len(ys) - 1, len(cols) - 1
+
+    grid: list[list[list]] = [[[] for _ in range(n_cols)] for _ in range(n_rows)]
+    for c in range(n_cols):
+        left, right = cols[c], cols[c + 1]
+        closed = {
+            ri
+            for ri in range(1, n_rows)
+            for r in horizontal
+            if abs(r.y0 - ys[ri]) <= RULE_TOLERANCE and spans(r, c)
+        }
+        owner, start = [], 0
+        for ri in range(n_rows):
+            if ri in closed:
+                start = ri
+            owner.append(start)
+
+        for w in words:
+            cx, cy = (w[0] + w[2]) / 2, (w[1] + w[3]) / 2
+            if not (left <= cx < right and top <= cy <= bottom):
+                continue
+            ri = next((i for i in range(n_rows) if cy < ys[i + 1]), n_rows - 1)
+            grid[owner[ri]][c].append(w)
+
+    cell_rows = []
+    for row in grid:
+        cells = []
+        for cell_words in row:
+            lines: dict[tuple[int, int], list] = {}
+            for w in cell_words:
+                lines.setdefault((w[5], w[6]), []).append(w)
+            cells.append(
+                "\n".join(
+                    " ".join(w[4] for w in sorted(line, key=lambda w: w[7]))
+                    for _, line in sorted(lines.items())
+                )
+            )
+        cell_rows.append(cells)
+    return cell_rows
+
+
+def extract_table_from_words(page) -> list[dict]:
+    """Extract the QUICK SUMMARY table from word coordinates, without find_tables()."""
+    return rows_from_cells(word_table_cells(page))
+
+
+def extract_page(tables: PageTables) -> list[dict]:
+    """Extract summary rows from a QUICK SUMMARY page, choosing the path once."""
+    if tables.has_summary_table():
+        return extract_table_from_page(tables)
+    return extract_table_partial_columns(tables)
 
-        if not rows or not current_wp:
-            continue
 
+def extract_page_at(doc, index: int, engine: str = "tables") -> tuple[list[dict], int, int]:
+    """Extract one page, returning (rows, find_tables calls, extract calls)."""
+    if engine == "words":
+        return extract_table_from_words(doc[index]), 0, 0
+    tables = PageTables(doc[index])
+    rows = extract_page(tables)
+    return rows, tables.find_tables_calls, tables.extract_calls
+
+
+# Each pool worker opens each PDF once and reuses it for all pages it is given.
+_worker_docs: dict = {}
+
+
+def _extract_page_in_worker(job: tuple[str, int, str]) -> tuple[list[dict], int, int]:
+    import fitz
+
+    pdf_path, index, engine = job
+    doc = _worker_docs.get(pdf_path)
+    if doc is None:
+        doc = _worker_docs[pdf_path] = fitz.open(pdf_path)
+    return extract_page_at(doc, index, engine)
+
+
+def extract_documents(
+    pages: dict[str, list[int]], workers: int = 1, engine: str = "tables", docs: dict | None = None
+) -> dict[str, list[tuple[list[dict], int, int]]]:
+    """Extract pages of several PDFs (path -> 0-based page indices) in one process pool.
+
+    Results come back per path in the order of its indices. *docs* are
+    already open documents to use on the serial path; the others are opened
+    and closed again per path.
+    """
+    jobs = [(path, i, engine) for path, indices in pages.items() for i in indices]
+    if workers <= 1 or len(jobs) <= 1:
+        import fitz
+
+        results = {}
+        for path, indices in pages.items():
+            results[path] = []
+            if not indices:
+                continue
+            doc = (docs or {}).get(path)
+            # Documents opened here are closed here; the caller's stay open
+            with nullcontext(doc) if doc is not None else fitz.open(path) as doc:
+                for i in indices:
+                    with span("detect", pages=1):
+                        results[path].append(extract_page_at(doc, i, engine))
+        return results
+
+    # Worker time shows up as wall time only; CPU time and memory are the parent's
+    with span("detect", pages=len(jobs)), ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as pool:
+        flat = iter(pool.map(_extract_page_in_worker, jobs))
+        return {path: [next(flat) for _ in indices] for path, indices in pages.items()}
+
+
+def extract_pages(
+    doc, indices: list[int], workers: int = 1, engine: str = "tables"
+) -> list[tuple[list[dict], int, int]]:
+    """Extract the given pages, in a process pool if *workers* > 1.
+
+    Results come back in the order of *indices*, so merging them gives the
+    same output as the serial path.
+    """
+    return extract_documents({doc.name: indices}, workers, engine, docs={doc.name: doc})[doc.name]
+
+
+def wp_summary_tables(plan: list[tuple[int, list[int]]], page_rows: dict[int, list[dict]]) -> dict[int, list[dict]]:
+    """Work package -> its summaryTable rows, from the rows of each planned page.
+
+    A page's rows go to every work package of its header (e.g. WP6 and WP12).
+    """
+    wp_tables: dict[int, list[dict]] = {}
+    for i, current_wp in plan:
+        rows = page_rows[i]
+        if not rows:
+            continue
         for wp_num in current_wp:
-            existing = wp_tables.get(wp_num, [])
-            existing.extend(rows)
-            wp_tables[wp_num] = existing
+            wp_tables.setdefault(wp_num, []).extend(rows)
+    return wp_tables
 
-    # Load existing JSON and merge
-    with open(JSON_PATH, encoding="utf-8") as f:
-        progress_data = json.load(f)
-
-    updated = 0
-    for wp in progress_data:
-        wp_num = wp["workPackageNumber"]
-        if wp_num in wp_tables:
-            wp["summaryTable"] = wp_tables[wp_num]
-            updated += 1
-            actions_count = len(wp_tables[wp_num])
-            products_count = sum(len(r["writtenProducts"]) for r in wp_tables[wp_num])
-            print(f"  WP{wp_num:2d}: {actions_count} rows, {products_count} products")
-
-    with open(JSON_PATH, "w", encoding="utf-8") as f:
-        json.dump(progress_data, f, ensure_ascii=False, indent=2)
 
+def compare_engines(doc, plan: list[tuple[int, list[int]]], workers: int = 1) -> int:
+    """Run both engines over the planned pages and print every differing field.
+
+    Returns the number of pages on which the engines disagree.
+    """
+    indices = [i for i, _ in plan]
+    timings = {}
+    results = {}
+    for engine in ENGINES:
+        start = time.perf_counter()
+        results[engine] = [rows for rows, _, _ in extract_pages(doc, indices, workers, engine)]
+        timings[engine] = time.perf_counter() - start
+
+    differing = 0
+    for i, tables_rows, words_rows in zip(indices, results["tables"], results["words"]):
+        if tables_rows == words_rows:
+            continue
+        differing += 1
+        print(f"  p{i + 1:3d}: tables {len(tables_rows)} rows, words {len(words_rows)} rows")
+        for ri, (a, b) in enumerate(zip(tables_rows, words_rows)):
+            for key in a:
+                if a[key] != b[key]:
+                    print(f"    row {ri} {key}:\n      tables: {a[key]!r}\n      words:  {b[key]!r}")
+
+    print(
+        f"\n{len(indices) - differing}/{len(indices)} pages identical "
+        f"(tables {timings['tables']:.2f}s, words {timings['words']:.2f}s)"
+    )
+    return differing
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        metavar="N",
+        help="extract pages in N worker processes (default: 1, serial)",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="ignore and do not update the per-page extraction cache",
+    )
+    parser.add_argument(
+        "--engine",
+        choices=ENGINES,
+        default="tables",
+        help="'tables' uses PyMuPDF find_tables(); 'words' rebuilds the table "
+        "from word coordinates and ruling lines (default: tables)",
+    )
+    parser.add_argument(
+        "--compare",
+        action="store_true",
+        help="run both engines, report where they disagree and write nothing",
+    )
+    parser.add_argument(
+        "--no-derived",
+        dest="derived",
+        action="store_false",
+        help="only update actions_progress.json, not the bundle, search index and products timeline "
+        "(pipeline.py runs those)",
+    )
+    add_arguments(parser)
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None):
+    import fitz
+
+    args = parse_args(argv)
+    configure(report=args.report, profile=args.profile, memory=args.trace_memory)
+
+    doc = fitz.open(str(PDF_PATH))
+    print(f"Opened {PDF_PATH} ({doc.page_count} pages)")
+
+    # Page -> work package map and content hashes come from the sidecar index
+    with span("index", pages=doc.page_count):
+        index = load_index(PDF_PATH)
+        plan = summary_pages(index)
+        start_pages = wp_start_pages(index)
+
+    if args.compare:
+        differing = compare_engines(doc, plan, workers=args.workers)
+        raise SystemExit(1 if differing else 0)
+
+    # Only pages whose content stream is not in the cache are extracted
+    cache = PageCache(f"{EXTRACTOR_VERSION}-{args.engine}", enabled=not args.no_cache)
+    hashes = {i: index["pages"][i]["hash"] for i, _ in plan}
+    cached = {i: cache.get(hashes[i]) for i, _ in plan}
+    misses = [i for i, _ in plan if cached[i] is None]
+    extracted = dict(zip(misses, extract_pages(doc, misses, args.workers, args.engine)))
+    for i in misses:
+        cache.put(hashes[i], extracted[i][0])
+    cache.evict()
+
+    page_rows = {}
+    for i, _ in plan:
+        if i in extracted:
+            rows, find_tables_calls, extract_calls = extracted[i]
+            print(
+                f"  p{i + 1:3d}: {len(rows)} rows "
+                f"(find_tables x{find_tables_calls}, extract x{extract_calls})"
+            )
+        else:
+            rows = cached[i]
+            print(f"  p{i + 1:3d}: {len(rows)} rows (cached)")
+        page_rows[i] = rows
+    wp_tables = wp_summary_tables(plan, page_rows)
+
+    # Load existing JSON and merge
+    with span("merge", pages=len(plan)) as stage:
+        with open(JSON_PATH, encoding="utf-8") as f:
+            progress_data = json.load(f)
+
+        updated = 0
+        for wp in progress_data:
+            wp_num = wp["workPackageNumber"]
+            if wp_num in start_pages:
+                wp["pdfPage"] = start_pages[wp_num]
+            if wp_num in wp_tables:
+                wp["summaryTable"] = wp_tables[wp_num]
+                updated += 1
+                actions_count = len(wp_tables[wp_num])
+                products_count = sum(len(r["writtenProducts"]) for r in wp_tables[wp_num])
+                print(f"  WP{wp_num:2d}: {actions_count} rows, {products_count} products")
+        stage.count(work_packages=updated)
+
+    with span("export"):
+        with open(JSON_PATH, "w", encoding="utf-8") as f:
+            json.dump(progress_data, f, ensure_ascii=False, indent=2)
+
+    if cache.enabled:
+        print(f"\nPage cache: {cache.stats}")
     print(f"\nUpdated {updated} work packages with summary tables")
     print(f"JSON written to {JSON_PATH}")
 
+    if args.derived:
+        with span("bundle"):
+            write_bundle(progress_path=JSON_PATH)
+        with span("search_index"):
+            write_search_index(progress_path=JSON_PATH)
+        with span("products_timeline"):
+            # Imported here: products_timeline imports this module
+            from products_timeline import write_timeline
+
+            write_timeline(progress_path=JSON_PATH)
+    finish()
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,239 @@
+# https://docs.github.com/en/rest/git?apiVersion=2022-11-28
+
+"""Push several files to GitHub in a single commit through the Git Data API.
+
+blobs -> tree -> commit -> ref update, instead of one contents-API PUT (and
+one commit) per file:
+
+- Files whose git blob SHA equals the one already in the branch are skipped;
+  if nothing changed, no commit is made.
+- One pooled requests.Session is used for every call.
+- GETs are conditional (If-None-Match with the last ETag), so unchanged
+  resources come back as 304 and do not count against the rate limit. The
+  ETags and bodies are kept in .cache/github_etags.json between runs; only
+  the entries a run used are written back, so the file stays one upload big.
+- 5xx responses and rate limits (429, or 403 with no requests remaining) are
+  retried with exponential backoff, honouring Retry-After (seconds or an
+  HTTP date) / X-RateLimit-Reset.
+
+Usage:
+    python python/github_upload.py public/data/actions.json public/data/stats.json \\
+        --message "chore: automated data update"
+"""
+
+from __future__ import annotations
+
+import argparse
+import base64
+import hashlib
+import json
+import os
+import tempfile
+import time
+from datetime import timezone
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+
+import requests
+from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+
+API_URL = "https://api.github.com"
+OWNER = "UN-EOSG-Analytics"
+REPO = "un80-actions"
+
+MAX_RETRIES = 5
+BACKOFF_SECONDS = 1.0
+MAX_WAIT_SECONDS = 60.0
+ETAG_CACHE = Path(".cache/github_etags.json")
+
+
+def git_blob_sha(content: bytes) -> str:
+    """The SHA git (and GitHub) give a blob with this content."""
+    return hashlib.sha1(b"blob %d\0" % len(content) + content).hexdigest()
+
+
+def retry_after_seconds(value: str, now: float | None = None) -> float | None:
+    """Seconds a Retry-After header asks to wait, or None if it cannot be parsed.
+
+    The header is either a number of seconds or an HTTP date.
+    """
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        # "-0000" dates come back naive; HTTP dates are always GMT
+        when = when.replace(tzinfo=timezone.utc)
+    now = time.time() if now is None else now
+    return max(when.timestamp() - now, 0.0)
+
+
+class GitHubUploader:
+    def __init__(
+        self,
+        token: str,
+        owner: str = OWNER,
+        repo: str = REPO,
+        branch: str = "main",
+        api_url: str = API_URL,
+        max_retries: int = MAX_RETRIES,
+        backoff: float = BACKOFF_SECONDS,
+        etag_cache: Path | None = None,
+    ):
+        self.repo_url = f"{api_url.rstrip('/')}/repos/{owner}/{repo}"
+        self.branch = branch
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.requests_made = 0
+
+        self.session = requests.Session()
+        self.session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=8))
+        self.session.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=8))
+        self.session.headers.update(
+            {
+                "Authorization": f"Bearer {token}",
+                "Accept": "application/vnd.github+json",
+                "X-GitHub-Api-Version": "2022-11-28",
+            }
+        )
+        # url -> (ETag, JSON body) of the last 200 response, from earlier runs
+        # if *etag_cache* is given, and the urls requested by this one
+        self.etag_cache = etag_cache
+        self._etags: dict[str, tuple[str, dict]] = self._load_etags()
+        self._used: set[str] = set()
+
+    def _load_etags(self) -> dict[str, tuple[str, dict]]:
+        if self.etag_cache is None:
+            return {}
+        try:
+            entries = json.loads(self.etag_cache.read_text(encoding="utf-8"))
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+        return {url: (etag, body) for url, (etag, body) in entries.items()}
+
+    def save_etags(self) -> None:
+        """Write the ETags of the urls requested in this run to *etag_cache*."""
+        if self.etag_cache is None:
+            return
+        entries = {url: list(self._etags[url]) for url in sorted(self._used) if url in self._etags}
+        self.etag_cache.parent.mkdir(parents=True, exist_ok=True)
+        with tempfile.NamedTemporaryFile(
+            "w", encoding="utf-8", dir=self.etag_cache.parent, suffix=".tmp", delete=False
+        ) as tmp:
+            tmp.write(json.dumps(entries, ensure_ascii=False))
+        os.replace(tmp.name, self.etag_cache)
+
+    def _wait_time(self, response: requests.Response | None, attempt: int) -> float | None:
+        """Seconds to wait before retrying, or None if the response is final."""
+        if response is not None:
+            rate_limited = response.status_code == 429 or (
+                response.status_code == 403 and response.headers.get("X-RateLimit-Remaining") == "0"
+            )
+            if not (rate_limited or response.status_code >= 500):
+                return None
+            retry_after = retry_after_seconds(response.headers.get("Retry-After", ""))
+            if retry_after is not None:
+                return min(retry_after, MAX_WAIT_SECONDS)
+            if rate_limited and "X-RateLimit-Reset" in response.headers:
+                reset = float(response.headers["X-RateLimit-Reset"]) - time.time()
+                return min(max(reset, 0.0), MAX_WAIT_SECONDS)
+        return self.backoff * 2**attempt
+
+    def request(self, method: str, path: str, **kwargs) -> requests.Response:
+        """Send a request to the repository API, retrying transient failures."""
+        url = f"{self.repo_url}/{path}"
+        for attempt in range(self.max_retries + 1):
+            try:
+                response = self.session.request(method, url, timeout=30, **kwargs)
+            except requests.ConnectionError:
+                if attempt == self.max_retries:
+                    raise
+                response = None
+            self.requests_made += 1
+            wait = self._wait_time(response, attempt)
+            if wait is None or attempt == self.max_retries:
+                break
+            time.sleep(wait)
+        response.raise_for_status()
+        return response
+
+    def get(self, path: str) -> dict:
+        """GET with If-None-Match, answering 304s from the cached body."""
+        url = f"{self.repo_url}/{path}"
+        cached = self._etags.get(url)
+        self._used.add(url)
+        headers = {"If-None-Match": cached[0]} if cached else {}
+        response = self.request("GET", path, headers=headers)
+        if response.status_code == 304 and cached:
+            return cached[1]
+        body = response.json()
+        if "ETag" in response.headers:
+            self._etags[url] = (response.headers["ETag"], body)
+        return body
+
+    def post(self, path: str, payload: dict) -> dict:
+        return self.request("POST", path, json=payload).json()
+
+    def upload(self, files: dict[str, bytes], message: str) -> str | None:
+        """Commit *files* (repo path -> content) to the branch in one commit.
+
+        Returns the new commit SHA, or None if every file was already up to date.
+        """
+        head = self.get(f"git/ref/heads/{self.branch}")["object"]["sha"]
+        base_tree = self.get(f"git/commits/{head}")["tree"]["sha"]
+        tree = self.get(f"git/trees/{base_tree}?recursive=1")
+        # A truncated listing cannot prove a file is unchanged, so upload everything
+        existing = {} if tree.get("truncated") else {e["path"]: e["sha"] for e in tree["tree"] if e["type"] == "blob"}
+
+        changed = {path: content for path, content in files.items() if existing.get(path) != git_blob_sha(content)}
+        for path in files.keys() - changed.keys():
+            print(f"  = {path} (unchanged)")
+        if not changed:
+            return None
+
+        entries = []
+        for path, content in changed.items():
+            blob = self.post("git/blobs", {"content": base64.b64encode(content).decode(), "encoding": "base64"})
+            entries.append({"path": path, "mode": "100644", "type": "blob", "sha": blob["sha"]})
+            print(f"  + {path} ({len(content):,} bytes)")
+
+        new_tree = self.post("git/trees", {"base_tree": base_tree, "tree": entries})["sha"]
+        commit = self.post("git/commits", {"message": message, "tree": new_tree, "parents": [head]})["sha"]
+        self.request("PATCH", f"git/refs/heads/{self.branch}", json={"sha": commit})
+        return commit
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description="Push files to GitHub in a single commit.")
+    parser.add_argument("files", nargs="+", type=Path, help="files to push, at the same path in the repo")
+    parser.add_argument("--message", default="chore: automated data update", help="commit message")
+    parser.add_argument("--branch", default="main")
+    parser.add_argument("--api-url", default=API_URL, help=f"default: {API_URL}")
+    parser.add_argument("--etag-cache", type=Path, default=ETAG_CACHE, help=f"default: {ETAG_CACHE}")
+    parser.add_argument("--no-etag-cache", action="store_true", help="send unconditional GETs only")
+    args = parser.parse_args(argv)
+
+    load_dotenv()
+    token = os.getenv("GITHUB_TOKEN")
+    if not token:
+        raise SystemExit("GITHUB_TOKEN is not set (see .env)")
+
+    etag_cache = None if args.no_etag_cache else args.etag_cache
+    uploader = GitHubUploader(token, branch=args.branch, api_url=args.api_url, etag_cache=etag_cache)
+    files = {path.as_posix(): path.read_bytes() for path in args.files}
+    commit = uploader.upload(files, args.message)
+    uploader.save_etags()
+
+    if commit:
+        print(f"✓ Pushed {len(files)} file(s) as {commit[:7]} ({uploader.requests_made} requests)")
+    else:
+        print(f"✓ All {len(files)} file(s) already up to date ({uploader.requests_made} requests)")
+
+
+if __name__ == "__main__":
+    main()
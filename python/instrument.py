@@ -0,0 +1,206 @@
+"""Stage-level timing and memory spans for the data scripts.
+
+    with span("clean", rows=len(df)):
+        df = clean_frame(df)
+
+Each named span records wall time, CPU time, counts (rows, pages, ...) and,
+when a report is requested, the peak of traced Python memory while it was
+open. tracemalloc slows allocation-heavy code down (table detection about
+4x), so it is off without --report and can be turned off with
+--no-trace-memory.
+
+Spans with the same name, e.g. one per page, are added together; spans can
+nest, and a parent's time and peak include its children's.
+
+The scripts take these flags (add_arguments), pass them to configure() and
+call finish() at the end:
+
+- --report PATH writes the run as JSON: totals plus one entry per span in
+  the order they were first opened
+- --profile STAGE runs cProfile while that span is open and dumps the stats
+  to STAGE.prof (":" becomes "-"; read with python -m pstats STAGE.prof)
+"""
+
+from __future__ import annotations
+
+import cProfile
+import json
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+
+
+class Span:
+    """Totals of every span opened under one name."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.calls = 0
+        self.wall = 0.0
+        self.cpu = 0.0
+        self.peak: int | None = None
+        self.counts: dict[str, int] = {}
+
+    def count(self, **counts: int) -> None:
+        """Add to this span's counts, e.g. span.count(rows=len(df))."""
+        for key, value in counts.items():
+            self.counts[key] = self.counts.get(key, 0) + int(value)
+
+    def to_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "calls": self.calls,
+            "wallSeconds": round(self.wall, 4),
+            "cpuSeconds": round(self.cpu, 4),
+            "peakBytes": self.peak,
+            "counts": self.counts,
+        }
+
+
+class Recorder:
+    def __init__(self):
+        self.spans: dict[str, Span] = {}
+        self.report_path: Path | None = None
+        self.profile_stage: str | None = None
+        self._profiler: cProfile.Profile | None = None
+        # Per open span: [traced memory when it opened, highest peak seen inside]
+        self._open: list[list[int]] = []
+        self._start_wall = time.perf_counter()
+        self._start_cpu = time.process_time()
+        self._started_at = datetime.now(timezone.utc)
+
+    def configure(self, report: Path | None = None, profile: str | None = None, memory: bool = True) -> None:
+        self.report_path = report
+        self.profile_stage = profile
+        if report is not None and memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    @contextmanager
+    def span(self, name: str, **counts: int):
+        stats = self.spans.get(name)
+        if stats is None:
+            stats = self.spans[name] = Span(name)
+        stats.calls += 1
+        stats.count(**counts)
+
+        tracing = tracemalloc.is_tracing()
+        if tracing:
+            current, peak = tracemalloc.get_traced_memory()
+            if self._open:
+                # reset_peak() below would lose the enclosing span's peak so far
+                self._open[-1][1] = max(self._open[-1][1], peak)
+            tracemalloc.reset_peak()
+            self._open.append([current, current])
+
+        profiling = name == self.profile_stage
+        if profiling:
+            self._profiler = self._profiler or cProfile.Profile()
+            self._profiler.enable()
+
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield stats
+        finally:
+            stats.wall += time.perf_counter() - wall
+            stats.cpu += time.process_time() - cpu
+            if profiling:
+                self._profiler.disable()
+            if tracing:
+                start, inner = self._open.pop()
+                peak = max(tracemalloc.get_traced_memory()[1], inner)
+                stats.peak = max(stats.peak or 0, peak - start)
+                if self._open:
+                    self._open[-1][1] = max(self._open[-1][1], peak)
+
+    def report(self, script: str) -> dict:
+        return {
+            "script": script,
+            "startedAt": self._started_at.isoformat(timespec="seconds"),
+            "wallSeconds": round(time.perf_counter() - self._start_wall, 4),
+            "cpuSeconds": round(time.process_time() - self._start_cpu, 4),
+            "peakBytes": tracemalloc.get_traced_memory()[1] if tracemalloc.is_tracing() else None,
+            "stages": [s.to_dict() for s in self.spans.values()],
+        }
+
+    def finish(self, script: str | None = None) -> dict | None:
+        """Write the report and profile if they were requested; return the report."""
+        if self._profiler is not None:
+            profile_path = Path(f"{self.profile_stage.replace(':', '-')}.prof")
+            self._profiler.dump_stats(profile_path)
+            print(f"✓ Profile of '{self.profile_stage}' written to {profile_path}")
+        elif self.profile_stage:
+            print(f"⚠️  No span named '{self.profile_stage}' ran (choose from {', '.join(self.spans)})")
+        if self.report_path is None:
+            return None
+
+        report = self.report(script or Path(sys.argv[0]).name)
+        self.report_path.parent.mkdir(parents=True, exist_ok=True)
+        self.report_path.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+
+        print(f"\n⏱  Stages ({report['wallSeconds']:.2f}s wall, {report['cpuSeconds']:.2f}s CPU):")
+        for stage in report["stages"]:
+            counts = ", ".join(f"{v:,} {k}" for k, v in stage["counts"].items())
+            peak = f"{stage['peakBytes'] / 2**20:8.1f} MB" if stage["peakBytes"] is not None else ""
+            print(
+                f"  {stage['name']:<16} {stage['wallSeconds']:8.3f}s {stage['cpuSeconds']:8.3f}s CPU"
+                f" {peak}  x{stage['calls']}" + (f"  ({counts})" if counts else "")
+            )
+        print(f"✓ Run report written to {self.report_path}")
+        return report
+
+
+RECORDER = Recorder()
+
+
+def span(name: str, **counts: int):
+    """Open a span on the process-wide recorder (see module docstring)."""
+    return RECORDER.span(name, **counts)
+
+
+def iter_span(name: str, items, count: str | None = None):
+    """Yield from *items*, timing the work of producing each item as span *name*.
+
+    With *count*, len(item) is added to that count (e.g. rows per chunk).
+    """
+    iterator = iter(items)
+    while True:
+        with span(name) as stats:
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            if count:
+                stats.count(**{count: len(item)})
+        yield item
+
+
+def configure(report: Path | None = None, profile: str | None = None, memory: bool = True) -> None:
+    RECORDER.configure(report, profile, memory)
+
+
+def finish(script: str | None = None) -> dict | None:
+    return RECORDER.finish(script)
+
+
+def add_arguments(parser) -> None:
+    """Add --report and --profile to a script's argument parser."""
+    parser.add_argument(
+        "--report",
+        type=Path,
+        metavar="PATH",
+        help="write per-stage wall/CPU time, peak traced memory and counts as JSON",
+    )
+    parser.add_argument(
+        "--no-trace-memory",
+        dest="trace_memory",
+        action="store_false",
+        help="with --report: leave out peak memory, avoiding tracemalloc's overhead",
+    )
+    parser.add_argument(
+        "--profile",
+        metavar="STAGE",
+        help="run cProfile during one stage and dump the stats to STAGE.prof",
+    )
@@ -0,0 +1,479 @@
+"""Load actions.json into the un80actions schema (sql/schema/un80actions_schema.sql).
+
+Rows are upserted by diffing against what is already in the database, not
+by truncating and reloading: every loader-owned table is read once, compared
+with the rows derived from actions.json, and only the inserts, updates and
+deletes are sent, batched with executemany inside a single transaction.
+
+- Leads, entities, work packages and milestones get their ids from in-memory
+  maps seeded with the existing rows, so ids stay stable between runs.
+- Link tables (work_package_leads, action_leads, action_entities) are synced
+  exactly; stale links are deleted.
+- Work packages, actions and milestones that disappeared from actions.json
+  are only deleted with --prune (deleting an action cascades to its notes).
+- Actions are keyed by (action_number, sub_id); if two rows would get the
+  same key, the load stops before writing anything and names them.
+- Columns owned by the application (milestone status and review fields,
+  entity_long, workstream report) are never overwritten.
+
+Works with PostgreSQL (psycopg, the "postgres" extra) or, for local testing,
+a SQLite file created from the same schema file.
+
+A PostgreSQL database created from an older schema file is brought up to
+date with --migrate, which runs every file in sql/migrations/ in name
+order (each can be run again safely). The loader refuses to load into a
+database whose actions key cannot hold subactions.
+
+Usage:
+    python python/load_sql.py --sqlite un80actions.db --create-schema
+    python python/load_sql.py --postgres "$DATABASE_URL" [--migrate] [--prune]
+"""
+
+from __future__ import annotations
+
+import argparse
+import datetime
+import json
+import os
+import re
+import sqlite3
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+try:
+    import psycopg
+except ImportError:  # only needed for --postgres
+    psycopg = None
+
+ACTIONS_PATH = Path("public/data/actions.json")
+SCHEMA_PATH = Path("sql/schema/un80actions_schema.sql")
+MIGRATIONS_DIR = Path("sql/migrations")
+
+BATCH_SIZE = 500
+
+# Lead names are "<title> <entity>" ("USG DPPA", "ED UNICEF"); these are not
+LEAD_ENTITY_OVERRIDES = {
+    "SG": "EOSG",
+    "CDC": "EOSG",
+    "DSG": "EOSG (ODSG)",
+    "SA Reform": "EOSG (SA)",
+    "USG Policy": "EOSG (USG Policy)",
+    "USG OCT": "UNOCT",
+}
+
+# action_entities placeholders that are not entities
+SKIPPED_ENTITIES = {"N/A"}
+
+MILESTONE_FIELDS = {
+    # milestone_type -> (description, delivery_date, deadline, updates) fields
+    "first": ("first_milestone", None, "first_milestone_deadline", None),
+    "final": ("final_milestone", None, "final_milestone_deadline", None),
+    "upcoming": ("upcoming_milestone", "delivery_date", None, "updates"),
+}
+
+
+def lead_entity(lead: str) -> str:
+    if lead in LEAD_ENTITY_OVERRIDES:
+        return LEAD_ENTITY_OVERRIDES[lead]
+    return lead.split(" ", 1)[-1]
+
+
+def split_entities(text: str | None) -> list[str]:
+    entities = [e.strip() for e in (text or "").split(";")]
+    return list(dict.fromkeys(e for e in entities if e and e not in SKIPPED_ENTITIES))
+
+
+def workstream_id(report: str) -> int:
+    """"WS1" -> 1"""
+    return int(report.removeprefix("WS"))
+
+
+def assign_sub_ids(records: list[dict]) -> list[str]:
+    """"" for each action's main row, "(a)", "(b)", ... for its subactions in order."""
+    seen: dict[int, int] = {}
+    sub_ids = []
+    for record in records:
+        if not record["is_subaction"]:
+            sub_ids.append("")
+            continue
+        n = seen.get(record["action_number"], 0)
+        seen[record["action_number"]] = n + 1
+        sub_ids.append(f"({chr(ord('a') + n)})")
+    return sub_ids
+
+
+def duplicate_actions(records: list[dict], sub_ids: list[str]) -> list[str]:
+    """Rows that share an actions key (action_number, sub_id) with an earlier row.
+
+    actions.id is the action number, so two main rows with the same number
+    (e.g. in two work packages) would silently overwrite each other.
+    """
+    rows: dict[tuple[int, str], list[dict]] = {}
+    for record, sub_id in zip(records, sub_ids):
+        rows.setdefault((record["action_number"], sub_id), []).append(record)
+    return [
+        f"Action {number}{sub_id and ' ' + sub_id}: "
+        + ", ".join(f"{r['report']} / WP {r['work_package_number']}" for r in clashing)
+        for (number, sub_id), clashing in rows.items()
+        if len(clashing) > 1
+    ]
+
+
+def _norm(value):
+    # Compare Postgres dates/booleans with SQLite's strings/integers
+    if isinstance(value, bool):
+        return int(value)
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return value.isoformat()
+    return value
+
+
+@dataclass
+class TableSync:
+    inserted: int = 0
+    updated: int = 0
+    deleted: int = 0
+
+    @property
+    def rows(self) -> int:
+        return self.inserted + self.updated + self.deleted
+
+
+class Database:
+    """The few DB-API operations the loader needs, for SQLite or psycopg."""
+
+    def __init__(self, conn, placeholder: str):
+        self.conn = conn
+        self.placeholder = placeholder
+
+    @classmethod
+    def sqlite(cls, path: Path) -> Database:
+        conn = sqlite3.connect(path)
+        conn.execute("pragma foreign_keys = on")
+        return cls(conn, "?")
+
+    @classmethod
+    def postgres(cls, dsn: str) -> Database:
+        if psycopg is None:
+            raise SystemExit("psycopg is not installed: uv sync --extra postgres")
+        conn = psycopg.connect(dsn)
+        conn.execute("set search_path = un80actions, public")
+        return cls(conn, "%s")
+
+    @property
+    def is_sqlite(self) -> bool:
+        return isinstance(self.conn, sqlite3.Connection)
+
+    def select(self, table: str, columns: tuple[str, ...]) -> list[tuple]:
+        cur = self.conn.cursor()
+        cur.execute(f"select {', '.join(columns)} from {table}")
+        return cur.fetchall()
+
+    def executemany(self, sql: str, rows: list[tuple]) -> None:
+        sql = sql.replace("?", self.placeholder)
+        cur = self.conn.cursor()
+        for start in range(0, len(rows), BATCH_SIZE):
+            cur.executemany(sql, rows[start : start + BATCH_SIZE])
+
+    def create_schema(self, schema_sql: str) -> None:
+        if self.is_sqlite:
+            self.conn.executescript(sqlite_schema(schema_sql))
+        else:
+            self.conn.execute(schema_sql)
+            self.conn.execute("set search_path = un80actions, public")
+
+    def migrate(self, migrations_dir: Path = MIGRATIONS_DIR) -> list[str]:
+        """Run the migration files in name order (PostgreSQL only) and return their names."""
+        if self.is_sqlite:
+            # SQLite databases are only ever created from the current schema file
+            return []
+        names = []
+        for path in sorted(migrations_dir.glob("*.sql")):
+            self.conn.execute(path.read_text(encoding="utf-8"))
+            names.append(path.name)
+        self.conn.execute("set search_path = un80actions, public")
+        return names
+
+    def check_schema(self) -> None:
+        """Stop before loading into a database that predates the migrations."""
+        if self.is_sqlite:
+            return
+        cur = self.conn.cursor()
+        cur.execute(
+            "select pg_get_constraintdef(oid) from pg_constraint "
+            "where conname = 'actions_wp_action_number_key' and conrelid = 'actions'::regclass"
+        )
+        row = cur.fetchone()
+        if row is None or "sub_id" not in row[0]:
+            raise SystemExit(
+                "actions_wp_action_number_key does not include sub_id, so subactions cannot be stored: "
+                "run again with --migrate (see sql/migrations/)"
+            )
+
+    def reset_sequence(self, table: str) -> None:
+        """Move a serial column's sequence past ids the loader assigned itself."""
+        if not self.is_sqlite:
+            self.conn.execute(
+                f"select setval(pg_get_serial_sequence('{table}', 'id'), "
+                f"coalesce((select max(id) from {table}), 0) + 1, false)"
+            )
+
+
+def sqlite_schema(schema_sql: str) -> str:
+    """Translate the Postgres schema file into SQLite DDL (enums become text)."""
+    sql = "\n".join(line for line in schema_sql.splitlines() if not line.strip().startswith("--"))
+    enum_types = re.findall(r"create type (\w+) as enum", sql)
+    statements = []
+    for statement in sql.split(";"):
+        statement = statement.strip()
+        if not statement or re.match(r"(drop schema|create schema|set |create type|comment on)", statement):
+            continue
+        for enum_type in enum_types:
+            statement = re.sub(rf"(\w+\s+){enum_type}\b", r"\1text", statement)
+        statement = re.sub(r"\bserial\b", "integer", statement)
+        statement = statement.replace("default now()", "default current_timestamp")
+        statements.append(statement)
+    return ";\n".join(statements) + ";\n"
+
+
+def sync_table(
+    db: Database,
+    table: str,
+    key_columns: tuple[str, ...],
+    value_columns: tuple[str, ...],
+    desired: dict[tuple, tuple],
+    prune: bool = False,
+    update: bool = True,
+) -> TableSync:
+    """Make *table* contain *desired* (key -> values) by inserting, updating and,
+    with *prune*, deleting only the rows that differ."""
+    n = len(key_columns)
+    existing = {row[:n]: row[n:] for row in db.select(table, key_columns + value_columns)}
+
+    inserts = [key + values for key, values in desired.items() if key not in existing]
+    updates = []
+    if update and value_columns:
+        updates = [
+            values + key
+            for key, values in desired.items()
+            if key in existing and tuple(map(_norm, values)) != tuple(map(_norm, existing[key]))
+        ]
+    deletes = [key for key in existing if key not in desired] if prune else []
+
+    where = " and ".join(f"{c} = ?" for c in key_columns)
+    if deletes:
+        db.executemany(f"delete from {table} where {where}", deletes)
+    if updates:
+        assignments = ", ".join(f"{c} = ?" for c in value_columns)
+        db.executemany(f"update {table} set {assignments} where {where}", updates)
+    if inserts:
+        columns = key_columns + value_columns
+        db.executemany(
+            f"insert into {table} ({', '.join(columns)}) values ({', '.join('?' * len(columns))})",
+            inserts,
+        )
+    return TableSync(len(inserts), len(updates), len(deletes))
+
+
+def id_map(db: Database, table: str, natural_key: tuple[str, ...], wanted) -> dict[tuple, int]:
+    """Existing ids by natural key, plus new ids (after the current max) for *wanted* keys."""
+    rows = db.select(table, ("id",) + natural_key)
+    ids = {tuple(row[1:]): row[0] for row in rows}
+    next_id = max((row[0] for row in rows), default=0) + 1
+    for key in wanted:
+        if key not in ids:
+            ids[key] = next_id
+            next_id += 1
+    return ids
+
+
+def load(db: Database, records: list[dict], prune: bool = False) -> dict[str, TableSync]:
+    """Upsert *records* (actions.json) into the schema in one transaction."""
+    sub_ids = assign_sub_ids(records)
+    duplicates = duplicate_actions(records, sub_ids)
+    if duplicates:
+        raise ValueError(
+            f"{len(duplicates)} action key(s) used by more than one row; nothing was loaded:\n  "
+            + "\n  ".join(duplicates)
+        )
+    result: dict[str, TableSync] = {}
+
+    leads = sorted({lead for r in records for lead in (r["work_package_leads"] or []) + (r["action_leads"] or [])})
+    entities = sorted(
+        {lead_entity(lead) for lead in leads} | {e for r in records for e in split_entities(r["action_entities"])}
+    )
+    work_package_keys = sorted({(workstream_id(r["report"]), r["work_package_number"]) for r in records})
+
+    try:
+        result["un_entities"] = sync_table(
+            db, "un_entities", ("id",), ("entity_long",), {(e,): (None,) for e in entities}, update=False
+        )
+
+        lead_ids = id_map(db, "leads", ("name",), [(lead,) for lead in leads])
+        result["leads"] = sync_table(
+            db,
+            "leads",
+            ("id",),
+            ("entity_id", "name"),
+            {(lead_ids[(lead,)],): (lead_entity(lead), lead) for lead in leads},
+        )
+        db.reset_sequence("leads")
+
+        result["workstreams"] = sync_table(
+            db,
+            "workstreams",
+            ("id",),
+            ("code", "report"),
+            {(ws,): (f"WS{ws}", None) for ws in sorted({k[0] for k in work_package_keys})},
+            update=False,
+        )
+
+        wp_ids = id_map(db, "work_packages", ("workstream_id", "number"), work_package_keys)
+        work_packages = {}
+        for r in records:
+            key = (workstream_id(r["report"]), r["work_package_number"])
+            work_packages.setdefault((wp_ids[key],), key + (r["work_package_name"], r["work_package_goal"]))
+        result["work_packages"] = sync_table(
+            db, "work_packages", ("id",), ("workstream_id", "number", "name", "goal"), work_packages, prune=prune
+        )
+
+        actions, milestones, wp_leads, action_leads, action_entities = {}, {}, {}, {}, {}
+        for r, sub_id in zip(records, sub_ids):
+            action_key = (r["action_number"], sub_id)
+            wp_id = wp_ids[(workstream_id(r["report"]), r["work_package_number"])]
+            actions[action_key] = (
+                wp_id,
+                r["document_paragraph"],
+                r["action_number"],
+                r["indicative_activity"],
+                bool(r["big_ticket"]),
+                bool(r["is_subaction"]),
+                r["sub_action_details"],
+                r["doc_text"],
+                r["public_action_status"],
+            )
+            for milestone_type, fields in MILESTONE_FIELDS.items():
+                values = tuple(r.get(f) if f else None for f in fields)
+                if any(v is not None for v in values):
+                    milestones[action_key + (milestone_type,)] = values
+            for lead in r["work_package_leads"] or []:
+                wp_leads[(wp_id, lead_ids[(lead,)])] = ()
+            for lead in r["action_leads"] or []:
+                action_leads[action_key + (lead_ids[(lead,)],)] = ()
+            for entity in split_entities(r["action_entities"]):
+                action_entities[action_key + (entity,)] = ()
+
+        result["actions"] = sync_table(
+            db,
+            "actions",
+            ("id", "sub_id"),
+            (
+                "work_package_id",
+                "document_paragraph",
+                "action_number",
+                "indicative_activity",
+                "is_big_ticket",
+                "is_subaction",
+                "sub_action_details",
+                "doc_text",
+                "public_action_status",
+            ),
+            actions,
+            prune=prune,
+        )
+
+        milestone_ids = id_map(
+            db, "action_milestones", ("action_id", "action_sub_id", "milestone_type"), milestones
+        )
+        result["action_milestones"] = sync_table(
+            db,
+            "action_milestones",
+            ("id",),
+            ("action_id", "action_sub_id", "milestone_type", "description", "delivery_date", "deadline", "updates"),
+            {(milestone_ids[key],): key + values for key, values in milestones.items()},
+            prune=prune,
+        )
+
+        result["work_package_leads"] = sync_table(
+            db, "work_package_leads", ("work_package_id", "lead_id"), (), wp_leads, prune=True
+        )
+        result["action_leads"] = sync_table(
+            db, "action_leads", ("action_id", "action_sub_id", "lead_id"), (), action_leads, prune=True
+        )
+        result["action_entities"] = sync_table(
+            db, "action_entities", ("action_id", "action_sub_id", "entity_id"), (), action_entities, prune=True
+        )
+    except Exception:
+        db.conn.rollback()
+        raise
+    db.conn.commit()
+    return result
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Load actions.json into the un80actions SQL schema.")
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument("--sqlite", type=Path, metavar="FILE", help="load into a SQLite database file")
+    target.add_argument(
+        "--postgres", metavar="DSN", help="load into PostgreSQL (default: $DATABASE_URL)"
+    )
+    parser.add_argument(
+        "--create-schema",
+        action="store_true",
+        help="(re)create the schema from sql/schema/un80actions_schema.sql first — drops existing data",
+    )
+    parser.add_argument(
+        "--migrate",
+        action="store_true",
+        help="run the sql/migrations/ files first, to update a database created from an older schema",
+    )
+    parser.add_argument(
+        "--prune",
+        action="store_true",
+        help="also delete work packages, actions and milestones no longer in actions.json",
+    )
+    parser.add_argument("--input", type=Path, default=ACTIONS_PATH, help=f"default: {ACTIONS_PATH}")
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None):
+    load_dotenv()
+    args = parse_args(argv)
+
+    if args.sqlite:
+        db = Database.sqlite(args.sqlite)
+    else:
+        dsn = args.postgres or os.getenv("DATABASE_URL")
+        if not dsn:
+            raise SystemExit("Pass --sqlite FILE or --postgres DSN (or set DATABASE_URL)")
+        db = Database.postgres(dsn)
+
+    if args.create_schema:
+        db.create_schema(SCHEMA_PATH.read_text(encoding="utf-8"))
+        db.conn.commit()
+    if args.migrate:
+        for name in db.migrate():
+            print(f"✓ Applied {name}")
+        db.conn.commit()
+    db.check_schema()
+
+    records = json.loads(args.input.read_text(encoding="utf-8"))
+
+    start = time.perf_counter()
+    result = load(db, records, prune=args.prune)
+    elapsed = time.perf_counter() - start
+
+    for table, sync in result.items():
+        print(f"  {table:<20} +{sync.inserted:<4} ~{sync.updated:<4} -{sync.deleted}")
+    rows = sum(sync.rows for sync in result.values())
+    print(
+        f"\n✓ Loaded {len(records)} records: {rows} rows changed in {elapsed:.3f}s "
+        f"({rows / elapsed:,.0f} rows/sec)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""Content-addressed on-disk cache for per-page PDF extraction results."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+
+CACHE_DIR = Path(".cache/pdf_pages")
+MAX_CACHE_BYTES = 16 * 1024 * 1024
+
+# An indirect reference, "12 0 R", in an object's source
+REF_RE = re.compile(rb"\b(\d+) (\d+) R\b")
+
+
+def _object_digest(doc, xref: int, memo: dict[int, bytes], active: set[int]) -> bytes:
+    """Digest of an object by content: its source with references replaced by
+    the digests of the objects they point to, and its raw stream, if any."""
+    if xref in memo:
+        return memo[xref]
+    if xref in active:  # a reference cycle: the enclosing digest covers it
+        return b"cycle"
+    active.add(xref)
+    source = doc.xref_object(xref, compressed=True).encode("latin-1", "replace")
+    h = hashlib.sha256(_resolve_refs(doc, source, memo, active))
+    if doc.xref_is_stream(xref):
+        h.update(b"\0stream\0")
+        h.update(doc.xref_stream_raw(xref) or b"")
+    active.discard(xref)
+    memo[xref] = h.hexdigest().encode()
+    return memo[xref]
+
+
+def _resolve_refs(doc, source: bytes, memo: dict[int, bytes], active: set[int]) -> bytes:
+    return REF_RE.sub(lambda m: b"<" + _object_digest(doc, int(m.group(1)), memo, active) + b">", source)
+
+
+def _page_resources(doc, xref: int) -> bytes:
+    """Source of a page's /Resources, inherited from its page tree parents if needed."""
+    while xref:
+        kind, value = doc.xref_get_key(xref, "Resources")
+        if kind != "null":
+            return value.encode("latin-1", "replace")
+        kind, value = doc.xref_get_key(xref, "Parent")
+        xref = int(value.split()[0]) if kind == "xref" else 0
+    return b""
+
+
+def page_content_hash(page, memo: dict[int, bytes] | None = None) -> str:
+    """SHA-256 of what a page draws, independent of its position in the PDF.
+
+    Covers the content stream(s) and the resources they use: the resource
+    dictionary and, recursively and by content, every object it refers to
+    (form XObjects and their own resources, fonts, images, graphics states).
+    Pass the same *memo* for pages of one document so shared resources are
+    hashed once.
+    """
+    doc = page.parent
+    memo = {} if memo is None else memo
+    h = hashlib.sha256(page.read_contents())
+    h.update(b"\0resources\0")
+    h.update(_resolve_refs(doc, _page_resources(doc, page.xref), memo, set()))
+    return h.hexdigest()
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    writes: int = 0
+    evictions: int = 0
+
+    def __str__(self) -> str:
+        return f"{self.hits} hits, {self.misses} misses, {self.writes} written, {self.evictions} evicted"
+
+
+class PageCache:
+    """JSON results keyed by page content hash and extractor version.
+
+    Entries are single files under *directory*; a hit refreshes the file's
+    mtime, and once the directory exceeds *max_bytes* the least recently
+    used entries are deleted. A disabled cache never reads or writes and
+    counts every lookup as a miss.
+    """
+
+    def __init__(
+        self,
+        version: str,
+        directory: Path = CACHE_DIR,
+        max_bytes: int = MAX_CACHE_BYTES,
+        enabled: bool = True,
+    ):
+        self.version = version
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        self.stats = CacheStats()
+
+    def key(self, content_hash: str) -> str:
+        return hashlib.sha256(f"{self.version}\0{content_hash}".encode()).hexdigest()
+
+    def _path(self, content_hash: str) -> Path:
+        return self.directory / f"{self.key(content_hash)}.json"
+
+    def get(self, content_hash: str):
+        """Cached value for *content_hash*, or None on a miss."""
+        if not self.enabled:
+            self.stats.misses += 1
+            return None
+        path = self._path(content_hash)
+        try:
+            value = json.loads(path.read_text(encoding="utf-8"))
+        except (FileNotFoundError, json.JSONDecodeError):
+            self.stats.misses += 1
+            return None
+        os.utime(path)
+        self.stats.hits += 1
+        return value
+
+    def put(self, content_hash: str, value) -> None:
+        if not self.enabled:
+            return
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self._path(content_hash)
+        # A temp file of its own per writer: concurrent stages and pool
+        # workers may store the same key at the same time
+        with tempfile.NamedTemporaryFile(
+            "w", encoding="utf-8", dir=self.directory, prefix=path.stem, suffix=".tmp", delete=False
+        ) as tmp:
+            tmp.write(json.dumps(value, ensure_ascii=False))
+        os.replace(tmp.name, path)
+        self.stats.writes += 1
+
+    def evict(self) -> None:
+        """Delete least recently used entries until the cache fits in max_bytes."""
+        if not self.enabled or not self.directory.exists():
+            return
+        entries = [(p.stat(), p) for p in self.directory.glob("*.json")]
+        total = sum(st.st_size for st, _ in entries)
+        for st, path in sorted(entries, key=lambda e: e[0].st_mtime):
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= st.st_size
+            self.stats.evictions += 1
@@ -0,0 +1,159 @@
+"""Build and read the page index sidecar for the progress report PDF.
+
+The index records, per page, the work packages whose "Work Package(s) N |"
+header appears on it, whether it has a QUICK SUMMARY table, and a hash of
+its content stream and resources. extract_pdf_tables.py and
+split_progress_pdf.py read it instead of rescanning the PDF, and it is the
+source of each work package's page range.
+
+Usage: python python/pdf_index.py [PDF ...] [--force]
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import re
+from pathlib import Path
+
+from page_cache import page_content_hash
+
+# 2: page hashes cover the page's resources (see page_cache.page_content_hash)
+INDEX_VERSION = 2
+
+WP_HEADER_RE = re.compile(r"Work Packages?\s+([\d,\s]+(?:and\s+\d+)?)\s*\|")
+
+
+def index_path(pdf_path: Path) -> Path:
+    """Sidecar location: actions_progress.pdf -> actions_progress.index.json."""
+    return pdf_path.with_suffix(".index.json")
+
+
+def file_sha256(path: Path) -> str:
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+def header_work_packages(text: str) -> list[int]:
+    """Work package numbers from a page's "Work Package(s) N |" header, if any."""
+    m = WP_HEADER_RE.search(text)
+    if not m:
+        return []
+    return [int(n) for n in re.findall(r"\d+", m.group(1))]
+
+
+def build_index(pdf_path: Path) -> dict:
+    """Scan every page of the PDF once and return its index."""
+    import fitz
+
+    doc = fitz.open(pdf_path)
+    memo: dict[int, bytes] = {}  # shared resources are hashed once
+    pages = []
+    for i in range(doc.page_count):
+        page = doc[i]
+        text = page.get_text()
+        pages.append(
+            {
+                "page": i + 1,
+                "workPackages": header_work_packages(text),
+                "summary": "QUICK SUMMARY" in text.upper(),
+                "hash": page_content_hash(page, memo),
+            }
+        )
+    doc.close()
+    return {
+        "version": INDEX_VERSION,
+        "sha256": file_sha256(pdf_path),
+        "pageCount": len(pages),
+        "pages": pages,
+    }
+
+
+def write_index(index: dict, path: Path) -> None:
+    """Write the index with one page per line, so diffs between editions stay readable."""
+    head = {k: v for k, v in index.items() if k != "pages"}
+    lines = [json.dumps(p, ensure_ascii=False) for p in index["pages"]]
+    body = json.dumps(head, ensure_ascii=False)[:-1]
+    path.write_text(f'{body}, "pages": [\n  ' + ",\n  ".join(lines) + "\n]}\n", encoding="utf-8")
+
+
+def load_index(pdf_path: Path, force: bool = False) -> dict:
+    """Read the sidecar index, rebuilding it if missing or stale for this PDF."""
+    path = index_path(pdf_path)
+    if not force and path.exists():
+        index = json.loads(path.read_text(encoding="utf-8"))
+        if index.get("version") == INDEX_VERSION and index.get("sha256") == file_sha256(pdf_path):
+            return index
+
+    index = build_index(pdf_path)
+    write_index(index, path)
+    print(f"Indexed {pdf_path} ({index['pageCount']} pages) → {path}")
+    return index
+
+
+def summary_pages(index: dict) -> list[tuple[int, list[int]]]:
+    """(0-based page index, work packages) for every QUICK SUMMARY page.
+
+    The current work package carries over from the last header seen on an
+    earlier page; summary pages before the first header are skipped.
+    """
+    current_wp: list[int] = []
+    plan = []
+    for entry in index["pages"]:
+        if entry["workPackages"]:
+            current_wp = entry["workPackages"]
+        if entry["summary"] and current_wp:
+            plan.append((entry["page"] - 1, current_wp))
+    return plan
+
+
+def wp_start_pages(index: dict) -> dict[int, int]:
+    """First (1-based) page on which each work package's header appears."""
+    starts: dict[int, int] = {}
+    for entry in index["pages"]:
+        for wp_num in entry["workPackages"]:
+            starts.setdefault(wp_num, entry["page"])
+    return starts
+
+
+def wp_page_ranges(index: dict) -> dict[int, tuple[int, int]]:
+    """Inclusive (1-based) page range of each work package, in page order.
+
+    A range ends one page before the next work package starts, or at the last
+    page of the PDF. Work packages that share a start page (e.g. WP6 and
+    WP12) each get at least that page.
+    """
+    entries = sorted(wp_start_pages(index).items(), key=lambda x: x[1])
+    ranges = {}
+    for i, (wp_num, start_page) in enumerate(entries):
+        if i + 1 < len(entries):
+            end_page = entries[i + 1][1] - 1
+        else:
+            end_page = index["pageCount"]
+        ranges[wp_num] = (start_page, max(start_page, end_page))
+    return ranges
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument(
+        "pdfs",
+        nargs="*",
+        type=Path,
+        default=[Path("public/data/actions_progress.pdf")],
+        metavar="PDF",
+    )
+    parser.add_argument("--force", action="store_true", help="rebuild even if the index is up to date")
+    args = parser.parse_args(argv)
+
+    for pdf_path in args.pdfs:
+        index = load_index(pdf_path, force=args.force)
+        ranges = wp_page_ranges(index)
+        print(
+            f"✓ {index_path(pdf_path)}: {index['pageCount']} pages, "
+            f"{len(summary_pages(index))} QUICK SUMMARY pages, {len(ranges)} work packages"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,350 @@
+"""Run the data scripts as a dependency-aware pipeline.
+
+Each stage declares the files it reads and writes; its code is its script
+and every module under python/ that the script imports, directly or
+through another module, found by parsing the imports (including the ones
+inside functions), plus any data files listed in Stage.code. A stage depends on every earlier stage that writes one of
+its inputs or outputs, or reads one of its outputs. Stages whose
+dependencies are done run concurrently, each as its own process.
+
+A stage is skipped when it is up to date: the SHA-256 of its inputs, code
+and outputs, and its command, all match what was recorded in STATE_PATH
+after its last successful run. Files a stage rewrites in place
+(actions_progress.json for extract) are recorded as they were after the run,
+so they only count as changed when something else edits them.
+
+prepare and extract run with --no-derived; the bundle, stats, search
+index and products timeline are separate stages, so e.g. a new raw export
+rebuilds them once, after prepare, instead of once per script.
+
+Usage:
+    python python/pipeline.py [STAGE ...] [--force] [--dry-run] [--workers N] [--report-dir DIR]
+"""
+
+from __future__ import annotations
+
+import argparse
+import ast
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from functools import cache
+from pathlib import Path
+
+PYTHON_DIR = Path("python")
+STATE_PATH = Path("data/pipeline_state.json")
+
+STATE_VERSION = 1
+
+
+@dataclass(frozen=True)
+class Stage:
+    name: str
+    command: tuple[str, ...]  # script under python/ and its arguments
+    inputs: tuple[str, ...]
+    outputs: tuple[str, ...]  # files or directories
+    code: tuple[str, ...] = ()  # other files under python/ it reads (imported modules are found)
+    optional: bool = False  # a missing input skips the stage instead of failing
+    reports: bool = False  # takes --report (see instrument.py)
+
+
+STAGES = [
+    Stage(
+        "prepare",
+        ("prepare_actions_data.py", "--no-derived"),
+        # The schema defines the allowed public_action_status values
+        inputs=("data/input/actions_raw.json", "sql/schema/un80actions_schema.sql"),
+        outputs=(
+            "public/data/actions.json",
+            "public/data/last-updated.json",
+            "public/data/actions-changelog.json",
+        ),
+        code=("validation_rules.json",),
+        reports=True,
+    ),
+    Stage(
+        "extract",
+        ("extract_pdf_tables.py", "--no-derived"),
+        inputs=("data/input/actions_progress.pdf", "public/data/actions_progress.json"),
+        outputs=("public/data/actions_progress.json", "data/input/actions_progress.index.json"),
+        # The progress PDF is only dropped into data/input/ for a new edition
+        optional=True,
+        reports=True,
+    ),
+    Stage(
+        "editions",
+        ("progress_editions.py",),
+        # The per-edition .index.json/.progress.json sidecars are written next to the PDFs
+        inputs=("data/input/editions",),
+        outputs=("public/data/progress_history.json",),
+        optional=True,
+        reports=True,
+    ),
+    Stage(
+        "products_timeline",
+        ("products_timeline.py",),
+        inputs=("public/data/actions_progress.json",),
+        outputs=("public/data/products_timeline.json",),
+        code=("products_timeline_overrides.json",),
+    ),
+    Stage(
+        "split",
+        ("split_progress_pdf.py",),
+        inputs=("public/data/actions_progress.pdf",),
+        outputs=("public/data/progress", "public/data/actions_progress.index.json"),
+    ),
+    Stage(
+        "bundle",
+        ("bundle.py",),
+        inputs=("public/data/actions.json", "public/data/actions_progress.json"),
+        outputs=("public/data/bundle",),
+    ),
+    Stage(
+        "stats",
+        ("stats.py",),
+        # The lead/entity normalization table shared with the frontend
+        inputs=("public/data/actions.json", "src/lib/nameNormalization.json"),
+        outputs=("public/data/stats.json",),
+    ),
+    Stage(
+        "search_index",
+        ("search_index.py",),
+        inputs=("public/data/actions.json", "public/data/actions_progress.json"),
+        outputs=("public/data/search_index.json",),
+    ),
+]
+
+
+def dependencies(stages: list[Stage]) -> dict[str, set[str]]:
+    """Stage name -> names of the earlier stages it has to wait for."""
+    deps: dict[str, set[str]] = {}
+    for i, stage in enumerate(stages):
+        deps[stage.name] = set()
+        for earlier in stages[:i]:
+            if (
+                set(earlier.outputs) & set(stage.inputs + stage.outputs)
+                or set(earlier.inputs) & set(stage.outputs)
+            ):
+                deps[stage.name].add(earlier.name)
+    return deps
+
+
+def with_downstream(names: list[str], deps: dict[str, set[str]]) -> set[str]:
+    selected = set(names)
+    for name in deps:  # deps is in stage order
+        if deps[name] & selected:
+            selected.add(name)
+    return selected
+
+
+def with_upstream(names: list[str], deps: dict[str, set[str]]) -> set[str]:
+    selected: set[str] = set()
+    todo = list(names)
+    while todo:
+        name = todo.pop()
+        if name not in selected:
+            selected.add(name)
+            todo.extend(deps[name])
+    return selected
+
+
+def path_digest(path: Path) -> str | None:
+    """SHA-256 of a file, or of the names and contents of a directory's files; None if missing."""
+    if path.is_file():
+        return hashlib.sha256(path.read_bytes()).hexdigest()
+    if path.is_dir():
+        h = hashlib.sha256()
+        for child in sorted(p for p in path.rglob("*") if p.is_file()):
+            h.update(child.relative_to(path).as_posix().encode() + b"\0")
+            h.update(hashlib.sha256(child.read_bytes()).digest())
+        return h.hexdigest()
+    return None
+
+
+@cache
+def direct_imports(module: str) -> frozenset[str]:
+    """Modules under python/ (as file names) that *module* imports anywhere in its code."""
+    imported = set()
+    for node in ast.walk(ast.parse((PYTHON_DIR / module).read_text(encoding="utf-8"), module)):
+        if isinstance(node, ast.Import):
+            names = [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom) and node.level == 0 and node.module:
+            names = [node.module]
+        else:
+            continue
+        imported.update(f"{name.split('.')[0]}.py" for name in names)
+    return frozenset(name for name in imported if (PYTHON_DIR / name).is_file())
+
+
+def local_imports(module: str) -> set[str]:
+    """*module* and every module under python/ it imports, directly or not (cycles included)."""
+    found, todo = set(), [module]
+    while todo:
+        name = todo.pop()
+        if name not in found:
+            found.add(name)
+            todo.extend(direct_imports(name))
+    return found
+
+
+def code_files(stage: Stage) -> list[str]:
+    """The stage's script, the modules it imports and its other code files."""
+    return sorted(local_imports(stage.command[0]) | set(stage.code))
+
+
+def fingerprint(stage: Stage) -> dict:
+    code = [(PYTHON_DIR / module).as_posix() for module in code_files(stage)]
+    return {
+        "command": list(stage.command),
+        "inputs": {p: path_digest(Path(p)) for p in [*stage.inputs, *code]},
+        "outputs": {p: path_digest(Path(p)) for p in stage.outputs},
+    }
+
+
+def load_state() -> dict:
+    if STATE_PATH.exists():
+        state = json.loads(STATE_PATH.read_text(encoding="utf-8"))
+        if state.get("version") == STATE_VERSION:
+            return state
+    return {"version": STATE_VERSION, "stages": {}}
+
+
+def save_state(state: dict) -> None:
+    STATE_PATH.parent.mkdir(parents=True, exist_ok=True)
+    state["stages"] = dict(sorted(state["stages"].items()))
+    STATE_PATH.write_text(json.dumps(state, indent=2) + "\n", encoding="utf-8")
+
+
+def run_stage(stage: Stage, report_dir: Path | None) -> tuple[int, str, float]:
+    """Run one stage in its own process; return (exit code, output, seconds)."""
+    command = [sys.executable, str(PYTHON_DIR / stage.command[0]), *stage.command[1:]]
+    if report_dir is not None and stage.reports:
+        command += ["--report", str(report_dir / f"{stage.name}.json"), "--no-trace-memory"]
+    start = time.perf_counter()
+    completed = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+    return completed.returncode, completed.stdout, time.perf_counter() - start
+
+
+def run(
+    names: list[str] | None = None,
+    force: bool = False,
+    dry_run: bool = False,
+    workers: int | None = None,
+    report_dir: Path | None = None,
+    runner=run_stage,
+) -> bool:
+    """Run the selected stages (and what they depend on); return True if none failed.
+
+    *runner* runs one stage, like run_stage (watch.py runs them in-process).
+    """
+    by_name = {stage.name: stage for stage in STAGES}
+    deps = dependencies(STAGES)
+    selected = with_upstream(names, deps) if names else set(by_name)
+    state = load_state()
+
+    ran: set[str] = set()  # ran (or would run, with --dry-run) this time
+    finished: set[str] = set()
+    failed: set[str] = set()
+    blocked: set[str] = set()  # not run because a dependency failed
+    running = {}
+    total = time.perf_counter()
+
+    def start_ready(pool) -> None:
+        for stage in STAGES:
+            name = stage.name
+            if name not in selected or name in finished or name in running.values():
+                continue
+            if not (deps[name] & selected) <= finished:
+                continue
+            if deps[name] & (failed | blocked):
+                upstream = ", ".join(sorted(deps[name] & (failed | blocked)))
+                print(f"⏭️  {name}: not run, {upstream} did not finish")
+                blocked.add(name)
+                finished.add(name)
+                continue
+            missing = [p for p in stage.inputs if not Path(p).exists()]
+            if missing:
+                finished.add(name)
+                if stage.optional:
+                    print(f"⏭️  {name}: skipped, no {', '.join(missing)}")
+                else:
+                    print(f"❌ {name}: missing {', '.join(missing)}")
+                    failed.add(name)
+                continue
+            upstream_ran = dry_run and deps[name] & ran
+            if not force and not upstream_ran and state["stages"].get(name) == fingerprint(stage):
+                print(f"✓ {name}: up to date")
+                finished.add(name)
+                continue
+            if dry_run:
+                print(f"▶ {name}: would run")
+                ran.add(name)
+                finished.add(name)
+                continue
+            print(f"▶ {name}: running")
+            running[pool.submit(runner, stage, report_dir)] = name
+
+    with ThreadPoolExecutor(max_workers=workers or os.cpu_count() or 1) as pool:
+        start_ready(pool)
+        while running:
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                code, output, seconds = future.result()
+                print(output.rstrip("\n"))
+                if code == 0:
+                    print(f"✓ {name}: done in {seconds:.2f}s\n")
+                    state["stages"][name] = fingerprint(by_name[name])
+                    save_state(state)
+                    ran.add(name)
+                else:
+                    print(f"❌ {name}: failed (exit {code}) after {seconds:.2f}s\n")
+                    failed.add(name)
+                finished.add(name)
+            start_ready(pool)
+
+    verb = "would run" if dry_run else "ran"
+    print(
+        f"\nPipeline: {verb} {len(ran)}, skipped {len(selected) - len(ran) - len(failed) - len(blocked)}, "
+        f"failed {len(failed)}, blocked {len(blocked)} ({time.perf_counter() - total:.2f}s)"
+    )
+    return not (failed or blocked)
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument(
+        "stages",
+        nargs="*",
+        metavar="STAGE",
+        help="stages to bring up to date, with their dependencies (default: all of "
+        + ", ".join(stage.name for stage in STAGES)
+        + ")",
+    )
+    parser.add_argument("--force", action="store_true", help="run the selected stages even if up to date")
+    parser.add_argument("--dry-run", action="store_true", help="only print what would run")
+    parser.add_argument("--workers", type=int, metavar="N", help="stages to run at once (default: CPU count)")
+    parser.add_argument(
+        "--report-dir",
+        type=Path,
+        metavar="DIR",
+        help="write a run report (see instrument.py) per stage that supports one into DIR",
+    )
+    args = parser.parse_args(argv)
+    unknown = set(args.stages) - {stage.name for stage in STAGES}
+    if unknown:
+        parser.error(f"unknown stage(s): {', '.join(sorted(unknown))}")
+
+    ok = run(args.stages, force=args.force, dry_run=args.dry_run, workers=args.workers, report_dir=args.report_dir)
+    raise SystemExit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,104 +1,89 @@
-import json
-from datetime import datetime, timezone
-from pathlib import Path
+"""Clean the Power Automate actions export into public/data/actions.json.
 
-import pandas as pd
-
-# Paths
-input_path = Path("data/input/actions_raw.json")
-output_path = Path("public/data/actions.json")
+Each step is a function so other scripts can reuse it; pandas (and the
+modules that write derived outputs) are only imported by the steps that
+need them, so `validate` runs without loading pandas at all.
 
-# Load JSON
-with open(input_path, "r", encoding="utf-8") as f:
-    data = json.load(f)
+Usage:
+    python python/prepare_actions_data.py [--stream] [--force] [--no-validate]
+    python python/prepare_actions_data.py validate [--input PATH]
+"""
 
+from __future__ import annotations
 
-# Convert to DataFrame
-df = pd.DataFrame(data)
-
-print(f"\nLoaded {len(df)} records from {input_path}")
-assert len(df) == 90
+import argparse
+import json
+import time
+from pathlib import Path
 
-# Replace empty strings with None for proper null handling
-df = df.replace("", None)
+from instrument import add_arguments, configure, finish, span
+from validation import (
+    OVERRIDE_HELP,
+    RULES_PATH,
+    check_frame,
+    count_mismatches,
+    empty_columns,
+    failure_message,
+    load_rules,
+    override_conflicts,
+    summarize_records,
+    violation_messages,
+)
 
-# Remove empty rows (rows where all values are NaN or None)
-df = df.dropna(how="all")
+# Paths
+INPUT_PATH = Path("data/input/actions_raw.json")
+OUTPUT_PATH = Path("public/data/actions.json")
 
-# Assert no column is completely null (indicates error on Power Automate export)
-for col in df.columns:
-    if df[col].isnull().all():
-        raise AssertionError(
-            f"Power Automate Issue: Column '{col}' is completely null."
-        )
 
-##############################################################################
+def write_derived_outputs(output_path: Path = OUTPUT_PATH):
+    """Files generated from actions.json for the dashboard."""
+    from bundle import write_bundle
+    from search_index import write_search_index
+    from stats import write_stats
 
-# Process date columns
-date_columns = [
-    "first_milestone_deadline",
-    "final_milestone_deadline",
-    "delivery_date",
-]  # Add other date columns here if needed
+    # Minified per-work-package bundle (see bundle.py)
+    with span("bundle"):
+        write_bundle(actions_path=output_path)
+    # Counts and facet indexes for the filters (see stats.py)
+    with span("stats"):
+        write_stats(actions_path=output_path, stats_path=output_path.parent / "stats.json")
+    # Full-text search index (see search_index.py)
+    with span("search_index"):
+        write_search_index(actions_path=output_path, index_path=output_path.parent / "search_index.json")
 
-for col in date_columns:
-    if col in df.columns:
-        # Convert to numeric first, coercing non-numeric to NaN
-        df[col] = pd.to_numeric(df[col], errors="coerce")
 
-        # Convert Excel dates to datetime
-        df[col] = pd.to_datetime(
-            df[col], origin="1899-12-30", unit="D", errors="coerce"
-        )
+def load_frame(input_path: Path = INPUT_PATH):
+    """The raw export as a DataFrame, one row per record."""
+    import pandas as pd
 
-        # Format as ISO 8601 date string (YYYY-MM-DD)
-        df[col] = df[col].dt.strftime("%Y-%m-%d").fillna("")
+    # Load JSON
+    with open(input_path, "r", encoding="utf-8") as f:
+        data = json.load(f)
 
-# Process list columns (semicolon-separated strings)
-list_columns = ["work_package_leads", "action_leads", "un_budget", "ms_body"]
+    # Convert to DataFrame
+    return pd.DataFrame(data)
 
-for col in list_columns:
-    if col in df.columns:
-        df[col] = df[col].apply(
-            lambda x: [item.strip() for item in str(x).split(";") if item.strip()]
-            if pd.notna(x) and str(x).strip()
-            else []
-        )
 
-# Process boolean columns (Yes/No to true/false)
-boolean_columns = ["big_ticket"]
-
-for col in boolean_columns:
-    if col in df.columns:
-        df[col] = df[col].apply(
-            lambda x: True
-            if str(x).strip().lower() == "yes"
-            else False
-            if str(x).strip().lower() == "no"
-            else None
-        )
+def clean_actions(df):
+    """Drop empty rows and clean every column.
 
-# Clean all string columns (squish whitespace, strip, handle nulls)
-for col in df.columns:
-    # Skip columns we've already processed or that aren't object type
-    if (
-        col not in date_columns
-        and col not in list_columns
-        and col not in boolean_columns
-        and df[col].dtype == "object"
-    ):
-        df[col] = df[col].apply(
-            lambda x: " ".join(str(x).split())
-            if pd.notna(x) and str(x).strip()
-            else None
-        )
+    Returns an ActionsFrame (see actions_frame.py): the cleaned columns in
+    compact types, which only become strings and lists again on export.
+    """
+    from actions_frame import clean_typed
 
-# Replace empty strings with None for proper null handling in JSON
-df = df.replace("", None)
+    # Replace empty strings with None for proper null handling
+    df = df.replace("", None)
 
-##############################################################################
+    # Remove empty rows (rows where all values are NaN or None)
+    df = df.dropna(how="all")
 
-## Data Validation ##
+    # Clean every column according to its type (see cleaning.COLUMN_TYPES and
+    # actions_frame.COLUMN_KINDS): Excel serial dates -> datetimes, semicolon-
+    # separated lists -> list ids, Yes/No -> booleans, low-cardinality text ->
+    # categoricals and whitespace squished in all other string columns, with
+    # blanks as nulls (each type is its own span, e.g. "clean:date")
+    return clean_typed(df)
 
 
 # Identify subactions (actions that should not be displayed on dashboard)
@@ -106,191 +91,244 @@ df = df.replace("", None)
 # We keep the first occurrence (or one with document_paragraph if any has it) and mark others as subactions
 # IMPORTANT: This must be done BEFORE sorting to preserve the original order within each action group
 def identify_subactions(df):
-    df = df.copy()
-    df["is_subaction"] = False
-
-    # Group by action_number, work_package_number, and report
-    grouped = df.groupby(["action_number", "work_package_number", "report"])
-
-    for (action_num, wp_num, report), group in grouped:
-        if len(group) > 1:
-            # Multiple entries for the same action - identify which ones are subactions
-            # Priority: keep entries with document_paragraph, then keep first occurrence (by original index order)
-            group_indices = group.index.tolist()
-
-            # Check if any have document_paragraph
-            has_doc_para = group["document_paragraph"].notna() & (
-                group["document_paragraph"].astype(str).str.strip() != ""
-            )
-
-            if has_doc_para.any():
-                # Keep entries with document_paragraph, mark others as subactions
-                keep_indices = group[has_doc_para].index.tolist()
-                subaction_indices = [
-                    idx for idx in group_indices if idx not in keep_indices
-                ]
-            else:
-                # No document_paragraph in any - keep first (by original index order), mark rest as subactions
-                keep_index = group_indices[0]
-                subaction_indices = group_indices[1:]
-
-            # Mark subactions
-            df.loc[subaction_indices, "is_subaction"] = True
-
-    return df["is_subaction"]
-
-
-# Add is_subaction column BEFORE sorting to preserve original order
-df["is_subaction"] = identify_subactions(df)
-
-# Sort by work_package_number then action_number ascending
-# Convert sorting columns to integers before sorting
-df["work_package_number"] = (
-    pd.to_numeric(df["work_package_number"], errors="coerce").fillna(0).astype(int)
-)
-df["action_number"] = (
-    pd.to_numeric(df["action_number"], errors="coerce").fillna(0).astype(int)
-)
+    keys = ["action_number", "work_package_number", "report"]
 
-df = df.sort_values(by=["work_package_number", "action_number"], ascending=[True, True])
+    # Rows with a missing key belong to no group and are never subactions
+    in_group = df[keys].notna().all(axis=1)
 
-# Debug: Print subaction detection results
-num_subactions = df["is_subaction"].sum()
-print(
-    f"\n📊 Subaction detection: {num_subactions} subactions found out of {len(df)} total actions"
-)
+    has_doc_para = df["document_paragraph"].notna() & (
+        df["document_paragraph"].astype(str).str.strip() != ""
+    )
 
-# If we didn't detect exactly 5 subactions, show which ones were detected for debugging
-if num_subactions != 5:
-    print(f"⚠️  Warning: Expected 5 subactions but detected {num_subactions}")
-    if num_subactions > 0:
-        print("Detected subactions:")
-        subactions = df[df["is_subaction"]]
-        for idx, row in subactions.iterrows():
-            print(
-                f"  - Action {row['action_number']} in WP {row['work_package_number']} ({row['report']})"
-            )
-
-# Expected counts from UI DataCards (excluding subactions)
-EXPECTED_WORKSTREAMS = 3
-EXPECTED_WORK_PACKAGES = 31
-EXPECTED_ACTIONS = 85  # 90 total - 5 subactions
-EXPECTED_LEADS = 34
-
-# Calculate actual counts (excluding subactions for actions count)
-df_non_subactions = df[~df["is_subaction"]]
-actual_workstreams = df["report"].nunique()
-actual_work_packages = df["work_package_number"].nunique()
-actual_actions = len(df_non_subactions)  # Count only non-subactions
-actual_leads = df["work_package_leads"].explode().nunique()
-
-# Validate counts
-validation_errors = []
-
-if actual_workstreams != EXPECTED_WORKSTREAMS:
-    validation_errors.append(
-        f"Workstreams count mismatch! Expected {EXPECTED_WORKSTREAMS}, got {actual_workstreams}"
+    # Per-row flags computed over each group in one pass each:
+    # does any row in the group have a document_paragraph, and is this row
+    # the first occurrence of the group in original order?
+    group_has_doc_para = (
+        has_doc_para.groupby([df[k] for k in keys], sort=False, observed=True)
+        .transform("any")
+        .eq(True)
     )
+    is_first = df.groupby(keys, sort=False, observed=True).cumcount() == 0
 
-if actual_work_packages != EXPECTED_WORK_PACKAGES:
-    validation_errors.append(
-        f"Work Packages count mismatch! Expected {EXPECTED_WORK_PACKAGES}, got {actual_work_packages}"
+    # Keep entries with document_paragraph if the group has any, otherwise
+    # keep the first occurrence; everything else is a subaction
+    is_subaction = in_group & (
+        (group_has_doc_para & ~has_doc_para) | (~group_has_doc_para & ~is_first)
     )
+    return is_subaction.rename("is_subaction")
 
-if actual_actions != EXPECTED_ACTIONS:
-    validation_errors.append(
-        f"Actions count mismatch! Expected {EXPECTED_ACTIONS}, got {actual_actions}"
+
+def sort_actions(df):
+    """Sort by work_package_number then action_number ascending."""
+    import pandas as pd
+
+    # Convert sorting columns to integers before sorting
+    df["work_package_number"] = (
+        pd.to_numeric(df["work_package_number"], errors="coerce").fillna(0).astype(int)
+    )
+    df["action_number"] = (
+        pd.to_numeric(df["action_number"], errors="coerce").fillna(0).astype(int)
     )
 
-if actual_leads != EXPECTED_LEADS:
-    validation_errors.append(
-        f"UN System Leaders count mismatch! Expected {EXPECTED_LEADS}, got {actual_leads}"
+    return df.sort_values(by=["work_package_number", "action_number"], ascending=[True, True])
+
+
+def print_subactions(df) -> None:
+    # Debug: Print subaction detection results
+    num_subactions = df["is_subaction"].sum()
+    print(
+        f"\n📊 Subaction detection: {num_subactions} subactions found out of {len(df)} total actions"
     )
 
-# Raise error if validation fails
-if validation_errors:
-    error_message = "\n" + "=" * 60 + "\n"
-    error_message += "DATA VALIDATION FAILED\n"
-    error_message += "=" * 60 + "\n"
-    for error in validation_errors:
-        error_message += f"❌ {error}\n"
-    error_message += "=" * 60
-    raise AssertionError(error_message)
-
-print("\n✓ All data counts match expected values")
-
-##############################################################################
-
-## Manual Override Guard ##
-
-# Statuses that were set by hand in public/data/actions.json because the Excel
-# workbook had not caught up. Regenerating from the workbook would silently
-# revert them, so fail loudly instead of writing the file.
-# Remove an entry once the workbook agrees (the check then passes by itself) or
-# once the override is no longer wanted.
-MANUAL_STATUS_OVERRIDES = {
-    84: "Decision taken",
-    86: "Decision taken",
-    87: "Decision taken",
-}
-
-override_conflicts = []
-
-for action_number, expected_status in MANUAL_STATUS_OVERRIDES.items():
-    rows = df_non_subactions[df_non_subactions["action_number"] == action_number]
-    if rows.empty:
-        override_conflicts.append(
-            f"Action {action_number}: overridden here but missing from the workbook export"
+    # If we didn't detect exactly 5 subactions, show which ones were detected for debugging
+    if num_subactions != 5:
+        print(f"⚠️  Warning: Expected 5 subactions but detected {num_subactions}")
+        if num_subactions > 0:
+            print("Detected subactions:")
+            subactions = df[df["is_subaction"]]
+            for idx, row in subactions.iterrows():
+                print(
+                    f"  - Action {row['action_number']} in WP {row['work_package_number']} ({row['report']})"
+                )
+
+
+def check_rules(frame, records: int, empty: list[str], validate: bool = True) -> None:
+    """Check an ActionsFrame (with is_subaction) against validation_rules.json.
+
+    *empty* are the completely null columns of the raw export. Every
+    violation is reported at once; completely null columns, "notNull" and
+    "enums" are checked even without *validate*.
+    """
+    rules = load_rules(RULES_PATH)
+    problems, conflicts, _ = check_frame(frame.df, rules, empty, frame.lists, records, validate)
+    if problems or conflicts:
+        title = "DATA VALIDATION FAILED" if problems else "MANUAL OVERRIDE CONFLICT"
+        raise AssertionError(failure_message(title, problems + conflicts, OVERRIDE_HELP if conflicts else None))
+
+    if not validate:
+        print("\n⚠️  Validation skipped (--no-validate)")
+        return
+    print("\n✓ All data counts match expected values")
+    if rules.overrides:
+        print(
+            f"\n✓ Workbook agrees with all {len(rules.overrides)} manual status "
+            f"override(s) — they are now redundant and can be deleted from {RULES_PATH}"
         )
-        continue
-    for actual_status in rows["public_action_status"]:
-        if actual_status != expected_status:
-            override_conflicts.append(
-                f"Action {action_number}: workbook says {actual_status!r}, "
-                f"repo override says {expected_status!r}"
-            )
-
-if override_conflicts:
-    error_message = "\n" + "=" * 60 + "\n"
-    error_message += "MANUAL OVERRIDE CONFLICT\n"
-    error_message += "=" * 60 + "\n"
-    for conflict in override_conflicts:
-        error_message += f"❌ {conflict}\n"
-    error_message += "=" * 60 + "\n"
-    error_message += (
-        "public/data/actions.json was edited by hand and regenerating from the\n"
-        "workbook would revert it. Nothing has been written. Resolve by either:\n"
-        "  - setting public_action_status in the Excel workbook (preferred), or\n"
-        "  - deleting the entry from MANUAL_STATUS_OVERRIDES in this script,\n"
-        "    which lets the workbook win."
+
+
+def export(frame, output_path: Path = OUTPUT_PATH, force: bool = False) -> None:
+    from delta import publish
+
+    # Ensure output folder exists
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+
+    # Save cleaned JSON next to the output, then only replace actions.json (and
+    # stamp last-updated.json) if the records actually changed
+    # (written in batches, byte-identical to DataFrame.to_json of the object columns)
+    tmp_output = output_path.with_suffix(".json.tmp")
+    frame.to_json(tmp_output)
+    publish(tmp_output, output_path, force=force)
+
+
+def prepare(
+    input_path: Path = INPUT_PATH,
+    output_path: Path = OUTPUT_PATH,
+    force: bool = False,
+    validate: bool = True,
+):
+    """Clean, validate and write the export in memory; return the final ActionsFrame."""
+    with span("load") as stage:
+        df = load_frame(input_path)
+        stage.count(rows=len(df))
+
+    print(f"\nLoaded {len(df)} records from {input_path}")
+    records = len(df)
+    # From the raw export, as the --stream and validate paths see it
+    empty = empty_columns(df)
+
+    with span("clean", rows=len(df)):
+        frame = clean_actions(df)
+    del df
+
+    # Add is_subaction column BEFORE sorting to preserve original order
+    with span("subactions", rows=len(frame)):
+        frame.df["is_subaction"] = identify_subactions(frame.df)
+
+    # Before sorting, while missing work package and action numbers are still null
+    with span("validation", rows=len(frame)):
+        check_rules(frame, records, empty, validate)
+
+    with span("sort", rows=len(frame)):
+        frame.df = sort_actions(frame.df)
+
+    print_subactions(frame.df)
+
+    with span("export", rows=len(frame)):
+        export(frame, output_path, force)
+
+    num_subactions = frame.df["is_subaction"].sum()
+    print(
+        f"✓ Processed {len(frame)} records ({len(frame) - num_subactions} actions, {num_subactions} subactions)"
     )
-    raise AssertionError(error_message)
+    return frame
+
+
+def validate_export(input_path: Path = INPUT_PATH) -> None:
+    """Check the raw export against validation_rules.json in pure Python (no pandas).
+
+    Raises SystemExit with the boxed message if any check fails.
+    """
+    from stream_actions import iter_json_array
 
-if MANUAL_STATUS_OVERRIDES:
+    start = time.perf_counter()
+    rules = load_rules(RULES_PATH)
+    summary = summarize_records(iter_json_array(input_path), rules)
+
+    problems = []
+    if summary.records != rules.records:
+        problems.append(f"Records count mismatch! Expected {rules.records}, got {summary.records}")
+    problems += [
+        f"Power Automate Issue: Column '{col}' is completely null." for col in summary.empty_columns
+    ]
+    problems += violation_messages(summary.violations)
+    problems += count_mismatches(rules, summary.counts)
+    conflicts = override_conflicts(rules, summary.override_statuses)
+
+    counts = ", ".join(f"{count} {name}" for name, count in summary.counts.items())
     print(
-        f"\n✓ Workbook agrees with all {len(MANUAL_STATUS_OVERRIDES)} manual status "
-        "override(s) — they are now redundant and can be deleted from this script"
+        f"Checked {summary.records} records from {input_path}: {summary.subactions} subactions; "
+        f"{counts} ({time.perf_counter() - start:.2f}s)"
+    )
+    if problems or conflicts:
+        title = "DATA VALIDATION FAILED" if problems else "MANUAL OVERRIDE CONFLICT"
+        raise SystemExit(failure_message(title, problems + conflicts, OVERRIDE_HELP if conflicts else None))
+    print("✓ All data counts match expected values and no manual override conflicts")
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Clean the actions export into actions.json")
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="parse and clean the export in chunks with bounded memory (same output)",
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=10_000,
+        metavar="N",
+        help="records per chunk with --stream (default: 10000)",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="replace actions.json and stamp last-updated.json even if no record changed",
+    )
+    parser.add_argument(
+        "--no-validate",
+        dest="validate",
+        action="store_false",
+        help="skip the expected counts and manual override checks (synthetic or historical exports)",
+    )
+    parser.add_argument(
+        "--no-derived",
+        dest="derived",
+        action="store_false",
+        help="only write actions.json, not the bundle, stats and search index (pipeline.py runs those)",
     )
+    add_arguments(parser)
 
-##############################################################################
+    commands = parser.add_subparsers(dest="command")
+    validate = commands.add_parser(
+        "validate",
+        help="only check counts and manual overrides of the raw export (fast, no pandas)",
+    )
+    validate.add_argument("--input", type=Path, default=INPUT_PATH, help=f"default: {INPUT_PATH}")
+    return parser.parse_args(argv)
 
-## Export ##
 
-# Ensure output folder exists
-output_path.parent.mkdir(parents=True, exist_ok=True)
+def main(argv: list[str] | None = None):
+    args = parse_args(argv)
+    if args.command == "validate":
+        validate_export(args.input)
+        return
 
-# Save cleaned JSON
-df.to_json(output_path, orient="records", force_ascii=False, indent=2)
+    # Stage timings and memory (--report) and cProfile of one stage (--profile)
+    configure(report=args.report, profile=args.profile, memory=args.trace_memory)
 
-# Write last-updated timestamp for the dashboard header
-last_updated_path = output_path.parent / "last-updated.json"
-last_updated_path.write_text(
-    json.dumps({"lastUpdated": datetime.now(timezone.utc).isoformat()}),
-    encoding="utf-8",
-)
-print(f"✓ Last updated written to {last_updated_path.resolve()}")
+    if args.stream:
+        from stream_actions import prepare_streaming
 
-print(f"✓ Cleaned JSON written to {output_path.resolve()}")
-print(
-    f"✓ Processed {len(df)} records ({len(df_non_subactions)} actions, {df['is_subaction'].sum()} subactions)"
-)
+        prepare_streaming(
+            INPUT_PATH, OUTPUT_PATH, chunk_size=args.chunk_size, force=args.force, validate=args.validate
+        )
+    else:
+        prepare(INPUT_PATH, OUTPUT_PATH, force=args.force, validate=args.validate)
+
+    if args.derived:
+        write_derived_outputs(OUTPUT_PATH)
+    finish()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,263 @@
+"""Products timeline for the dashboard (public/data/products_timeline.json).
+
+Built in one pass over the writtenProducts of every summaryTable row in
+actions_progress.json, as extracted by extract_pdf_tables.py. Each product
+string, e.g. "Secretary-General's information brief (July)", is normalized
+(apostrophes, whitespace, words hyphenated across a line break, the known
+extraction errors in "fixes") and gets:
+
+- a month: the first month named in its parentheses ("Jun–Dec" -> June,
+  "starting May" -> May), else "Later or TBD"
+- a category: the first of CATEGORY_PATTERNS that matches it, else
+  "reports"
+
+Reports apply to their whole work package: they are listed by product text,
+with the work packages that name them and no action numbers. Information
+briefs and operational tools are listed by work package name, with the
+action numbers of their rows and the product text as a note when it says
+more than the generic label.
+
+The wording in the summary tables is not what the dashboard shows, so the
+curated choices live in OVERRIDES_PATH:
+
+- fixes: text replacements applied to every product (extraction errors,
+  spelling variants of the same product)
+- labels: work package number -> label of its briefs and tools, instead of
+  the work package name
+- products: overrides of one product (its text without the month), for
+  every work package or only the given workPackage (and action). They can
+  set its label, category, month or note (null: no note), replace it with
+  other product strings, or drop it
+- additions: entries with no product in the summary tables; skipped once
+  the extraction finds a product for all their actions, so an edition that
+  lists it does not show it twice
+
+An override that matches no product is reported, so stale ones get removed.
+
+The file has the same entries twice:
+
+- categories: category -> month -> entries, for the timeline view
+- workPackages: work package number -> its entries (with category and
+  month), so the work package card and the filters look up one work
+  package instead of scanning the timeline
+
+Months follow MONTHS, entries and their numbers are sorted, so the output
+only changes when the extracted products do.
+
+Usage:
+    python python/products_timeline.py
+"""
+
+from __future__ import annotations
+
+import json
+import re
+from pathlib import Path
+
+from bundle import write_if_changed
+from extract_pdf_tables import parse_action_cell
+
+PROGRESS_PATH = Path("public/data/actions_progress.json")
+TIMELINE_PATH = Path("public/data/products_timeline.json")
+OVERRIDES_PATH = Path("python/products_timeline_overrides.json")
+
+LATER = "Later or TBD"
+MONTHS = ["May", "June", "July", "August", "September", "October", "November", "December", LATER]
+
+# Category key -> label and description, in timeline order
+CATEGORIES = {
+    "reports": (
+        "Secretary-General's and other official reports",
+        "In particular where a decision of an intergovernmental organ is envisaged",
+    ),
+    "briefs": (
+        "Secretary-General's information briefs",
+        "Providing further updates and information on specific work packages",
+    ),
+    "tools": (
+        "Operational tools and products",
+        "Including online platforms, registries, analytical tools and operational guidance",
+    ),
+}
+
+# Category key -> pattern; the first match wins, anything else is a report
+CATEGORY_PATTERNS = {
+    "briefs": re.compile(r"information brief|supplementary information", re.I),
+    "tools": re.compile(r"dashboard|webpage|digital tools|\.org\b|\.info\b", re.I),
+}
+
+# Product text that only names the category; the entry gets no note
+GENERIC_PRODUCTS = {"Secretary-General's information brief"}
+
+_MONTH_NAMES = {name[:3].lower(): name for name in MONTHS[:-1]}
+MONTH_RE = re.compile(r"\b(" + "|".join(_MONTH_NAMES) + r")[a-z]*\b", re.I)
+PARENS_RE = re.compile(r"\s*\(([^()]*)\)")
+NUMBER_RE = re.compile(r"\d+")
+# "Expertise- on-Demand": a compound broken after its hyphen (not "pre- and post-")
+HYPHEN_BREAK_RE = re.compile(r"(?<=\w)- +(?!(?:and|or)\b)(?=\w)")
+
+
+def normalize_product(text: str, fixes: dict[str, str] | None = None) -> str:
+    """Straight apostrophes, no soft hyphens, rejoined compounds, single spaces and *fixes*."""
+    text = " ".join(text.replace("’", "'").replace("\u00ad", "").split())
+    text = HYPHEN_BREAK_RE.sub("-", text)
+    for wrong, right in (fixes or {}).items():
+        text = text.replace(wrong, right)
+    return text
+
+
+def product_month(text: str) -> tuple[str, str]:
+    """Split a product into (month, text without the month's parentheses)."""
+    for m in PARENS_RE.finditer(text):
+        month = MONTH_RE.search(m.group(1))
+        if month:
+            return _MONTH_NAMES[month.group(1)[:3].lower()], (text[: m.start()] + text[m.end() :]).strip()
+    return LATER, text
+
+
+def product_category(text: str) -> str:
+    return next((key for key, pattern in CATEGORY_PATTERNS.items() if pattern.search(text)), "reports")
+
+
+def load_overrides(path: Path = OVERRIDES_PATH) -> dict:
+    overrides = json.loads(path.read_text(encoding="utf-8"))
+    for override in overrides.get("products", []):
+        if override.get("category", "reports") not in CATEGORIES or override.get("month", LATER) not in MONTHS:
+            raise ValueError(f"{path}: unknown category or month in {override}")
+    return overrides
+
+
+def find_override(overrides: list[dict], number: int, actions: set[int], text: str) -> dict | None:
+    """The most specific product override for *text* in a work package row, if any."""
+    matches = [
+        o
+        for o in overrides
+        if o["product"] == text
+        and o.get("workPackage", number) == number
+        and ("action" not in o or o["action"] in actions)
+    ]
+    return max(matches, key=lambda o: ("workPackage" in o) + ("action" in o), default=None)
+
+
+def _entry(text: str, group: dict) -> dict:
+    entry = {"workPackages": sorted(group["workPackages"]), "text": text}
+    if group["actions"]:
+        entry["actions"] = sorted(group["actions"])
+    if group["notes"]:
+        entry["note"] = "; ".join(group["notes"])
+    return entry
+
+
+def build_timeline(work_packages: list[dict], overrides: dict | None = None) -> dict:
+    """Timeline layout and work package index for actions_progress.json entries."""
+    overrides = overrides or {}
+    fixes = overrides.get("fixes", {})
+    labels = {int(number): label for number, label in overrides.get("labels", {}).items()}
+    product_overrides = overrides.get("products", [])
+    used: set[int] = set()
+    # (work package, action) pairs with at least one product on the timeline
+    covered: set[tuple[int, int]] = set()
+
+    # (category, month, text) -> work packages, actions, notes
+    groups: dict[tuple[str, str, str], dict] = {}
+
+    def add(category: str, month: str, label: str, number: int, actions: set[int], note: str | None) -> None:
+        group = groups.setdefault((category, month, label), {"workPackages": set(), "actions": set(), "notes": []})
+        group["workPackages"].add(number)
+        if category != "reports":
+            group["actions"] |= actions
+        if note and note not in GENERIC_PRODUCTS and note not in group["notes"]:
+            group["notes"].append(note)
+
+    def add_product(wp: dict, actions: set[int], product: str) -> None:
+        number = wp["workPackageNumber"]
+        month, text = product_month(normalize_product(product, fixes))
+        override = find_override(product_overrides, number, actions, text) or {}
+        if override:
+            used.add(id(override))
+        if override.get("drop"):
+            return
+        if "replace" in override:
+            for replacement in override["replace"]:
+                add_product(wp, actions, replacement)
+            return
+        category = override.get("category") or product_category(text)
+        month = override.get("month") or month
+        covered.update((number, action) for action in actions)
+        if category == "reports":
+            add(category, month, override.get("label") or text, number, actions, None)
+        else:
+            label = override.get("label") or labels.get(number) or wp["workPackageName"]
+            add(category, month, label, number, actions, override.get("note", text))
+
+    names = {}
+    for wp in work_packages:
+        number = wp["workPackageNumber"]
+        names[number] = wp["workPackageName"]
+        for row in wp.get("summaryTable") or []:
+            actions = {int(n) for n in NUMBER_RE.findall(parse_action_cell(row["action"])[0])}
+            for product in row["writtenProducts"]:
+                add_product(wp, actions, product)
+
+    for addition in overrides.get("additions", []):
+        number = addition["workPackage"]
+        actions = set(addition.get("actions", []))
+        if actions and all((number, action) in covered for action in actions):
+            continue
+        label = addition.get("label") or labels.get(number) or names.get(number, f"Work package {number}")
+        add(addition["category"], addition["month"], label, number, actions, addition.get("note"))
+
+    for override in product_overrides:
+        if id(override) not in used:
+            print(f"⚠️  Products timeline override matches no product: {json.dumps(override, ensure_ascii=False)}")
+
+    # Categories in CATEGORIES order, months in MONTHS order, entries by work packages then text
+    category_order = {key: i for i, key in enumerate(CATEGORIES)}
+    month_order = {month: i for i, month in enumerate(MONTHS)}
+    entries = sorted(
+        ((category, month, _entry(text, group)) for (category, month, text), group in groups.items()),
+        key=lambda e: (category_order[e[0]], month_order[e[1]], e[2]["workPackages"], e[2]["text"]),
+    )
+
+    categories = {
+        key: {"key": key, "category": label, "description": description, "items": []}
+        for key, (label, description) in CATEGORIES.items()
+    }
+    by_wp: dict[int, list[dict]] = {}
+    for category, month, entry in entries:
+        items = categories[category]["items"]
+        if not items or items[-1]["month"] != month:
+            items.append({"month": month, "entries": []})
+        items[-1]["entries"].append(entry)
+        for number in entry["workPackages"]:
+            by_wp.setdefault(number, []).append({"category": category, "month": month, **entry})
+
+    return {
+        "months": MONTHS,
+        "categories": list(categories.values()),
+        "workPackages": {
+            str(number): sorted(wp_entries, key=lambda e: (month_order[e["month"]], category_order[e["category"]]))
+            for number, wp_entries in sorted(by_wp.items())
+        },
+    }
+
+
+def write_timeline(
+    progress_path: Path = PROGRESS_PATH,
+    timeline_path: Path = TIMELINE_PATH,
+    overrides_path: Path = OVERRIDES_PATH,
+) -> dict:
+    """Write products_timeline.json (only if it changed) and return it."""
+    timeline = build_timeline(json.loads(progress_path.read_text(encoding="utf-8")), load_overrides(overrides_path))
+    payload = (json.dumps(timeline, ensure_ascii=False, indent=2) + "\n").encode("utf-8")
+    changed = write_if_changed(timeline_path, payload)
+    entries = sum(len(item["entries"]) for category in timeline["categories"] for item in category["items"])
+    print(
+        f"✓ Products timeline {'written to' if changed else 'unchanged in'} {timeline_path} "
+        f"({entries} entries, {len(timeline['workPackages'])} work packages)"
+    )
+    return timeline
+
+
+if __name__ == "__main__":
+    write_timeline()
@@ -0,0 +1,240 @@
+"""Extract every edition of the progress report and diff them per work package.
+
+Each PDF in the editions directory is one edition, named so that the names
+sort chronologically (e.g. 2025-06.pdf, 2025-09.pdf); the file stem is the
+edition's id. For each edition the QUICK SUMMARY tables are extracted as in
+extract_pdf_tables.py and kept next to the PDF as <stem>.progress.json,
+together with the PDF's SHA-256, so an edition is only processed again when
+its PDF or the extractor changes. The page index sidecar (<stem>.index.json)
+and the per-page cache are the same as for the single report, and the page
+cache is keyed by content, so pages an edition shares with an earlier one
+are not extracted twice. All pages to extract, from every changed edition,
+go through one worker pool.
+
+HISTORY_PATH then gets one time series per work package: an entry for each
+edition in which its summaryTable or writtenProducts changed (the first
+edition it appears in included), with the rows added, removed or changed
+(keyed by their action numbers) and the products added or removed.
+
+Usage:
+    python python/progress_editions.py [--editions DIR] [--workers N] [--engine {tables,words}] [--no-cache]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+from pathlib import Path
+
+from extract_pdf_tables import (
+    ENGINES,
+    EXTRACTOR_VERSION,
+    extract_documents,
+    parse_action_cell,
+    wp_summary_tables,
+)
+from instrument import add_arguments, configure, finish, span
+from page_cache import PageCache
+from pdf_index import file_sha256, load_index, summary_pages
+
+EDITIONS_DIR = Path("data/input/editions")
+HISTORY_PATH = Path("public/data/progress_history.json")
+
+
+def edition_path(pdf_path: Path) -> Path:
+    """Per-edition output: 2025-09.pdf -> 2025-09.progress.json."""
+    return pdf_path.with_suffix(".progress.json")
+
+
+def load_edition(pdf_path: Path, extractor: str) -> dict | None:
+    """The stored extraction of *pdf_path*, or None if missing or stale."""
+    path = edition_path(pdf_path)
+    if not path.exists():
+        return None
+    edition = json.loads(path.read_text(encoding="utf-8"))
+    if edition.get("extractor") != extractor or edition.get("sha256") != file_sha256(pdf_path):
+        return None
+    return edition
+
+
+def extract_editions(pdf_paths: list[Path], extractor: str, cache: PageCache, workers: int, engine: str) -> int:
+    """Bring every edition's <stem>.progress.json up to date; return how many were rewritten."""
+    stale = [p for p in pdf_paths if load_edition(p, extractor) is None]
+    if not stale:
+        return 0
+
+    with span("index", editions=len(stale)):
+        indexes = {p: load_index(p) for p in stale}
+        plans = {p: summary_pages(indexes[p]) for p in stale}
+
+    # Look every page up in the content-addressed cache, then extract each
+    # missing page content once, for all editions in one pool
+    page_rows: dict[Path, dict[int, list[dict] | None]] = {}
+    first_seen: dict[str, tuple[Path, int]] = {}
+    for pdf_path in stale:
+        page_rows[pdf_path] = {}
+        for i, _ in plans[pdf_path]:
+            content_hash = indexes[pdf_path]["pages"][i]["hash"]
+            page_rows[pdf_path][i] = cache.get(content_hash)
+            if page_rows[pdf_path][i] is None:
+                first_seen.setdefault(content_hash, (pdf_path, i))
+    misses: dict[str, list[int]] = {}
+    for pdf_path, i in first_seen.values():
+        misses.setdefault(str(pdf_path), []).append(i)
+    extracted = extract_documents(misses, workers, engine)
+    by_hash = {}
+    for path, indices in misses.items():
+        for i, (rows, _, _) in zip(indices, extracted[path]):
+            content_hash = indexes[Path(path)]["pages"][i]["hash"]
+            cache.put(content_hash, rows)
+            by_hash[content_hash] = rows
+
+    for pdf_path in stale:
+        pages = indexes[pdf_path]["pages"]
+        rows_by_page = {
+            i: rows if rows is not None else by_hash[pages[i]["hash"]] for i, rows in page_rows[pdf_path].items()
+        }
+        tables = wp_summary_tables(plans[pdf_path], rows_by_page)
+        edition = {
+            "edition": pdf_path.stem,
+            "sha256": indexes[pdf_path]["sha256"],
+            "extractor": extractor,
+            "summaryTables": {str(wp): rows for wp, rows in sorted(tables.items())},
+        }
+        edition_path(pdf_path).write_text(json.dumps(edition, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+        print(
+            f"  {pdf_path.stem}: {len(plans[pdf_path])} QUICK SUMMARY pages "
+            f"({len(misses.get(str(pdf_path), []))} extracted), {len(tables)} work packages"
+        )
+    cache.evict()
+    return len(stale)
+
+
+def row_key(row: dict, position: int) -> str:
+    """A summaryTable row's identity across editions: its action numbers, else its position."""
+    numbers, _ = parse_action_cell(row["action"])
+    return numbers or f"#{position + 1}"
+
+
+def _keyed(rows: list[dict]) -> dict[str, dict]:
+    keyed: dict[str, dict] = {}
+    for position, row in enumerate(rows):
+        key = row_key(row, position)
+        # Rows sharing action numbers keep their order under a suffixed key
+        keyed[key if key not in keyed else f"{key} ({position + 1})"] = row
+    return keyed
+
+
+def _products(rows: list[dict]) -> dict[str, None]:
+    # Ordered set: first appearance order, O(1) membership
+    return dict.fromkeys(p for row in rows for p in row["writtenProducts"])
+
+
+def diff_tables(old: list[dict], new: list[dict]) -> dict:
+    """Row and product changes from summaryTable *old* to *new*."""
+    old_rows, new_rows = _keyed(old), _keyed(new)
+    old_products, new_products = _products(old), _products(new)
+    return {
+        "rowsAdded": [k for k in new_rows if k not in old_rows],
+        "rowsRemoved": [k for k in old_rows if k not in new_rows],
+        "rowsChanged": [k for k in new_rows if k in old_rows and new_rows[k] != old_rows[k]],
+        "productsAdded": [p for p in new_products if p not in old_products],
+        "productsRemoved": [p for p in old_products if p not in new_products],
+    }
+
+
+def build_history(editions: list[dict]) -> dict:
+    """Per-work-package time series of changes over *editions* (oldest first)."""
+    series: dict[int, list[dict]] = {}
+    previous: dict[int, list[dict]] = {}
+    for edition in editions:
+        tables = {int(wp): rows for wp, rows in edition["summaryTables"].items()}
+        for wp in sorted(tables.keys() | previous.keys()):
+            old, new = previous.get(wp, []), tables.get(wp, [])
+            if old == new:
+                continue
+            changes = diff_tables(old, new)
+            series.setdefault(wp, []).append(
+                {
+                    "edition": edition["edition"],
+                    "rows": len(new),
+                    "products": len(_products(new)),
+                    **changes,
+                }
+            )
+        previous = tables
+    return {
+        "editions": [edition["edition"] for edition in editions],
+        "workPackages": [
+            {"workPackageNumber": wp, "changes": changes} for wp, changes in sorted(series.items())
+        ],
+    }
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument(
+        "--editions",
+        type=Path,
+        default=EDITIONS_DIR,
+        metavar="DIR",
+        help=f"directory of edition PDFs (default: {EDITIONS_DIR})",
+    )
+    parser.add_argument(
+        "--output",
+        type=Path,
+        default=HISTORY_PATH,
+        metavar="PATH",
+        help=f"time series to write (default: {HISTORY_PATH})",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        metavar="N",
+        help="extract pages of all editions in N worker processes (default: 1, serial)",
+    )
+    parser.add_argument("--engine", choices=ENGINES, default="tables", help="see extract_pdf_tables.py")
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="re-extract every edition, ignoring the stored editions and the page cache",
+    )
+    add_arguments(parser)
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None):
+    args = parse_args(argv)
+    configure(report=args.report, profile=args.profile, memory=args.trace_memory)
+
+    pdf_paths = sorted(args.editions.glob("*.pdf"))
+    if not pdf_paths:
+        raise SystemExit(f"No edition PDFs in {args.editions}/")
+    print(f"{len(pdf_paths)} editions in {args.editions}/: {', '.join(p.stem for p in pdf_paths)}")
+
+    extractor = f"{EXTRACTOR_VERSION}-{args.engine}"
+    if args.no_cache:
+        for pdf_path in pdf_paths:
+            edition_path(pdf_path).unlink(missing_ok=True)
+    cache = PageCache(extractor, enabled=not args.no_cache)
+    rewritten = extract_editions(pdf_paths, extractor, cache, args.workers, args.engine)
+
+    with span("history", editions=len(pdf_paths)):
+        editions = [json.loads(edition_path(p).read_text(encoding="utf-8")) for p in pdf_paths]
+        history = build_history(editions)
+
+    with span("export"):
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(json.dumps(history, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+
+    if cache.enabled:
+        print(f"\nPage cache: {cache.stats}")
+    changes = sum(len(wp["changes"]) for wp in history["workPackages"])
+    print(f"✓ {rewritten} of {len(pdf_paths)} editions extracted, the rest unchanged")
+    print(f"✓ {changes} changes over {len(history['workPackages'])} work packages written to {args.output}")
+    finish()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+"""Prebuilt full-text search index for the dashboard (public/data/search_index.json).
+
+Each action (by action number) is one document made of its text fields in
+actions.json plus its progressPerAction text from actions_progress.json.
+Text is normalized (NFKD, accents stripped, lowercased), split into
+alphanumeric tokens and stop words are dropped.
+
+The index is built in one pass over the records:
+
+- docs: document number -> action number
+- fields / weights: the indexed fields and the weight of each
+- terms: all terms, sorted, so a prefix maps to a contiguous range that can
+  be found by binary search
+- postings: for terms[i], a flat [doc, score, doc, score, ...] list, where
+  score is the sum of weight x occurrences over the document's fields
+
+search() below is the reference for how the frontend should query it:
+every query token must match, the last one as a prefix.
+
+Usage (also run at the end of prepare_actions_data.py and
+extract_pdf_tables.py):
+    python python/search_index.py [--query "peace operations"]
+"""
+
+from __future__ import annotations
+
+import argparse
+import bisect
+import json
+import re
+import unicodedata
+from pathlib import Path
+
+from bundle import write_if_changed
+from stream_actions import iter_json_array
+
+ACTIONS_PATH = Path("public/data/actions.json")
+PROGRESS_PATH = Path("public/data/actions_progress.json")
+INDEX_PATH = Path("public/data/search_index.json")
+
+INDEX_VERSION = 1
+
+# actions.json field (or "progress" for progressPerAction text) -> weight
+FIELD_WEIGHTS = {
+    "indicative_activity": 3,
+    "first_milestone": 2,
+    "final_milestone": 2,
+    "upcoming_milestone": 2,
+    "doc_text": 1,
+    "updates": 1,
+    "progress": 1,
+}
+
+STOP_WORDS = frozenset(
+    "a an and are as at be by for from has have in into is it its of on or that the "
+    "their this to was were will with".split()
+)
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+ACTION_NUMBER_RE = re.compile(r"\d+")
+
+
+def tokenize(text: str) -> list[str]:
+    """Normalized tokens of *text*, stop words removed."""
+    if not text.isascii():
+        text = unicodedata.normalize("NFKD", text)
+        text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    text = text.lower()
+    return [t for t in TOKEN_RE.findall(text) if t not in STOP_WORDS]
+
+
+def iter_fields(actions, progress):
+    """Yield (action_number, field, text) for every indexed piece of text."""
+    for record in actions:
+        for field in FIELD_WEIGHTS:
+            text = record.get(field)
+            if isinstance(text, str) and text:
+                yield record["action_number"], field, text
+    for wp in progress:
+        for entry in wp.get("progressPerAction") or []:
+            # "Action 15", "Actions 14 and 15", ...
+            for number in ACTION_NUMBER_RE.findall(entry.get("actionNumbers") or ""):
+                if entry.get("text"):
+                    yield int(number), "progress", entry["text"]
+
+
+def build_index(actions, progress) -> dict:
+    doc_ids: dict[int, int] = {}
+    scores: dict[str, dict[int, int]] = {}
+
+    for action_number, field, text in iter_fields(actions, progress):
+        doc = doc_ids.setdefault(action_number, len(doc_ids))
+        weight = FIELD_WEIGHTS[field]
+        for term in tokenize(text):
+            postings = scores.setdefault(term, {})
+            postings[doc] = postings.get(doc, 0) + weight
+
+    terms = sorted(scores)
+    return {
+        "version": INDEX_VERSION,
+        "fields": list(FIELD_WEIGHTS),
+        "weights": list(FIELD_WEIGHTS.values()),
+        "docs": list(doc_ids),
+        "terms": terms,
+        "postings": [[x for item in sorted(scores[t].items()) for x in item] for t in terms],
+    }
+
+
+def search(index: dict, query: str, limit: int = 10) -> list[tuple[int, int]]:
+    """(action_number, score) of the best matches for *query*, best first."""
+    tokens = tokenize(query)
+    if not tokens:
+        return []
+    terms = index["terms"]
+    totals: dict[int, int] | None = None
+    for position, token in enumerate(tokens):
+        if position == len(tokens) - 1:
+            # Last token matches as a prefix: terms[lo:hi] all start with it
+            lo = bisect.bisect_left(terms, token)
+            hi = bisect.bisect_left(terms, token + "\uffff")
+        else:
+            lo = bisect.bisect_left(terms, token)
+            hi = lo + 1 if lo < len(terms) and terms[lo] == token else lo
+        matched: dict[int, int] = {}
+        for i in range(lo, hi):
+            postings = index["postings"][i]
+            for doc, score in zip(postings[::2], postings[1::2]):
+                matched[doc] = matched.get(doc, 0) + score
+        totals = matched if totals is None else {d: s + matched[d] for d, s in totals.items() if d in matched}
+    ranked = sorted(totals.items(), key=lambda item: (-item[1], item[0]))[:limit]
+    return [(index["docs"][doc], score) for doc, score in ranked]
+
+
+def write_search_index(
+    actions_path: Path = ACTIONS_PATH,
+    progress_path: Path = PROGRESS_PATH,
+    index_path: Path = INDEX_PATH,
+) -> dict:
+    """Write the index (only if it changed) and return it."""
+    progress = json.loads(progress_path.read_text(encoding="utf-8")) if progress_path.exists() else []
+    index = build_index(iter_json_array(actions_path), progress)
+    payload = json.dumps(index, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    changed = write_if_changed(index_path, payload)
+    print(
+        f"✓ Search index {'written to' if changed else 'unchanged in'} {index_path} "
+        f"({len(index['docs'])} actions, {len(index['terms'])} terms, {len(payload):,} bytes)"
+    )
+    return index
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description="Build the dashboard search index.")
+    parser.add_argument("--query", help="also run this query against the index and print the matches")
+    args = parser.parse_args(argv)
+
+    index = write_search_index()
+    if args.query:
+        for action_number, score in search(index, args.query):
+            print(f"  Action {action_number}: {score}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,46 +1,294 @@
-"""Split the progress report PDF into per-work-package PDFs."""
+"""Split the progress report PDF into per-work-package PDFs.
 
+Next to each wpN.pdf two lightweight derivatives are written, so the
+dashboard can show a work package before fetching its PDF:
+
+- wpN.png (or .webp with --thumbnail-format webp, needs Pillow): the first
+  page rendered at --dpi
+- wpN.json: the text of each page, {"workPackageNumber", "pages", "text"}
+
+Files of work packages that are no longer in the report are deleted.
+A file is only rewritten when its page range or the content of its source
+pages changed (for the thumbnail: the first page, the DPI and the format).
+Fingerprints of the written files are kept in
+public/data/progress/manifest.json. Files to write go through one pool of
+worker processes that each open the source PDF once.
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
 import json
+import re
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 from pathlib import Path
 
-import fitz
+from pdf_index import load_index, wp_page_ranges
 
-progress_path = Path("public/data/actions_progress.json")
-pdf_path = Path("public/data/actions_progress.pdf")
-output_dir = Path("public/data/progress")
+PDF_PATH = Path("public/data/actions_progress.pdf")
+OUTPUT_DIR = Path("public/data/progress")
+MANIFEST_PATH = OUTPUT_DIR / "manifest.json"
 
-progress_data = json.loads(progress_path.read_text())
-doc = fitz.open(pdf_path)
-total_pages = len(doc)
+# Part of every output fingerprint: bump when SAVE_OPTIONS or the way pages
+# are copied changes, so all outputs are rewritten once.
+SPLITTER_VERSION = "1"
 
-entries = sorted(
-    [(d["workPackageNumber"], d["pdfPage"]) for d in progress_data if d.get("pdfPage")],
-    key=lambda x: x[1],
-)
+# no_new_id keeps the file ID stable, so identical input gives identical bytes
+SAVE_OPTIONS = {"garbage": 4, "deflate": True, "use_objstms": 1, "no_new_id": True}
 
-output_dir.mkdir(parents=True, exist_ok=True)
+# Files this script writes into OUTPUT_DIR
+OUTPUT_RE = re.compile(r"wp(\d+)\.(pdf|png|webp|json)")
+
+THUMBNAIL_DPI = 36
+THUMBNAIL_FORMATS = ("png", "webp")
+WEBP_QUALITY = 80
 
-for i, (wp_num, start_page) in enumerate(entries):
-    # End page is one before the next WP's start (or last page of the PDF)
-    if i + 1 < len(entries):
-        end_page = entries[i + 1][1] - 1
-    else:
-        end_page = total_pages
 
-    # Some WPs share a start page (e.g. WP6 and WP12 both on page 17).
-    # In that case, give them just that one page.
-    if end_page < start_page:
-        end_page = start_page
+def fingerprint(index: dict, start_page: int, end_page: int, variant: str = "") -> str:
+    """Hash of the splitter version, the page range and its source page hashes.
+
+    The page hashes cover each page's content stream and resources (see
+    page_cache.page_content_hash); the index version is part of the hash so
+    a change in how pages are hashed rewrites every output once. *variant*
+    tells derivatives of the same pages apart (e.g. "text", "png@36dpi");
+    the PDFs have none.
+    """
+    version = f"{SPLITTER_VERSION}:{variant}" if variant else SPLITTER_VERSION
+    h = hashlib.sha256(f"{version}:{index['version']}:{start_page}-{end_page}".encode())
+    for entry in index["pages"][start_page - 1 : end_page]:
+        h.update(entry["hash"].encode())
+    return h.hexdigest()
+
+
+def _replace(out_path: Path, payload: bytes) -> int:
+    tmp_path = out_path.with_name(out_path.name + ".tmp")
+    tmp_path.write_bytes(payload)
+    tmp_path.replace(out_path)
+    return len(payload)
+
+
+def write_wp_pdf(src, start_page: int, end_page: int, out_path: Path) -> int:
+    """Copy a 1-based inclusive page range into *out_path* and return its size."""
+    import fitz
 
-    # fitz pages are 0-indexed, pdfPage values are 1-indexed
     out = fitz.open()
-    out.insert_pdf(doc, from_page=start_page - 1, to_page=end_page - 1)
-    out_path = output_dir / f"wp{wp_num}.pdf"
-    out.save(out_path)
+    out.insert_pdf(src, from_page=start_page - 1, to_page=end_page - 1)
+    out.subset_fonts()
+    tmp_path = out_path.with_suffix(".pdf.tmp")
+    out.save(tmp_path, **SAVE_OPTIONS)
     out.close()
+    tmp_path.replace(out_path)
+    return out_path.stat().st_size
+
+
+def write_wp_thumbnail(src, start_page: int, end_page: int, out_path: Path, dpi: int = THUMBNAIL_DPI) -> int:
+    """Render the first page of the range at *dpi* into *out_path* (.png or .webp)."""
+    pix = src[start_page - 1].get_pixmap(dpi=dpi, alpha=False)
+    if out_path.suffix == ".webp":
+        # PyMuPDF encodes WebP through Pillow
+        payload = pix.pil_tobytes(format="WEBP", quality=WEBP_QUALITY, method=6)
+    else:
+        payload = pix.tobytes("png")
+    return _replace(out_path, payload)
+
+
+def write_wp_text(src, start_page: int, end_page: int, out_path: Path) -> int:
+    """Write the text of each page of the range as JSON."""
+    text = [src[i].get_text("text", sort=True).strip() for i in range(start_page - 1, end_page)]
+    extract = {
+        "workPackageNumber": int(out_path.stem.removeprefix("wp")),
+        "pages": [start_page, end_page],
+        "text": text,
+    }
+    return _replace(out_path, (json.dumps(extract, ensure_ascii=False, indent=2) + "\n").encode("utf-8"))
+
+
+# (writer, start_page, end_page, out_path); writers are module-level
+# functions or partials of them, so jobs can be sent to worker processes
+Job = tuple[Callable[..., int], int, int, Path]
+
+# Each pool worker opens the source PDF once and reuses it for all its jobs.
+_worker_doc = None
+
+
+def _init_worker(pdf_path: str) -> None:
+    import fitz
+
+    global _worker_doc
+    _worker_doc = fitz.open(pdf_path)
+
+
+def _write_in_worker(job: Job) -> int:
+    writer, *args = job
+    return writer(_worker_doc, *args)
+
+
+def write_files(pdf_path: Path, jobs: list[Job], workers: int = 1) -> list[int]:
+    """Run the jobs and return the written sizes, in a process pool if *workers* > 1."""
+    if workers <= 1 or len(jobs) <= 1:
+        import fitz
+
+        src = fitz.open(pdf_path)
+        sizes = [writer(src, *args) for writer, *args in jobs]
+        src.close()
+        return sizes
+
+    with ProcessPoolExecutor(
+        max_workers=min(workers, len(jobs)),
+        initializer=_init_worker,
+        initargs=(str(pdf_path),),
+    ) as pool:
+        # Larger chunks cut the round trips for the many small derivative jobs
+        return list(pool.map(_write_in_worker, jobs, chunksize=max(1, len(jobs) // (4 * workers))))
+
+
+def load_manifest() -> dict:
+    if not MANIFEST_PATH.exists():
+        return {}
+    return json.loads(MANIFEST_PATH.read_text(encoding="utf-8"))
+
+
+def is_current(entry: dict | None, out_path: Path, digest: str) -> bool:
+    """True if *out_path* is the file the manifest says was written for *digest*."""
+    return (
+        entry is not None
+        and entry["fingerprint"] == digest
+        and out_path.exists()
+        and out_path.stat().st_size == entry["bytes"]
+    )
+
+
+def remove_stale(manifest: dict, work_packages) -> list[str]:
+    """Delete the files (and manifest entries) of work packages no longer in the report."""
+    names = set(manifest) | {path.name for path in OUTPUT_DIR.iterdir()}
+    stale = sorted(
+        name for name in names if (m := OUTPUT_RE.fullmatch(name)) and int(m.group(1)) not in work_packages
+    )
+    for name in stale:
+        manifest.pop(name, None)
+        (OUTPUT_DIR / name).unlink(missing_ok=True)
+    return stale
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        metavar="N",
+        help="write PDFs, thumbnails and text extracts in N worker processes (default: 1, serial)",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="rewrite every work package file even if it is up to date",
+    )
+    parser.add_argument(
+        "--dpi",
+        type=int,
+        default=THUMBNAIL_DPI,
+        help=f"resolution of the first-page thumbnails (default: {THUMBNAIL_DPI})",
+    )
+    parser.add_argument(
+        "--thumbnail-format",
+        choices=THUMBNAIL_FORMATS,
+        default="png",
+        help="thumbnail image format (default: png; webp needs Pillow)",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None):
+    args = parse_args(argv)
+    if args.thumbnail_format == "webp":
+        try:
+            import PIL  # noqa: F401
+        except ImportError:
+            raise SystemExit("--thumbnail-format webp needs Pillow: pip install pillow")
+
+    # Page ranges come from the work package headers recorded in the page index,
+    # so they no longer depend on pdfPage in actions_progress.json
+    index = load_index(PDF_PATH)
+    ranges = wp_page_ranges(index)
+    manifest = load_manifest()
+
+    OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+    # A new edition can drop or renumber work packages
+    stale = remove_stale(manifest, ranges)
+    if stale:
+        print(f"Removed {len(stale)} files of work packages no longer in the report: {', '.join(stale)}")
+
+    thumbnail_variant = f"{args.thumbnail_format}@{args.dpi}dpi"
+    write_thumbnail = partial(write_wp_thumbnail, dpi=args.dpi)
+
+    jobs: list[Job] = []
+    pending: list[tuple[int, str, int]] = []
+    derivatives = 0
+    for wp_num, (start_page, end_page) in ranges.items():
+        out_path = OUTPUT_DIR / f"wp{wp_num}.pdf"
+        digest = fingerprint(index, start_page, end_page)
+        page_count = end_page - start_page + 1
+        if not args.force and is_current(manifest.get(out_path.name), out_path, digest):
+            print(f"WP {wp_num:>2}: pages {start_page}-{end_page} ({page_count} pages) unchanged")
+        else:
+            old_bytes = out_path.stat().st_size if out_path.exists() else 0
+            jobs.append((write_wp_pdf, start_page, end_page, out_path))
+            pending.append((wp_num, digest, old_bytes))
+
+        # The thumbnail only depends on the first page
+        for writer, first, last, suffix, variant in (
+            (write_thumbnail, start_page, start_page, args.thumbnail_format, thumbnail_variant),
+            (write_wp_text, start_page, end_page, "json", "text"),
+        ):
+            derivative_path = OUTPUT_DIR / f"wp{wp_num}.{suffix}"
+            digest = fingerprint(index, first, last, variant)
+            derivatives += 1
+            if args.force or not is_current(manifest.get(derivative_path.name), derivative_path, digest):
+                jobs.append((writer, start_page, end_page, derivative_path))
+                pending.append((wp_num, digest, 0))
+
+        # Drop thumbnails left over from another --thumbnail-format
+        for other in THUMBNAIL_FORMATS:
+            if other != args.thumbnail_format:
+                manifest.pop(f"wp{wp_num}.{other}", None)
+                (OUTPUT_DIR / f"wp{wp_num}.{other}").unlink(missing_ok=True)
+
+    sizes = write_files(PDF_PATH, jobs, workers=args.workers)
+
+    pdfs = derivatives_written = derivative_bytes = 0
+    old_total = new_total = 0
+    for (writer, start_page, end_page, out_path), (wp_num, digest, old_bytes), size in zip(jobs, pending, sizes):
+        manifest[out_path.name] = {"pages": [start_page, end_page], "fingerprint": digest, "bytes": size}
+        if writer is not write_wp_pdf:
+            derivatives_written += 1
+            derivative_bytes += size
+            continue
+        pdfs += 1
+        old_total += old_bytes
+        new_total += size
+        page_count = end_page - start_page + 1
+        print(
+            f"WP {wp_num:>2}: pages {start_page}-{end_page} ({page_count} pages) → {out_path} "
+            f"({old_bytes:,} → {size:,} bytes)"
+        )
+
+    MANIFEST_PATH.write_text(
+        json.dumps(dict(sorted(manifest.items())), indent=2) + "\n",
+        encoding="utf-8",
+    )
+
+    print(f"\n✓ Wrote {pdfs} of {len(ranges)} work package PDFs into {OUTPUT_DIR}/")
+    if pdfs:
+        print(f"✓ {old_total:,} → {new_total:,} bytes ({old_total - new_total:,} bytes saved)")
+    print(
+        f"✓ Wrote {derivatives_written} of {derivatives} thumbnails ({thumbnail_variant}) and text extracts "
+        f"({derivative_bytes:,} bytes)"
+    )
 
-    page_count = end_page - start_page + 1
-    print(f"WP {wp_num:>2}: pages {start_page}-{end_page} ({page_count} pages) → {out_path}")
 
-doc.close()
-print(f"\n✓ Split {len(entries)} work package PDFs into {output_dir}/")
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""Precomputed counts and facet indexes for the dashboard (public/data/stats.json).
+
+Built from the published actions.json so it matches the file the dashboard
+loads, whichever ingestion path produced it:
+
+- totals: the DataCard counts checked by validation_rules.json
+- counts: actions per status, workstream, lead and big-ticket flag
+- facets: facet value -> sorted action numbers, so filters can intersect
+  sets instead of rescanning every record
+- subactionFacets: the same for subaction rows, by their parent's action
+  number
+
+Leads and entities are normalized as the dashboard's filters normalize
+them (normalizeLeaderName / normalizeTeamMember in src/lib/utils.ts), from
+the same table, NORMALIZATION_PATH, so a selected filter value is a facet
+key: "ASG UNITAR" is "ED UNITAR", every "EOSG ..." variant is "EOSG" and
+"SA Reform" is left out.
+
+Subactions are excluded from the counts and kept out of facets. They share
+their parent's action number, so e.g. a completed subaction would
+otherwise mark its parent as completed. The dashboard does show the
+subactions of actions 94 and 95; it can add subactionFacets for those.
+
+Usage (also run at the end of prepare_actions_data.py):
+    python python/stats.py
+"""
+
+from __future__ import annotations
+
+import json
+from collections import Counter
+from pathlib import Path
+
+from bundle import write_if_changed
+from stream_actions import iter_json_array
+
+ACTIONS_PATH = Path("public/data/actions.json")
+STATS_PATH = Path("public/data/stats.json")
+# Next to the frontend code that uses it; found from this file, not the working directory
+NORMALIZATION_PATH = Path(__file__).resolve().parent.parent / "src/lib/nameNormalization.json"
+
+_NORMALIZATION = json.loads(NORMALIZATION_PATH.read_text(encoding="utf-8"))
+LEADER_ALIASES: dict[str, str] = _NORMALIZATION["leaders"]["aliases"]
+TEAM_MEMBER_EXCLUDE: set[str] = set(_NORMALIZATION["teamMembers"]["exclude"])
+TEAM_MEMBER_PREFIXES: dict[str, str] = _NORMALIZATION["teamMembers"]["prefixes"]
+
+
+def normalize_leader(lead: str) -> str:
+    """normalizeLeaderName in src/lib/utils.ts."""
+    lead = lead.strip()
+    return LEADER_ALIASES.get(lead, lead)
+
+
+def normalize_team_member(entity: str) -> str | None:
+    """normalizeTeamMember in src/lib/utils.ts: None for excluded or blank entities."""
+    entity = entity.strip()
+    if not entity or entity in TEAM_MEMBER_EXCLUDE:
+        return None
+    return next((name for prefix, name in TEAM_MEMBER_PREFIXES.items() if entity.startswith(prefix)), entity)
+
+
+def _leads(record: dict) -> list[str]:
+    return [normalize_leader(lead) for lead in record.get("work_package_leads") or [] if lead.strip()]
+
+
+def _entities(record: dict) -> list[str]:
+    entities = (normalize_team_member(e) for e in (record.get("action_entities") or "").split(";"))
+    return [e for e in entities if e]
+
+
+# Facet name in stats.json -> function returning a record's values for it
+FACETS = {
+    "lead": _leads,
+    "entity": _entities,
+    "msBody": lambda r: r.get("ms_body") or [],
+    "unBudget": lambda r: r.get("un_budget") or [],
+    "status": lambda r: [r["public_action_status"]] if r.get("public_action_status") else [],
+}
+
+
+def _sorted_counts(counter: Counter) -> dict:
+    return {str(key): counter[key] for key in sorted(counter, key=str)}
+
+
+def _sorted_facets(facets: dict[str, dict[str, set[int]]]) -> dict:
+    return {name: {value: sorted(ids) for value, ids in sorted(index.items())} for name, index in facets.items()}
+
+
+def build_stats(records) -> dict:
+    """Totals, counts and facet indexes for an iterable of actions.json records."""
+    workstreams, work_packages, leads = set(), set(), set()
+    counts = {name: Counter() for name in ("status", "workstream", "lead", "bigTicket")}
+    facets: dict[str, dict[str, set[int]]] = {name: {} for name in FACETS}
+    subaction_facets: dict[str, dict[str, set[int]]] = {name: {} for name in FACETS}
+    actions = subactions = 0
+
+    for record in records:
+        action_number = record["action_number"]
+        workstreams.add(record.get("report"))
+        work_packages.add(record["work_package_number"])
+        leads.update(record.get("work_package_leads") or [])
+
+        is_subaction = bool(record.get("is_subaction"))
+        for name, values in FACETS.items():
+            index = (subaction_facets if is_subaction else facets)[name]
+            for value in values(record):
+                index.setdefault(value, set()).add(action_number)
+
+        if is_subaction:
+            subactions += 1
+            continue
+        actions += 1
+        counts["status"][record.get("public_action_status")] += 1
+        counts["workstream"][record.get("report")] += 1
+        counts["lead"].update(set(_leads(record)))
+        counts["bigTicket"]["true" if record.get("big_ticket") else "false"] += 1
+
+    workstreams.discard(None)
+    return {
+        "totals": {
+            "workstreams": len(workstreams),
+            "workPackages": len(work_packages),
+            "actions": actions,
+            "subactions": subactions,
+            "leads": len(leads),
+        },
+        "counts": {name: _sorted_counts(counter) for name, counter in counts.items()},
+        "facets": _sorted_facets(facets),
+        "subactionFacets": _sorted_facets(subaction_facets),
+    }
+
+
+def write_stats(actions_path: Path = ACTIONS_PATH, stats_path: Path = STATS_PATH) -> dict:
+    """Write stats.json next to actions.json (only if it changed) and return it."""
+    stats = build_stats(iter_json_array(actions_path))
+    payload = json.dumps(stats, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    changed = write_if_changed(stats_path, payload)
+    totals = stats["totals"]
+    print(
+        f"✓ Stats {'written to' if changed else 'unchanged in'} {stats_path} "
+        f"({totals['actions']} actions, {sum(map(len, stats['facets'].values()))} facet values)"
+    )
+    return stats
+
+
+if __name__ == "__main__":
+    write_stats()
@@ -0,0 +1,325 @@
+"""Bounded-memory ingestion of the actions export (prepare_actions_data.py --stream).
+
+The raw JSON array is parsed incrementally and cleaned in fixed-size chunks.
+Cleaned chunks are sorted and spilled to temporary JSON-lines runs, and the
+only state kept across chunks is per (action_number, work_package_number,
+report) group for subaction detection plus the small sets the validation
+needs. The runs are then merged in sort order and written in chunk-sized
+batches, so peak memory follows the chunk size rather than the export size.
+
+Output is byte-identical to the in-memory path in prepare_actions_data.py.
+"""
+
+from __future__ import annotations
+
+import heapq
+import json
+import tempfile
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from instrument import iter_span, span
+from validation import (
+    OVERRIDE_HELP,
+    RULES_PATH,
+    count_mismatches,
+    failure_message,
+    load_rules,
+    merge_violations,
+    override_conflicts,
+    row_violations,
+    violation_messages,
+)
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+GROUP_KEYS = ["action_number", "work_package_number", "report"]
+
+
+def iter_json_array(path: Path, buffer_size: int = 1 << 16) -> Iterator:
+    """Yield the elements of a top-level JSON array without loading the whole file."""
+    decoder = json.JSONDecoder()
+    with open(path, encoding="utf-8") as f:
+        buf, pos, eof, started = "", 0, False, False
+
+        def refill() -> None:
+            nonlocal buf, pos, eof
+            # Grow at least geometrically so one large element stays linear
+            more = f.read(max(buffer_size, len(buf) - pos))
+            eof = not more
+            buf, pos = buf[pos:] + more, 0
+
+        while True:
+            while pos < len(buf) and buf[pos] in " \t\r\n,":
+                pos += 1
+            if pos == len(buf):
+                if eof:
+                    raise ValueError(f"{path}: unexpected end of JSON array")
+                refill()
+                continue
+            if not started:
+                if buf[pos] != "[":
+                    raise ValueError(f"{path}: expected a JSON array")
+                started = True
+                pos += 1
+                continue
+            if buf[pos] == "]":
+                return
+            try:
+                value, end = decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                refill()
+                continue
+            if end == len(buf) and not eof:
+                # A value ending exactly at the buffer edge may be truncated
+                refill()
+                continue
+            yield value
+            pos = end
+
+
+def iter_chunks(items: Iterable, size: int) -> Iterator[list]:
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def scan_columns(path: Path) -> list[str]:
+    """Column order pd.DataFrame(records) would use: keys in order of first appearance."""
+    columns: dict[str, None] = {}
+    for record in iter_json_array(path):
+        columns.update(dict.fromkeys(record))
+    return list(columns)
+
+
+def write_records_json(frames: Iterable[pd.DataFrame], path: Path) -> int:
+    """Write *frames* as one JSON array of records; return the number of records.
+
+    The bytes are those of to_json(orient="records", force_ascii=False,
+    indent=2) on the frames concatenated, but only one frame is serialized at
+    a time.
+    """
+    written = 0
+    with open(path, "w", encoding="utf-8") as out:
+        out.write("[")
+        for df in frames:
+            if df.empty:
+                continue
+            body = df.to_json(orient="records", force_ascii=False, indent=2)
+            # Strip the batch's own "[\n" ... "\n]" and join batches with ","
+            out.write(("," if written else "") + body[1:-2])
+            written += len(df)
+        out.write("\n]" if written else "]")
+    return written
+
+
+def _native(value):
+    # numpy scalars (int64, bool_) -> Python values for json.dumps
+    return value.item()
+
+
+def _write_run(df: pd.DataFrame, columns: list[str], keys: list, has_doc_para, path: Path) -> None:
+    """Spill one cleaned chunk, sorted like the final output, as JSON lines."""
+    wps = df["work_package_number"].tolist()
+    actions = df["action_number"].tolist()
+    positions = df.index.tolist()
+    paras = has_doc_para.tolist()
+    values = df[columns].to_numpy(dtype=object).tolist()
+    order = sorted(range(len(df)), key=lambda i: (wps[i], actions[i], positions[i]))
+    with open(path, "w", encoding="utf-8") as f:
+        for i in order:
+            line = [wps[i], actions[i], positions[i], keys[i], paras[i], values[i]]
+            f.write(json.dumps(line, ensure_ascii=False, default=_native) + "\n")
+
+
+def _read_run(path: Path) -> Iterator[list]:
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            yield json.loads(line)
+
+
+def prepare_streaming(
+    input_path: Path,
+    output_path: Path,
+    chunk_size: int = 10_000,
+    force: bool = False,
+    validate: bool = True,
+) -> None:
+    """Clean, validate and export *input_path* in chunks of *chunk_size* records.
+
+    With *validate* False the records, counts and overrides rules are skipped
+    (synthetic or historical exports); see validation.py.
+    """
+    # Imported here so iter_json_array (used by delta, stats, ...) stays pandas-free
+    import pandas as pd
+    from cleaning import clean_frame
+
+    rules = load_rules(RULES_PATH)
+    with span("scan"):
+        columns = scan_columns(input_path)
+
+    loaded = 0
+    position = 0
+    non_null_columns: set[str] = set()
+    # group key -> [any document_paragraph, first position, rows with one, rows]
+    groups: dict[tuple, list] = {}
+    distinct: dict[str, set] = {count.name: set() for count in rules.counts}
+    violations: list[dict[str, list[tuple]]] = []  # per chunk
+    override_rows: list[tuple] = []
+
+    with tempfile.TemporaryDirectory(prefix="actions-stream-") as tmp:
+        runs: list[Path] = []
+
+        for chunk in iter_span("load", iter_chunks(iter_json_array(input_path), chunk_size), count="rows"):
+            loaded += len(chunk)
+
+            with span("clean", rows=len(chunk)):
+                df = pd.DataFrame(chunk, columns=columns)
+                df = df.replace("", None)
+                df = df.dropna(how="all")
+                non_null_columns.update(df.columns[df.notna().any()])
+
+                df = clean_frame(df).replace("", None)
+                df.index = pd.RangeIndex(position, position + len(df))
+                position += len(df)
+
+            with span("subactions", rows=len(df)):
+                has_doc_para = df["document_paragraph"].notna() & (
+                    df["document_paragraph"].astype(str).str.strip() != ""
+                )
+                in_group = df[GROUP_KEYS].notna().all(axis=1)
+                keys = [
+                    list(key) if ok else None
+                    for key, ok in zip(df[GROUP_KEYS].itertuples(index=False, name=None), in_group)
+                ]
+                for key, hp, pos in zip(keys, has_doc_para, df.index):
+                    if key is None:
+                        continue
+                    state = groups.get(tuple(key))
+                    if state is None:
+                        groups[tuple(key)] = [bool(hp), pos, int(hp), 1]
+                    else:
+                        state[0] = state[0] or bool(hp)
+                        state[2] += int(hp)
+                        state[3] += 1
+
+            with span("validation", rows=len(df)):
+                # The rules see the cleaned strings, as in check_frame()
+                for count in rules.counts:
+                    if count.distinct:
+                        distinct[count.name].update(df[count.distinct].dropna().unique())
+                    elif count.distinct_items:
+                        distinct[count.name].update(df[count.distinct_items].explode().dropna().unique())
+                violations.append(row_violations(df, rules))
+
+                overridden = df[rules.override_key].isin(list(rules.overrides))
+                for i in overridden.to_numpy().nonzero()[0]:
+                    override_rows.append(
+                        (
+                            int(df.index[i]),
+                            keys[i],
+                            bool(has_doc_para.iat[i]),
+                            df[rules.override_key].iat[i],
+                            df[rules.override_column].iat[i],
+                        )
+                    )
+
+                for col in ["work_package_number", "action_number"]:
+                    df[col] = pd.to_numeric(df[col], errors="coerce").fillna(0).astype(int)
+
+            with span("spill", rows=len(df)):
+                run_path = Path(tmp) / f"run{len(runs):05d}.jsonl"
+                _write_run(df, columns, keys, has_doc_para, run_path)
+                runs.append(run_path)
+
+        print(f"\nLoaded {loaded} records from {input_path} (streaming, {len(runs)} chunks)")
+
+        def is_subaction(key, has_para: bool, pos: int) -> bool:
+            if key is None:
+                return False
+            any_para, first, _, _ = groups[tuple(key)]
+            return not has_para if any_para else pos != first
+
+        num_subactions = sum(
+            size - n_para if any_para else size - 1 for any_para, _, n_para, size in groups.values()
+        )
+        print(
+            f"\n📊 Subaction detection: {num_subactions} subactions found out of {position} total actions"
+        )
+        if num_subactions != 5:
+            print(f"⚠️  Warning: Expected 5 subactions but detected {num_subactions}")
+            for (action, wp, report), (any_para, _, n_para, size) in groups.items():
+                extra = size - n_para if any_para else size - 1
+                if extra:
+                    print(f"  - Action {action} in WP {wp} ({report}): {extra} subaction(s)")
+
+        # Same checks and messages as check_rules() in prepare_actions_data.py
+        problems = [
+            f"Power Automate Issue: Column '{col}' is completely null."
+            for col in columns
+            if col not in non_null_columns
+        ]
+        problems += violation_messages(merge_violations(violations, rules))
+        conflicts = []
+        if validate:
+            if loaded != rules.records:
+                problems.insert(0, f"Records count mismatch! Expected {rules.records}, got {loaded}")
+            rows = {"all": position, "actions": position - num_subactions}
+            actual = {
+                count.name: rows[count.rows] if count.rows else len(distinct[count.name])
+                for count in rules.counts
+            }
+            problems += count_mismatches(rules, actual)
+
+            override_statuses: dict[str, list] = {}
+            for pos, key, has_para, override_key, status in sorted(override_rows, key=lambda r: r[0]):
+                if not is_subaction(key, has_para, pos):
+                    override_statuses.setdefault(override_key, []).append(status)
+            conflicts = override_conflicts(rules, override_statuses)
+
+        if problems or conflicts:
+            title = "DATA VALIDATION FAILED" if problems else "MANUAL OVERRIDE CONFLICT"
+            raise AssertionError(failure_message(title, problems + conflicts, OVERRIDE_HELP if conflicts else None))
+        if not validate:
+            print("\n⚠️  Validation skipped (--no-validate)")
+        else:
+            print("\n✓ All data counts match expected values")
+            if rules.overrides:
+                print(
+                    f"\n✓ Workbook agrees with all {len(rules.overrides)} manual status "
+                    f"override(s) — they are now redundant and can be deleted from {RULES_PATH}"
+                )
+
+        with span("export", rows=position):
+            # Merge the sorted runs and write the records in chunk-sized batches
+            output_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_output = output_path.with_suffix(".json.tmp")
+            merged = heapq.merge(*(_read_run(run) for run in runs), key=lambda line: line[:3])
+            out_columns = [*columns, "is_subaction"]
+            write_records_json(
+                (
+                    pd.DataFrame(
+                        [[*values, is_subaction(key, hp, pos)] for _, _, pos, key, hp, values in batch],
+                        columns=out_columns,
+                    )
+                    for batch in iter_chunks(merged, chunk_size)
+                ),
+                tmp_output,
+            )
+
+    # Imported here because delta reuses iter_json_array from this module
+    from delta import publish
+
+    publish(tmp_output, output_path, force=force)
+    print(
+        f"✓ Processed {position} records ({position - num_subactions} actions, {num_subactions} subactions)"
+    )
@@ -0,0 +1,32 @@
+"""Document handling in extract_pdf_tables.extract_documents."""
+
+import fitz
+
+from extract_pdf_tables import extract_documents
+
+
+def test_documents_opened_for_the_call_are_closed(tmp_path, monkeypatch):
+    paths = []
+    for n in range(2):
+        doc = fitz.open()
+        doc.new_page().insert_text((72, 72), f"Edition {n}")
+        doc.save(tmp_path / f"{n}.pdf")
+        paths.append(str(tmp_path / f"{n}.pdf"))
+
+    opened = []
+    real_open = fitz.open
+
+    def tracking_open(*args, **kwargs):
+        opened.append(real_open(*args, **kwargs))
+        return opened[-1]
+
+    monkeypatch.setattr(fitz, "open", tracking_open)
+    given = real_open(paths[0])
+
+    results = extract_documents({paths[0]: [0], paths[1]: [0]}, docs={paths[0]: given})
+
+    assert set(results) == set(paths)
+    assert len(opened) == 1 and opened[0].is_closed
+    # The caller's document stays open for the caller to close
+    assert not given.is_closed
+    given.close()
@@ -0,0 +1,239 @@
+"""github_upload.py against a stub of the Git Data API on a local HTTP server."""
+
+import base64
+import hashlib
+import json
+import threading
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import github_upload
+from github_upload import GitHubUploader, git_blob_sha, retry_after_seconds
+
+REPO_PATH = "/repos/owner/repo/"
+
+
+class StubGitHub:
+    """A branch with one commit holding data/a.json, and a log of the requests made.
+
+    *failures* maps "METHOD path" to (status, headers) responses sent, in
+    order, before the request is answered normally.
+    """
+
+    def __init__(self):
+        self.objects: dict[str, dict] = {}
+        self.requests: list[tuple[str, str, dict]] = []
+        self.failures: dict[str, list[tuple[int, dict]]] = {}
+        blob = self.add({"type": "blob", "content": b'{"a": 1}\n'}, git_blob_sha(b'{"a": 1}\n'))
+        tree = self.add({"type": "tree", "tree": [{"path": "data/a.json", "type": "blob", "sha": blob}]})
+        self.head = self.add({"type": "commit", "tree": tree, "parents": []})
+
+    def add(self, obj: dict, sha: str | None = None) -> str:
+        sha = sha or hashlib.sha1(repr(sorted(obj.items())).encode()).hexdigest()
+        self.objects[sha] = obj
+        return sha
+
+    def respond(self, method: str, path: str, body: dict | None) -> tuple[int, dict | None]:
+        if method == "GET" and path == "git/ref/heads/main":
+            return 200, {"object": {"sha": self.head}}
+        if method == "GET" and path.startswith("git/commits/"):
+            return 200, {"tree": {"sha": self.objects[path.rsplit("/", 1)[1]]["tree"]}}
+        if method == "GET" and path.startswith("git/trees/"):
+            sha = path.rsplit("/", 1)[1].split("?")[0]
+            return 200, {"sha": sha, "tree": self.objects[sha]["tree"], "truncated": False}
+        if method == "POST" and path == "git/blobs":
+            content = base64.b64decode(body["content"])
+            return 201, {"sha": self.add({"type": "blob", "content": content}, git_blob_sha(content))}
+        if method == "POST" and path == "git/trees":
+            tree = {e["path"]: e for e in self.objects[body["base_tree"]]["tree"]}
+            tree.update({e["path"]: e for e in body["tree"]})
+            return 201, {"sha": self.add({"type": "tree", "tree": sorted(tree.values(), key=lambda e: e["path"])})}
+        if method == "POST" and path == "git/commits":
+            return 201, {"sha": self.add({"type": "commit", "tree": body["tree"], "parents": body["parents"]})}
+        if method == "PATCH" and path == "git/refs/heads/main":
+            self.head = body["sha"]
+            return 200, {"object": {"sha": self.head}}
+        return 404, {"message": "Not Found"}
+
+    def file(self, path: str) -> bytes:
+        tree = self.objects[self.objects[self.head]["tree"]]["tree"]
+        return next(self.objects[e["sha"]]["content"] for e in tree if e["path"] == path)
+
+
+@pytest.fixture
+def github():
+    stub = StubGitHub()
+
+    class Handler(BaseHTTPRequestHandler):
+        def handle_request(self):
+            path = self.path.removeprefix(REPO_PATH)
+            length = int(self.headers.get("Content-Length") or 0)
+            body = json.loads(self.rfile.read(length)) if length else None
+            stub.requests.append((self.command, path, dict(self.headers)))
+
+            failures = stub.failures.get(f"{self.command} {path}")
+            if failures:
+                status, headers = failures.pop(0)
+                self.send(status, {"message": "stub failure"}, headers)
+                return
+            status, payload = stub.respond(self.command, path, body)
+            etag = '"' + hashlib.sha1(json.dumps(payload, sort_keys=True).encode()).hexdigest() + '"'
+            if self.command == "GET" and self.headers.get("If-None-Match") == etag:
+                self.send(304, None, {"ETag": etag})
+            else:
+                self.send(status, payload, {"ETag": etag} if self.command == "GET" else {})
+
+        def send(self, status: int, payload: dict | None, headers: dict):
+            data = b"" if payload is None else json.dumps(payload).encode()
+            self.send_response(status)
+            for name, value in headers.items():
+                self.send_header(name, value)
+            if status != 304:
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        do_GET = do_POST = do_PATCH = handle_request
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.01}, daemon=True)
+    thread.start()
+    stub.api_url = f"http://127.0.0.1:{server.server_address[1]}"
+    yield stub
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    waits: list[float] = []
+    monkeypatch.setattr(github_upload.time, "sleep", waits.append)
+    return waits
+
+
+def uploader(github, **kwargs) -> GitHubUploader:
+    return GitHubUploader("token", owner="owner", repo="repo", api_url=github.api_url, **kwargs)
+
+
+def calls(github) -> list[str]:
+    return [f"{method} {path}" for method, path, _ in github.requests]
+
+
+def test_upload_is_one_commit_of_blobs_tree_and_ref(github, sleeps):
+    head = github.head
+    commit = uploader(github).upload({"data/a.json": b'{"a": 2}\n', "data/b.json": b"[]\n"}, "update")
+
+    assert calls(github) == [
+        "GET git/ref/heads/main",
+        f"GET git/commits/{head}",
+        f"GET git/trees/{github.objects[head]['tree']}?recursive=1",
+        "POST git/blobs",
+        "POST git/blobs",
+        "POST git/trees",
+        "POST git/commits",
+        "PATCH git/refs/heads/main",
+    ]
+    assert github.head == commit
+    assert github.objects[commit]["parents"] == [head]
+    assert github.file("data/a.json") == b'{"a": 2}\n'
+    assert github.file("data/b.json") == b"[]\n"
+    assert sleeps == []
+
+
+def test_unchanged_files_are_skipped(github, sleeps):
+    head = github.head
+    client = uploader(github)
+    assert client.upload({"data/a.json": b'{"a": 1}\n'}, "update") is None
+    assert github.head == head
+    assert not any(method != "GET" for method, _, _ in github.requests)
+
+    client.upload({"data/a.json": b'{"a": 1}\n', "data/b.json": b"[]\n"}, "update")
+    posted = [path for method, path, _ in github.requests if method == "POST"]
+    assert posted == ["git/blobs", "git/trees", "git/commits"]
+
+
+def test_repeated_gets_send_the_etag_and_reuse_the_304_body(github, sleeps):
+    client = uploader(github)
+    first = client.get("git/ref/heads/main")
+    second = client.get("git/ref/heads/main")
+
+    assert second == first
+    (_, _, headers1), (_, _, headers2) = github.requests
+    assert "If-None-Match" not in headers1
+    assert headers2["If-None-Match"].startswith('"')
+    assert client.requests_made == 2
+
+
+def test_etags_are_kept_between_runs(github, sleeps, tmp_path):
+    cache = tmp_path / "etags.json"
+    first = uploader(github, etag_cache=cache)
+    assert first.upload({"data/a.json": b'{"a": 1}\n'}, "update") is None
+    first.save_etags()
+    github.requests.clear()
+
+    # A new uploader stands in for the next run: every GET is conditional
+    second = uploader(github, etag_cache=cache)
+    assert second.upload({"data/a.json": b'{"a": 1}\n'}, "update") is None
+    assert len(github.requests) == 3
+    assert all("If-None-Match" in headers for _, _, headers in github.requests)
+
+    # Only the urls requested in a run are written back
+    second.get("git/ref/heads/main")
+    second._etags["http://elsewhere/unused"] = ('"x"', {})
+    second.save_etags()
+    assert len(json.loads(cache.read_text())) == 3
+
+
+def test_server_errors_are_retried_with_exponential_backoff(github, sleeps):
+    github.failures["GET git/ref/heads/main"] = [(502, {}), (503, {}), (500, {})]
+    client = uploader(github, backoff=0.5)
+
+    assert client.get("git/ref/heads/main") == {"object": {"sha": github.head}}
+    assert sleeps == [0.5, 1.0, 2.0]
+    assert client.requests_made == 4
+
+
+def test_retries_give_up_after_max_retries(github, sleeps):
+    github.failures["POST git/blobs"] = [(500, {})] * 3
+    client = uploader(github, max_retries=2, backoff=0.1)
+
+    with pytest.raises(github_upload.requests.HTTPError):
+        client.post("git/blobs", {"content": "", "encoding": "base64"})
+    assert sleeps == [0.1, 0.2]
+
+
+def test_client_errors_are_not_retried(github, sleeps):
+    github.failures["GET git/ref/heads/main"] = [(404, {})]
+    with pytest.raises(github_upload.requests.HTTPError):
+        uploader(github).get("git/ref/heads/main")
+    assert sleeps == []
+    assert len(github.requests) == 1
+
+
+def test_rate_limits_honour_retry_after(github, sleeps):
+    github.failures["GET git/ref/heads/main"] = [
+        (429, {"Retry-After": "7"}),
+        (403, {"X-RateLimit-Remaining": "0", "Retry-After": formatdate(0, usegmt=True)}),
+        (429, {"Retry-After": "soon"}),
+    ]
+    uploader(github, backoff=0.25).get("git/ref/heads/main")
+    # seconds; an HTTP date in the past; unparseable, so the third backoff step
+    assert sleeps == [7.0, 0.0, 1.0]
+
+
+def test_retry_after_formats():
+    now = 1_700_000_000.0
+    assert retry_after_seconds("120", now) == 120.0
+    assert retry_after_seconds("1.5", now) == 1.5
+    assert retry_after_seconds(formatdate(now + 30, usegmt=True), now) == 30.0
+    assert retry_after_seconds(formatdate(now + 30), now) == 30.0
+    assert retry_after_seconds(formatdate(now - 30, usegmt=True), now) == 0.0
+    assert retry_after_seconds("Wed, 21 Oct 2015 07:28:00 -0000", 1445412480.0) == 0.0
+    assert retry_after_seconds("not a date", now) is None
+    assert retry_after_seconds("", now) is None
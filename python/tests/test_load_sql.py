@@ -0,0 +1,68 @@
+"""load_sql.py against SQLite, with the published actions.json."""
+
+import json
+from pathlib import Path
+
+import pytest
+
+from load_sql import Database, load
+
+ROOT = Path(__file__).resolve().parents[2]
+
+
+@pytest.fixture
+def records():
+    return json.loads((ROOT / "public/data/actions.json").read_text(encoding="utf-8"))
+
+
+@pytest.fixture
+def db(tmp_path):
+    db = Database.sqlite(tmp_path / "un80actions.db")
+    db.create_schema((ROOT / "sql/schema/un80actions_schema.sql").read_text(encoding="utf-8"))
+    db.conn.commit()
+    db.check_schema()
+    return db
+
+
+def test_second_load_changes_nothing(db, records):
+    first = load(db, records)
+    assert sum(sync.rows for sync in first.values()) > 0
+    assert db.select("actions", ("count(*)",)) == [(len(records),)]
+
+    second = load(db, records)
+    assert {table: sync.rows for table, sync in second.items() if sync.rows} == {}
+    assert db.conn.execute("pragma foreign_key_check").fetchall() == []
+
+
+def test_subactions_are_stored_next_to_their_parent(db, records):
+    load(db, records)
+    rows = db.conn.execute(
+        "select sub_id, is_subaction from actions where action_number = 94 order by sub_id"
+    ).fetchall()
+    assert rows[0] == ("", 0)
+    assert len(rows) > 1 and all(is_subaction for _, is_subaction in rows[1:])
+
+
+def test_only_changed_rows_are_sent(db, records):
+    load(db, records)
+    records[0] = {**records[0], "indicative_activity": records[0]["indicative_activity"] + " (edited)"}
+    result = load(db, records)
+    assert {table: sync.rows for table, sync in result.items() if sync.rows} == {"actions": 1}
+    assert result["actions"].updated == 1
+
+
+def test_failed_load_rolls_back(db, records):
+    load(db, records)
+    broken = [*records, {**records[0], "report": "not a workstream"}]
+    with pytest.raises(ValueError):
+        load(db, broken)
+    assert not db.conn.in_transaction
+    assert load(db, records)["actions"].rows == 0
+
+
+def test_duplicate_action_numbers_are_rejected(db, records):
+    main = next(r for r in records if not r["is_subaction"] and r["work_package_number"] != 1)
+    clash = {**next(r for r in records if r["work_package_number"] == 1), "action_number": main["action_number"]}
+    with pytest.raises(ValueError, match=rf"Action {main['action_number']}: .*WP {main['work_package_number']}.*WP 1"):
+        load(db, [*records, clash])
+    assert db.select("actions", ("count(*)",)) == [(0,)]
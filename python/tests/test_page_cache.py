@@ -0,0 +1,66 @@
+"""page_content_hash and PageCache."""
+
+from concurrent.futures import ThreadPoolExecutor
+
+import fitz
+from page_cache import PageCache, page_content_hash
+
+
+def pixmap(color: tuple[int, int, int]) -> fitz.Pixmap:
+    pix = fitz.Pixmap(fitz.csRGB, fitz.IRect(0, 0, 4, 4), False)
+    pix.set_rect(pix.irect, color)
+    return pix
+
+
+def form_doc(text: str, blank_pages: int = 0) -> fitz.Document:
+    """A page that draws *text* only through a form XObject, after *blank_pages*."""
+    src = fitz.open()
+    src.new_page().insert_text((72, 72), text)
+    doc = fitz.open()
+    for _ in range(blank_pages):
+        doc.new_page()
+    doc.new_page().show_pdf_page(fitz.Rect(0, 0, 595, 842), src, 0)
+    return doc
+
+
+def test_hash_covers_form_xobjects():
+    a, b = form_doc("Action 1"), form_doc("Action 2")
+    assert a[0].read_contents() == b[0].read_contents()
+    assert page_content_hash(a[0]) != page_content_hash(b[0])
+
+
+def test_hash_ignores_position_and_object_numbers():
+    assert page_content_hash(form_doc("Action 1")[0]) == page_content_hash(form_doc("Action 1", blank_pages=2)[2])
+
+
+def test_hash_covers_images():
+    doc = fitz.open()
+    page = doc.new_page()
+    xref = page.insert_image(fitz.Rect(0, 0, 100, 100), pixmap=pixmap((255, 0, 0)))
+    contents, before = page.read_contents(), page_content_hash(page)
+    # Same size and object, other pixels: only the image stream changes
+    doc.update_stream(xref, pixmap((0, 0, 255)).samples)
+    assert doc[0].read_contents() == contents
+    assert page_content_hash(doc[0]) != before
+
+
+def test_memo_gives_the_same_hashes():
+    doc = form_doc("Action 1", blank_pages=3)
+    memo = {}
+    assert [page_content_hash(p, memo) for p in doc] == [page_content_hash(p) for p in doc]
+
+
+def test_put_get_roundtrip(tmp_path):
+    cache = PageCache("v", directory=tmp_path)
+    assert cache.get("abc") is None
+    cache.put("abc", [{"action": "Action 1"}])
+    assert cache.get("abc") == [{"action": "Action 1"}]
+    assert str(cache.stats) == "1 hits, 1 misses, 1 written, 0 evicted"
+
+
+def test_concurrent_puts_of_one_key(tmp_path):
+    cache, writers = PageCache("v", directory=tmp_path), 8
+    with ThreadPoolExecutor(writers) as pool:
+        list(pool.map(lambda i: cache.put("same", {"writer": i % writers}), range(50 * writers)))
+    assert cache.get("same") is not None
+    assert not list(tmp_path.glob("*.tmp"))
@@ -0,0 +1,38 @@
+"""Stage code discovery in pipeline.py."""
+
+from pathlib import Path
+
+import pytest
+
+import pipeline
+from pipeline import STAGES, code_files, local_imports
+
+ROOT = Path(__file__).resolve().parents[2]
+
+
+@pytest.fixture
+def python_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(pipeline, "PYTHON_DIR", tmp_path)
+    pipeline.direct_imports.cache_clear()
+    yield tmp_path
+    pipeline.direct_imports.cache_clear()
+
+
+def test_imports_are_followed_through_functions_and_cycles(python_dir):
+    (python_dir / "script.py").write_text("import json\nfrom helper import f\n")
+    (python_dir / "helper.py").write_text("def f():\n    import lazy.sub\n    from script import g\n")
+    (python_dir / "lazy.py").write_text("")
+    (python_dir / "unused.py").write_text("")
+    assert local_imports("script.py") == {"script.py", "helper.py", "lazy.py"}
+
+
+def test_stage_code_covers_every_imported_module(monkeypatch):
+    monkeypatch.chdir(ROOT)
+    pipeline.direct_imports.cache_clear()
+    code = {stage.name: code_files(stage) for stage in STAGES}
+    for name in ("prepare", "extract", "editions", "stats", "search_index"):
+        assert "instrument.py" in code[name]
+    assert {"bundle.py", "search_index.py", "pdf_index.py", "page_cache.py"} <= set(code["extract"])
+    assert {"validation.py", "validation_rules.json"} <= set(code["prepare"])
+    assert "products_timeline_overrides.json" in code["products_timeline"]
+    assert code["bundle"] == ["bundle.py"]
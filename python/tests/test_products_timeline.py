@@ -0,0 +1,152 @@
+"""products_timeline.py: normalization, overrides and the published file."""
+
+import json
+from pathlib import Path
+
+import pytest
+
+from products_timeline import OVERRIDES_PATH, build_timeline, load_overrides, normalize_product
+
+ROOT = Path(__file__).resolve().parents[2]
+
+
+def work_package(number: int, name: str, *rows: tuple[str, list[str]]) -> dict:
+    return {
+        "workPackageNumber": number,
+        "workPackageName": name,
+        "summaryTable": [{"action": action, "writtenProducts": products} for action, products in rows],
+    }
+
+
+def entries(timeline: dict) -> list[tuple[str, str, dict]]:
+    return [
+        (category["key"], item["month"], entry)
+        for category in timeline["categories"]
+        for item in category["items"]
+        for entry in item["entries"]
+    ]
+
+
+@pytest.mark.parametrize(
+    ("raw", "expected"),
+    [
+        ("Secretary-General’s  report\n(May)", "Secretary-General's report (May)"),
+        ("Expertise- on-Demand", "Expertise-on-Demand"),
+        ("System-\u00adwide  results", "System-wide results"),
+        ("pre- and post-deployment", "pre- and post-deployment"),
+        ("Jun – Dec", "Jun – Dec"),
+    ],
+)
+def test_normalize_product(raw, expected):
+    assert normalize_product(raw) == expected
+
+
+def test_fixes_apply_after_normalizing():
+    assert normalize_product("report on the fni  ancing", {"fni ancing": "financing"}) == "report on the financing"
+
+
+def test_overrides():
+    wps = [
+        work_package(
+            1,
+            "Peace Operations",
+            ("Action 14", ["Secretary-General’s information brief (July)", "Interim note (June)"]),
+            ("Action 15", ["Secretary-General’s report (June)", "Budgets for 2027 and 2028"]),
+        ),
+        work_package(2, "Humanitarian", ("Actions 16, 17", ["Secretary-General’s report"])),
+    ]
+    overrides = {
+        "labels": {"1": "Peace Ops"},
+        "products": [
+            {"product": "Secretary-General's report", "label": "SG report"},
+            {"workPackage": 1, "product": "Secretary-General's report", "label": "Review", "month": "July"},
+            {"workPackage": 1, "product": "Interim note", "drop": True},
+            {"workPackage": 1, "product": "Budgets for 2027 and 2028", "replace": ["Budget 2027 (May)", "Budget 2028"]},
+            {"workPackage": 2, "action": 17, "product": "Secretary-General's report", "category": "tools", "note": None},
+            {"product": "Nowhere to be found", "drop": True},
+        ],
+        "additions": [{"workPackage": 2, "actions": [18], "category": "briefs", "month": "May"}],
+    }
+    assert entries(build_timeline(wps, overrides)) == [
+        ("reports", "May", {"workPackages": [1], "text": "Budget 2027"}),
+        ("reports", "July", {"workPackages": [1], "text": "Review"}),
+        ("reports", "Later or TBD", {"workPackages": [1], "text": "Budget 2028"}),
+        ("briefs", "May", {"workPackages": [2], "text": "Humanitarian", "actions": [18]}),
+        ("briefs", "July", {"workPackages": [1], "text": "Peace Ops", "actions": [14]}),
+        ("tools", "Later or TBD", {"workPackages": [2], "text": "Humanitarian", "actions": [16, 17]}),
+    ]
+
+
+def test_additions_skip_actions_that_have_products():
+    overrides = {
+        "products": [{"product": "Download counts", "category": "tools", "note": None}],
+        "additions": [
+            {"workPackage": 30, "actions": [87], "category": "tools", "month": "June"},
+            {"workPackage": 30, "actions": [88], "category": "tools", "month": "May"},
+        ],
+    }
+    without = work_package(30, "SG Reports", ("Action 87", []), ("Action 88", []))
+    with_product = work_package(30, "SG Reports", ("Action 87", ["Download counts (starting May)"]), ("Action 88", []))
+    assert entries(build_timeline([without], overrides)) == [
+        ("tools", "May", {"workPackages": [30], "text": "SG Reports", "actions": [88]}),
+        ("tools", "June", {"workPackages": [30], "text": "SG Reports", "actions": [87]}),
+    ]
+    # The extracted product replaces the addition for action 87, not joins it
+    assert entries(build_timeline([with_product], overrides)) == [
+        ("tools", "May", {"workPackages": [30], "text": "SG Reports", "actions": [87, 88]}),
+    ]
+
+
+def test_unused_overrides_are_reported(capsys):
+    build_timeline([], {"products": [{"product": "Gone", "drop": True}]})
+    assert "matches no product" in capsys.readouterr().out
+
+
+def test_unknown_category_is_rejected(tmp_path):
+    path = tmp_path / "overrides.json"
+    path.write_text(json.dumps({"products": [{"product": "x", "category": "memos"}]}))
+    with pytest.raises(ValueError, match="unknown category"):
+        load_overrides(path)
+
+
+def timeline_from(progress: list[dict], capsys) -> tuple[dict, set[str]]:
+    """The timeline and the unused-override warnings for actions_progress.json entries."""
+    capsys.readouterr()
+    timeline = build_timeline(progress, load_overrides(ROOT / OVERRIDES_PATH))
+    return timeline, set(capsys.readouterr().out.splitlines())
+
+
+@pytest.fixture(scope="module")
+def extracted_progress() -> list[dict]:
+    """actions_progress.json with the summary tables the extractor finds in the shipped PDF."""
+    import fitz
+
+    from extract_pdf_tables import extract_pages, wp_summary_tables
+    from pdf_index import load_index, summary_pages
+
+    pdf_path = ROOT / "public/data/actions_progress.pdf"
+    plan = summary_pages(load_index(pdf_path))
+    pages = [i for i, _ in plan]
+    with fitz.open(pdf_path) as doc:
+        page_rows = {i: rows for i, (rows, *_) in zip(pages, extract_pages(doc, pages))}
+    tables = wp_summary_tables(plan, page_rows)
+
+    progress = json.loads((ROOT / "public/data/actions_progress.json").read_text(encoding="utf-8"))
+    for wp in progress:
+        if wp["workPackageNumber"] in tables:
+            wp["summaryTable"] = tables[wp["workPackageNumber"]]
+    return progress
+
+
+def test_published_timeline_is_up_to_date(extracted_progress, capsys):
+    published = json.loads((ROOT / "public/data/products_timeline.json").read_text(encoding="utf-8"))
+    committed = json.loads((ROOT / "public/data/actions_progress.json").read_text(encoding="utf-8"))
+
+    # From the curated actions_progress.json and from a fresh extraction, as
+    # the pipeline produces it after the extract stage
+    from_committed, unused_committed = timeline_from(committed, capsys)
+    from_extracted, unused_extracted = timeline_from(extracted_progress, capsys)
+    assert from_committed == published
+    assert from_extracted == published
+    # Every curated override matches a product in at least one of them
+    assert unused_committed & unused_extracted == set()
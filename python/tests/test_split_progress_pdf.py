@@ -0,0 +1,105 @@
+"""Incremental splitting in split_progress_pdf.py."""
+
+import json
+
+import fitz
+import pytest
+import split_progress_pdf
+
+
+def write_report(path, body: str) -> None:
+    """A two-work-package report whose pages draw everything through form XObjects."""
+    doc = fitz.open()
+    for wp, text in ((1, body), (2, "Unchanged")):
+        src = fitz.open()
+        src.new_page().insert_text((72, 72), f"Work Package {wp} | Leads: Someone\n{text}")
+        doc.new_page().show_pdf_page(fitz.Rect(0, 0, 595, 842), src, 0)
+    doc.save(path)
+
+
+@pytest.fixture
+def report(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    split_progress_pdf.PDF_PATH.parent.mkdir(parents=True)
+    return split_progress_pdf.PDF_PATH
+
+
+def manifest() -> dict:
+    return json.loads(split_progress_pdf.MANIFEST_PATH.read_text(encoding="utf-8"))
+
+
+def test_second_run_writes_nothing(report, capsys):
+    write_report(report, "Action 1")
+    split_progress_pdf.main([])
+    first = manifest()
+    split_progress_pdf.main([])
+    assert manifest() == first
+    assert "Wrote 0 of 2 work package PDFs" in capsys.readouterr().out
+
+
+def test_changed_form_xobject_rewrites_the_pdf(report):
+    write_report(report, "Action 1")
+    split_progress_pdf.main([])
+    before = manifest()
+    write_report(report, "Action 2")
+    split_progress_pdf.main([])
+    after = manifest()
+    assert after["wp1.pdf"]["fingerprint"] != before["wp1.pdf"]["fingerprint"]
+    assert after["wp2.pdf"] == before["wp2.pdf"]
+    assert "Action 2" in fitz.open(split_progress_pdf.OUTPUT_DIR / "wp1.pdf")[0].get_text()
+
+
+def test_changed_form_xobject_rewrites_the_derivatives(report, capsys):
+    write_report(report, "Action 1")
+    split_progress_pdf.main([])
+    before = manifest()
+    thumbnail = (split_progress_pdf.OUTPUT_DIR / "wp1.png").read_bytes()
+    write_report(report, "Action 2")
+    capsys.readouterr()
+    split_progress_pdf.main([])
+    after = manifest()
+
+    for name in ("wp1.png", "wp1.json"):
+        assert after[name]["fingerprint"] != before[name]["fingerprint"]
+    for name in ("wp2.png", "wp2.json"):
+        assert after[name] == before[name]
+    assert "Wrote 2 of 4 thumbnails" in capsys.readouterr().out
+    assert (split_progress_pdf.OUTPUT_DIR / "wp1.png").read_bytes() != thumbnail
+    extract = json.loads((split_progress_pdf.OUTPUT_DIR / "wp1.json").read_text(encoding="utf-8"))
+    assert "Action 2" in extract["text"][0]
+
+
+def test_new_dpi_only_rewrites_the_thumbnails(report, capsys):
+    write_report(report, "Action 1")
+    split_progress_pdf.main([])
+    before = manifest()
+    capsys.readouterr()
+    split_progress_pdf.main(["--dpi", "24"])
+    after = manifest()
+
+    assert "Wrote 2 of 4 thumbnails (png@24dpi)" in capsys.readouterr().out
+    assert {name for name in after if after[name] != before[name]} == {"wp1.png", "wp2.png"}
+
+
+def test_dropped_work_package_files_are_removed(report, capsys):
+    write_report(report, "Action 1")
+    split_progress_pdf.main([])
+    assert {"wp2.pdf", "wp2.png", "wp2.json"} <= set(manifest())
+
+    # The next edition only has work package 1
+    doc = fitz.open(report)
+    doc.delete_page(1)
+    doc.save(report.with_suffix(".tmp"))
+    doc.close()
+    report.with_suffix(".tmp").replace(report)
+    capsys.readouterr()
+    split_progress_pdf.main([])
+
+    assert sorted(manifest()) == ["wp1.json", "wp1.pdf", "wp1.png"]
+    assert sorted(p.name for p in split_progress_pdf.OUTPUT_DIR.iterdir()) == [
+        "manifest.json",
+        "wp1.json",
+        "wp1.pdf",
+        "wp1.png",
+    ]
+    assert "Removed 3 files" in capsys.readouterr().out
@@ -0,0 +1,43 @@
+"""Facet keys in stats.py."""
+
+from stats import build_stats, normalize_leader, normalize_team_member
+
+
+def record(action_number: int, **fields) -> dict:
+    return {"action_number": action_number, "work_package_number": 1, "report": "Workstream 1", **fields}
+
+
+def test_normalization_matches_the_dashboard_filters():
+    assert normalize_leader(" ASG UNITAR ") == "ED UNITAR"
+    assert normalize_leader("USG DOS") == "USG DOS"
+    for variant in ("EOSG", "EOSG (ODSG)", "EOSG(USG Policy)", "EOSG SA", "EOSG (New)"):
+        assert normalize_team_member(variant) == "EOSG"
+    assert normalize_team_member("SA Reform") is None
+    assert normalize_team_member("  ") is None
+    assert normalize_team_member(" DOS ") == "DOS"
+
+
+def test_facet_keys_are_normalized():
+    stats = build_stats(
+        [
+            record(1, work_package_leads=["ASG UNITAR"], action_entities="EOSG (ODSG); SA Reform; DOS"),
+            record(2, work_package_leads=["ED UNITAR"], action_entities="EOSG(USG Policy)"),
+        ]
+    )
+    assert stats["facets"]["lead"] == {"ED UNITAR": [1, 2]}
+    assert stats["facets"]["entity"] == {"DOS": [1], "EOSG": [1, 2]}
+    assert stats["counts"]["lead"] == {"ED UNITAR": 2}
+
+
+def test_subactions_do_not_leak_into_parent_facets():
+    stats = build_stats(
+        [
+            record(5, public_action_status="Further work ongoing", action_entities="DOS"),
+            record(5, is_subaction=True, public_action_status="Decision taken", action_entities="OICT"),
+        ]
+    )
+    assert stats["facets"]["status"] == {"Further work ongoing": [5]}
+    assert stats["facets"]["entity"] == {"DOS": [5]}
+    assert stats["subactionFacets"]["status"] == {"Decision taken": [5]}
+    assert stats["subactionFacets"]["entity"] == {"OICT": [5]}
+    assert stats["counts"]["status"] == {"Further work ongoing": 1}
@@ -0,0 +1,74 @@
+"""identify_subactions() against the group loop it replaced."""
+
+import numpy as np
+import pandas as pd
+from hypothesis import given, settings
+from hypothesis import strategies as st
+from prepare_actions_data import identify_subactions
+
+KEYS = ["action_number", "work_package_number", "report"]
+
+
+def loop_subactions(df: pd.DataFrame) -> pd.Series:
+    """The previous implementation: one df.loc write per duplicated group."""
+    df = df.copy()
+    df["is_subaction"] = False
+    for _, group in df.groupby(KEYS):
+        if len(group) > 1:
+            group_indices = group.index.tolist()
+            has_doc_para = group["document_paragraph"].notna() & (
+                group["document_paragraph"].astype(str).str.strip() != ""
+            )
+            if has_doc_para.any():
+                keep_indices = group[has_doc_para].index.tolist()
+                subaction_indices = [idx for idx in group_indices if idx not in keep_indices]
+            else:
+                subaction_indices = group_indices[1:]
+            df.loc[subaction_indices, "is_subaction"] = True
+    return df["is_subaction"]
+
+
+rows = st.fixed_dictionaries(
+    {
+        "action_number": st.sampled_from([1.0, 2.0, 3.0, 17.0, np.nan]),
+        "work_package_number": st.sampled_from([1.0, 2.0, np.nan]),
+        "report": st.sampled_from(["Workstream 1", "Workstream 2", None]),
+        "document_paragraph": st.sampled_from([None, "", "  ", "12", "14(b)"]),
+    }
+)
+
+
+@st.composite
+def frames(draw):
+    records = draw(st.lists(rows, max_size=40))
+    # Unique, unordered index labels, as after filtering or concatenation
+    index = draw(st.permutations(range(len(records) * 3)))[: len(records)]
+    return pd.DataFrame(records, index=index, columns=[*KEYS, "document_paragraph"])
+
+
+@settings(max_examples=300, deadline=None)
+@given(frames())
+def test_matches_the_group_loop(df):
+    pd.testing.assert_series_equal(identify_subactions(df), loop_subactions(df), check_names=False)
+
+
+@settings(max_examples=100, deadline=None)
+@given(frames())
+def test_matches_the_group_loop_with_categorical_keys(df):
+    typed = df.astype({"report": "category", "document_paragraph": "category"})
+    pd.testing.assert_series_equal(identify_subactions(typed), loop_subactions(df), check_names=False)
+
+
+def test_nan_keys_and_single_row_groups():
+    df = pd.DataFrame(
+        {
+            "action_number": [1, 1, np.nan, np.nan, 2, 3, 3, 3],
+            "work_package_number": [1, 1, 1, 1, 1, 2, 2, 2],
+            "report": ["A"] * 8,
+            "document_paragraph": [None, None, None, None, "5", None, "7", "8"],
+        },
+        index=[10, 3, 7, 1, 0, 5, 9, 2],
+    )
+    expected = [False, True, False, False, False, True, False, False]
+    assert identify_subactions(df).tolist() == expected
+    assert loop_subactions(df).tolist() == expected
@@ -0,0 +1,52 @@
+"""The three ingestion paths report the same problems for the same export."""
+
+import json
+import shutil
+from pathlib import Path
+
+import pytest
+
+from prepare_actions_data import prepare, validate_export
+from stream_actions import prepare_streaming
+
+ROOT = Path(__file__).resolve().parents[2]
+
+
+@pytest.fixture
+def export(tmp_path, monkeypatch):
+    """The real export with one truly empty column and three that only clean to nulls."""
+    for name in ("python/validation_rules.json", "sql/schema/un80actions_schema.sql"):
+        (tmp_path / name).parent.mkdir(parents=True, exist_ok=True)
+        shutil.copy(ROOT / name, tmp_path / name)
+    monkeypatch.chdir(tmp_path)
+
+    records = json.loads((ROOT / "data/input/actions_raw.json").read_text(encoding="utf-8"))
+    for record in records:
+        record["updates"] = ""  # empty in the export
+        record["sub_action_details"] = "   "  # whitespace only
+        record["delivery_date"] = "TBD"  # no date
+        record["action_leads"] = " ; "  # no items
+    path = tmp_path / "actions_raw.json"
+    path.write_text(json.dumps(records), encoding="utf-8")
+    return path
+
+
+def problems(message: str) -> list[str]:
+    return [line for line in message.splitlines() if line.startswith("❌")]
+
+
+def test_paths_agree_on_empty_columns(export, tmp_path):
+    output = tmp_path / "actions.json"
+    with pytest.raises(AssertionError) as in_memory:
+        prepare(export, output)
+    with pytest.raises(AssertionError) as streamed:
+        prepare_streaming(export, output, chunk_size=25)
+    with pytest.raises(SystemExit) as validated:
+        validate_export(export)
+
+    reported = problems(str(validated.value))
+    assert problems(str(in_memory.value)) == reported
+    assert problems(str(streamed.value)) == reported
+    empty = [line for line in reported if "completely null" in line]
+    assert empty == ["❌ Power Automate Issue: Column 'updates' is completely null."]
+    assert not output.exists()
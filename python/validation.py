@@ -0,0 +1,435 @@
+"""Declarative checks run before actions.json is written.
+
+The rules live in RULES_PATH (validation_rules.json):
+
+- "records": rows expected in the Power Automate export, subactions included
+- "rowKey": the columns that identify a row in violation messages
+- "counts": the totals on the UI DataCards, each the "distinct" values of a
+  column, the "distinctItems" of a list column, or "rows" ("all" rows, or
+  the "actions", i.e. rows that are not subactions)
+- "notNull": columns that need a value in every row
+- "enums": columns whose values must belong to a Postgres enum type of the
+  SQL schema ("sqlType") or to a "values" list; nulls are allowed
+- "overrides": statuses that were set by hand in public/data/actions.json
+  because the Excel workbook had not caught up. Regenerating from the
+  workbook would silently revert them, so fail loudly instead of writing
+  the file. Remove an entry once the workbook agrees (the check then passes
+  by itself) or once the override is no longer wanted.
+
+A completely null column always fails (the Power Automate export broke), and
+so do "notNull" and "enums". Empty columns are judged on the raw export (""
+counts as null) in every path, so a column of blanks or unparseable dates
+that only becomes null once cleaned does not fail. "records", "counts" and "overrides" describe the
+current edition and are skipped with --no-validate.
+
+Each ingestion path evaluates the same rules its own way: check_frame() in
+one vectorized pass over the cleaned frame (prepare_actions_data.py),
+row_violations() per chunk (--stream) and summarize_records() over the raw
+records in pure Python (`prepare_actions_data.py validate`, the pre-commit
+check). This module itself does not import pandas. Values are compared as
+cleaned strings, so e.g. work package "7" and " 7 " are one work package.
+"""
+
+from __future__ import annotations
+
+import json
+import re
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from pathlib import Path
+
+RULES_PATH = Path("python/validation_rules.json")
+SCHEMA_PATH = Path("sql/schema/un80actions_schema.sql")
+
+# Row keys listed per violation; the rest are only counted
+MAX_ROW_KEYS = 10
+
+OVERRIDE_HELP = (
+    "public/data/actions.json was edited by hand and regenerating from the\n"
+    "workbook would revert it. Nothing has been written. Resolve by either:\n"
+    "  - setting public_action_status in the Excel workbook (preferred), or\n"
+    "  - deleting the entry from \"overrides\" in python/validation_rules.json,\n"
+    "    which lets the workbook win."
+)
+
+
+@dataclass(frozen=True)
+class Count:
+    name: str
+    expected: int
+    distinct: str | None = None
+    distinct_items: str | None = None
+    rows: str | None = None  # "all" or "actions"
+
+
+@dataclass
+class Rules:
+    records: int
+    row_key: list[str]
+    counts: list[Count]
+    not_null: list[str]
+    # column -> allowed values, and how to name them in messages
+    enums: dict[str, list[str]]
+    enum_names: dict[str, str]
+    override_column: str
+    override_key: str
+    overrides: dict[str, str]  # key value (e.g. action number) -> status
+
+
+def sql_enum_values(type_name: str, schema_path: Path = SCHEMA_PATH) -> list[str]:
+    """The labels of `create type <type_name> as enum (...)` in the schema file."""
+    sql = schema_path.read_text(encoding="utf-8")
+    match = re.search(rf"create type {re.escape(type_name)} as enum \((.*?)\);", sql, re.DOTALL)
+    if match is None:
+        raise ValueError(f"{schema_path}: no enum type {type_name!r}")
+    return [label.replace("''", "'") for label in re.findall(r"'((?:[^']|'')*)'", match.group(1))]
+
+
+def load_rules(path: Path = RULES_PATH, schema_path: Path = SCHEMA_PATH) -> Rules:
+    raw = json.loads(path.read_text(encoding="utf-8"))
+    counts = []
+    for count in raw.get("counts", []):
+        kinds = {"distinct", "distinctItems", "rows"} & count.keys()
+        if len(kinds) != 1 or count.get("rows", "all") not in ("all", "actions"):
+            raise ValueError(f"{path}: count {count.get('name')!r} needs one of distinct, distinctItems or rows")
+        counts.append(
+            Count(
+                count["name"],
+                count["expected"],
+                distinct=count.get("distinct"),
+                distinct_items=count.get("distinctItems"),
+                rows=count.get("rows"),
+            )
+        )
+
+    enums, enum_names = {}, {}
+    for column, enum in raw.get("enums", {}).items():
+        if "sqlType" in enum:
+            enums[column] = sql_enum_values(enum["sqlType"], schema_path)
+            enum_names[column] = f"SQL type {enum['sqlType']}"
+        else:
+            enums[column] = list(enum["values"])
+            enum_names[column] = "allowed values"
+
+    overrides = raw.get("overrides", {})
+    return Rules(
+        records=raw["records"],
+        row_key=raw.get("rowKey", []),
+        counts=counts,
+        not_null=raw.get("notNull", []),
+        enums=enums,
+        enum_names=enum_names,
+        override_column=overrides.get("column", "public_action_status"),
+        override_key=overrides.get("key", "action_number"),
+        overrides=overrides.get("values", {}),
+    )
+
+
+def count_mismatches(rules: Rules, actual: dict[str, int]) -> list[str]:
+    """One message per count that differs from the expected value."""
+    return [
+        f"{count.name} count mismatch! Expected {count.expected}, got {actual[count.name]}"
+        for count in rules.counts
+        if actual[count.name] != count.expected
+    ]
+
+
+def override_conflicts(rules: Rules, statuses: dict[str, list]) -> list[str]:
+    """Compare the overrides with the exported statuses.
+
+    *statuses* maps each overridden key (action number) to the status of
+    every non-subaction row with that key (empty if there is none).
+    """
+    conflicts = []
+
+    for action_number, expected_status in rules.overrides.items():
+        actual_statuses = statuses.get(action_number, [])
+        if not actual_statuses:
+            conflicts.append(
+                f"Action {action_number}: overridden here but missing from the workbook export"
+            )
+            continue
+        for actual_status in actual_statuses:
+            if actual_status != expected_status:
+                conflicts.append(
+                    f"Action {action_number}: workbook says {actual_status!r}, "
+                    f"repo override says {expected_status!r}"
+                )
+
+    return conflicts
+
+
+def _is_null(value) -> bool:
+    # None, NaN and NaT (pandas missing values are not equal to themselves)
+    return value is None or value != value
+
+
+def _key_text(key: tuple) -> str:
+    return " / ".join("?" if _is_null(v) else str(v) for v in key)
+
+
+def violation_messages(violations: dict[str, list[tuple]]) -> list[str]:
+    """"<violation> in N row(s): <row keys>" per violation."""
+    messages = []
+    for label, keys in violations.items():
+        if not keys:
+            messages.append(label)
+            continue
+        shown = ", ".join(_key_text(key) for key in keys[:MAX_ROW_KEYS])
+        more = f" and {len(keys) - MAX_ROW_KEYS} more" if len(keys) > MAX_ROW_KEYS else ""
+        messages.append(f"{label} in {len(keys)} row(s): {shown}{more}")
+    return messages
+
+
+def _enum_label(rules: Rules, column: str, value) -> str:
+    return f"{column} {value!r} is not one of the {rules.enum_names[column]} values"
+
+
+def row_violations(df, rules: Rules, null=None) -> dict[str, list[tuple]]:
+    """The "notNull" and "enums" violations of a cleaned frame, with their row keys.
+
+    *null* is df.isna() if the caller already has it. Only the offending
+    rows are turned into Python objects.
+    """
+    violations: dict[str, list[tuple]] = {}
+
+    def keys(mask) -> list[tuple]:
+        return list(df.loc[mask, rules.row_key].astype(object).itertuples(index=False, name=None))
+
+    for column in rules.not_null:
+        if column not in df.columns:
+            violations[f"Column '{column}' is missing"] = []
+            continue
+        mask = null[column] if null is not None else df[column].isna()
+        if mask.any():
+            violations[f"Column '{column}' is null"] = keys(mask)
+
+    for column, allowed in rules.enums.items():
+        if column not in df.columns:
+            continue
+        s = df[column]
+        invalid = s.notna() & ~s.isin(allowed)
+        if invalid.any():
+            for value, key in zip(s[invalid].astype(object).tolist(), keys(invalid)):
+                violations.setdefault(_enum_label(rules, column, value), []).append(key)
+    return violations
+
+
+def merge_violations(parts: Iterable[dict[str, list[tuple]]], rules: Rules) -> dict[str, list[tuple]]:
+    """row_violations() of consecutive chunks combined, in the order one call
+    over the whole frame would give."""
+    merged: dict[str, list[tuple]] = {}
+    for part in parts:
+        for label, keys in part.items():
+            merged.setdefault(label, []).extend(keys)
+
+    columns = [*rules.not_null, *rules.enums]
+
+    def rank(label: str) -> int:
+        # "Column 'x' is ..." for notNull, "x 'value' is not one of ..." for enums
+        column = label.split("'")[1] if label.startswith("Column '") else label.split(" ")[0]
+        return columns.index(column) if column in columns else len(columns)
+
+    return dict(sorted(merged.items(), key=lambda item: rank(item[0])))
+
+
+def empty_columns(df) -> list[str]:
+    """Columns of the raw export frame without a value ("" or null) in any row.
+
+    Checked before cleaning, like the --stream and validate paths: a column
+    that only cleans to nulls (blank strings, unparseable dates) is not an
+    export failure.
+    """
+    return [col for col in df.columns if not (df[col].notna() & df[col].ne("")).any()]
+
+
+def check_frame(
+    df,
+    rules: Rules,
+    empty: list[str],
+    lists: dict | None = None,
+    records: int | None = None,
+    validate: bool = True,
+):
+    """Evaluate *rules* over a cleaned frame with an is_subaction column.
+
+    One isna() over the frame gives the "notNull" violations, one isin()
+    per enum and per the overrides the rest, so the cost stays a handful of
+    vectorized scans however many rules there are. *empty* are the raw
+    export's empty columns (see empty_columns), *lists* maps list columns
+    stored as ids to their actions_frame.ListColumn, *records* is the
+    number of raw records.
+
+    Returns (problems, override conflicts, actual counts).
+    """
+    lists = lists or {}
+    null = df.isna()
+    problems = [f"Power Automate Issue: Column '{col}' is completely null." for col in empty]
+    problems += violation_messages(row_violations(df, rules, null))
+    if not validate:
+        return problems, [], {}
+
+    if records is not None and records != rules.records:
+        problems.insert(0, f"Records count mismatch! Expected {rules.records}, got {records}")
+
+    is_action = ~df["is_subaction"]
+    actual = {}
+    for count in rules.counts:
+        if count.distinct:
+            actual[count.name] = int(df[count.distinct].nunique())
+        elif count.distinct_items in lists:
+            actual[count.name] = lists[count.distinct_items].nunique()
+        elif count.distinct_items:
+            actual[count.name] = int(df[count.distinct_items].explode().nunique())
+        else:
+            actual[count.name] = int(is_action.sum()) if count.rows == "actions" else len(df)
+    problems += count_mismatches(rules, actual)
+
+    overridden = is_action & df[rules.override_key].isin(list(rules.overrides))
+    statuses: dict[str, list] = {}
+    for key, status in zip(
+        df.loc[overridden, rules.override_key].tolist(),
+        df.loc[overridden, rules.override_column].astype(object).tolist(),
+    ):
+        statuses.setdefault(key, []).append(None if _is_null(status) else status)
+    return problems, override_conflicts(rules, statuses), actual
+
+
+def failure_message(title: str, problems: list[str], help_text: str | None = None) -> str:
+    """The boxed ❌ list raised when validation or the override guard fails."""
+    error_message = "\n" + "=" * 60 + "\n"
+    error_message += f"{title}\n"
+    error_message += "=" * 60 + "\n"
+    for problem in problems:
+        error_message += f"❌ {problem}\n"
+    error_message += "=" * 60
+    if help_text:
+        error_message += "\n" + help_text
+    return error_message
+
+
+# Pure-Python versions of the cleaning.py conversions the checks depend on
+
+
+def _squish(value) -> str | None:
+    """cleaning.squish for one value: collapse whitespace; blank -> None."""
+    if value is None:
+        return None
+    return " ".join(str(value).split()) or None
+
+
+def _split_list(value) -> list[str]:
+    """cleaning.split_list for one value."""
+    if value is None or value == "":
+        return []
+    return [item.strip() for item in str(value).split(";") if item.strip()]
+
+
+@dataclass
+class ExportSummary:
+    records: int = 0
+    rows: int = 0  # records that are not entirely empty
+    actions: int = 0
+    subactions: int = 0
+    counts: dict[str, int] = field(default_factory=dict)  # rules.counts name -> actual
+    empty_columns: list[str] = field(default_factory=list)
+    # "notNull" and "enums" violations -> row keys, as from row_violations()
+    violations: dict[str, list[tuple]] = field(default_factory=dict)
+    # Overridden key -> statuses of its non-subaction rows
+    override_statuses: dict[str, list] = field(default_factory=dict)
+
+
+def summarize_records(records: Iterable[dict], rules: Rules) -> ExportSummary:
+    """The values checked by *rules*, from raw export records in one pass.
+
+    Gives the same counts and violations as cleaning, identify_subactions()
+    and check_frame() in prepare_actions_data.py, without pandas.
+    """
+    summary = ExportSummary()
+    columns: dict[str, None] = {}
+    non_null: set[str] = set()
+    # group key -> [any document_paragraph, first row, rows with one, rows]
+    groups: dict[tuple, list] = {}
+    distinct: dict[str, set] = {count.name: set() for count in rules.counts}
+    nulls: dict[str, list] = {column: [] for column in rules.not_null}
+    invalid: dict[str, dict[str, list]] = {column: {} for column in rules.enums}
+    allowed = {column: set(values) for column, values in rules.enums.items()}
+    override_rows = []
+
+    for record in records:
+        summary.records += 1
+        columns.update(dict.fromkeys(record))
+        present = [k for k, v in record.items() if v is not None and v != ""]
+        if not present:
+            continue
+        non_null.update(present)
+        position = summary.rows
+        summary.rows += 1
+
+        action, wp, report = (
+            _squish(record.get(k)) for k in ("action_number", "work_package_number", "report")
+        )
+        has_para = _squish(record.get("document_paragraph")) is not None
+        key = (action, wp, report) if None not in (action, wp, report) else None
+        if key is not None:
+            state = groups.get(key)
+            if state is None:
+                groups[key] = [has_para, position, int(has_para), 1]
+            else:
+                state[0] = state[0] or has_para
+                state[2] += int(has_para)
+                state[3] += 1
+
+        for count in rules.counts:
+            if count.distinct:
+                value = _squish(record.get(count.distinct))
+                if value is not None:
+                    distinct[count.name].add(value)
+            elif count.distinct_items:
+                distinct[count.name].update(_split_list(record.get(count.distinct_items)))
+
+        row_key = None
+        for column in rules.not_null:
+            if _squish(record.get(column)) is None:
+                row_key = row_key or tuple(_squish(record.get(k)) for k in rules.row_key)
+                nulls[column].append(row_key)
+        for column in rules.enums:
+            value = _squish(record.get(column))
+            if value is not None and value not in allowed[column]:
+                row_key = row_key or tuple(_squish(record.get(k)) for k in rules.row_key)
+                invalid[column].setdefault(value, []).append(row_key)
+
+        override_key = _squish(record.get(rules.override_key))
+        if override_key in rules.overrides:
+            override_rows.append(
+                (position, key, has_para, override_key, _squish(record.get(rules.override_column)))
+            )
+
+    summary.subactions = sum(
+        size - n_para if any_para else size - 1 for any_para, _, n_para, size in groups.values()
+    )
+    summary.actions = summary.rows - summary.subactions
+    for count in rules.counts:
+        if count.rows:
+            summary.counts[count.name] = summary.actions if count.rows == "actions" else summary.rows
+        else:
+            summary.counts[count.name] = len(distinct[count.name])
+    summary.empty_columns = [col for col in columns if col not in non_null]
+
+    # Same order as row_violations()
+    for column, keys in nulls.items():
+        if column not in columns:
+            summary.violations[f"Column '{column}' is missing"] = []
+        elif keys:
+            summary.violations[f"Column '{column}' is null"] = keys
+    for column, by_value in invalid.items():
+        for value, keys in by_value.items():
+            summary.violations[_enum_label(rules, column, value)] = keys
+
+    for position, key, has_para, override_key, status in override_rows:
+        if key is not None:
+            any_para, first, _, _ = groups[key]
+            if (not has_para) if any_para else position != first:
+                continue  # subaction
+        summary.override_statuses.setdefault(override_key, []).append(status)
+    return summary
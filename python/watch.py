@@ -0,0 +1,183 @@
+"""Watch the pipeline inputs and re-run the affected stages in a warm process.
+
+pipeline.py starts a fresh interpreter per stage, so every run pays the
+pandas and PyMuPDF imports again. This keeps one interpreter running with
+both already imported, polls the inputs of every stage in pipeline.STAGES
+(size and modification time, every --interval seconds) and, once a change
+has settled, runs the stages reading a changed file plus everything
+downstream of them, in this process, one after the other. The usual
+pipeline rules apply: a stage whose fingerprint matches
+data/pipeline_state.json is skipped, and the scripts only rewrite outputs
+that changed, so `next dev` only reloads what a change actually affected.
+
+Each stage's own caches stay in effect: extract and split only open the
+pages whose content hash changed (see pdf_index.py and page_cache.py).
+
+A change to a module under python/ restarts the watcher, so the stages
+always run the current code.
+
+Usage:
+    python python/watch.py [--interval SECONDS]
+"""
+
+from __future__ import annotations
+
+import argparse
+import io
+import os
+import runpy
+import sys
+import time
+import traceback
+from contextlib import redirect_stderr, redirect_stdout
+from datetime import datetime
+from pathlib import Path
+
+import instrument
+from pipeline import PYTHON_DIR, STAGES, Stage, dependencies, run, with_downstream
+
+Snapshot = dict[str, tuple[int, int]]
+
+
+def snapshot(paths) -> Snapshot:
+    """(mtime, size) of every file under *paths*, by path; missing paths are left out."""
+    files: Snapshot = {}
+    for path in map(Path, paths):
+        candidates = sorted(p for p in path.rglob("*") if p.is_file()) if path.is_dir() else [path]
+        for file in candidates:
+            try:
+                stat = file.stat()
+            except FileNotFoundError:
+                continue
+            files[file.as_posix()] = (stat.st_mtime_ns, stat.st_size)
+    return files
+
+
+def changed_files(before: Snapshot, after: Snapshot) -> set[str]:
+    return {path for path in before.keys() | after.keys() if before.get(path) != after.get(path)}
+
+
+def affected_stages(changed: set[str]) -> list[str]:
+    """Stages with a changed input (a file, or a file under an input directory)."""
+    return [
+        stage.name
+        for stage in STAGES
+        if any(path == p or path.startswith(p.rstrip("/") + "/") for path in changed for p in stage.inputs)
+    ]
+
+
+def run_in_process(stage: Stage, report_dir: Path | None) -> tuple[int, str, float]:
+    """Run one stage's script as __main__ in this process; same result as pipeline.run_stage."""
+    script = PYTHON_DIR / stage.command[0]
+    argv = [str(script), *stage.command[1:]]
+    if report_dir is not None and stage.reports:
+        argv += ["--report", str(report_dir / f"{stage.name}.json"), "--no-trace-memory"]
+
+    # A fresh recorder per run, so spans do not add up across runs
+    instrument.RECORDER = instrument.Recorder()
+    output = io.StringIO()
+    saved_argv, sys.argv = sys.argv, argv
+    start = time.perf_counter()
+    try:
+        with redirect_stdout(output), redirect_stderr(output):
+            runpy.run_path(str(script), run_name="__main__")
+        code = 0
+    except SystemExit as exc:
+        if isinstance(exc.code, int) or exc.code is None:
+            code = exc.code or 0
+        else:
+            output.write(f"{exc.code}\n")
+            code = 1
+    except Exception:
+        output.write(traceback.format_exc())
+        code = 1
+    finally:
+        sys.argv = saved_argv
+    return code, output.getvalue(), time.perf_counter() - start
+
+
+def warm_up() -> None:
+    """Import what the stages import, so the first run does not pay for it."""
+    start = time.perf_counter()
+    import fitz  # noqa: F401
+    import pandas  # noqa: F401
+
+    import actions_frame  # noqa: F401
+    import extract_pdf_tables  # noqa: F401
+    import products_timeline  # noqa: F401
+    import split_progress_pdf  # noqa: F401
+
+    print(f"✓ pandas and PyMuPDF loaded in {time.perf_counter() - start:.2f}s")
+
+
+def restart() -> None:
+    print("\n🔁 Code under python/ changed, restarting\n", flush=True)
+    os.execv(sys.executable, [sys.executable, *sys.argv])
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument(
+        "--interval",
+        type=float,
+        default=0.3,
+        metavar="SECONDS",
+        help="how often to check the inputs (default: 0.3)",
+    )
+    parser.add_argument(
+        "--report-dir",
+        type=Path,
+        metavar="DIR",
+        help="write a run report (see instrument.py) per stage that supports one into DIR",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None):
+    args = parse_args(argv)
+    warm_up()
+
+    deps = dependencies(STAGES)
+    inputs = sorted({p for stage in STAGES for p in stage.inputs})
+    code_paths = sorted(PYTHON_DIR.glob("*.py")) + sorted(PYTHON_DIR.glob("*.json"))
+
+    # Bring everything up to date once, then only what a change affects
+    run(workers=1, report_dir=args.report_dir, runner=run_in_process)
+    seen, code = snapshot(inputs), snapshot(code_paths)
+    print(f"\n👀 Watching {len(seen)} input files (Ctrl-C to stop)", flush=True)
+
+    try:
+        while True:
+            time.sleep(args.interval)
+            if snapshot(code_paths) != code:
+                restart()
+            current = snapshot(inputs)
+            if current == seen:
+                continue
+            # Wait until the files stop changing (editors and copies write in steps)
+            while True:
+                time.sleep(args.interval)
+                settled = snapshot(inputs)
+                if settled == current:
+                    break
+                current = settled
+
+            changed = changed_files(seen, current)
+            names = affected_stages(changed)
+            print(f"\n[{datetime.now():%H:%M:%S}] Changed: {', '.join(sorted(changed))}", flush=True)
+            if names:
+                run(
+                    sorted(with_downstream(names, deps), key=[s.name for s in STAGES].index),
+                    workers=1,
+                    report_dir=args.report_dir,
+                    runner=run_in_process,
+                )
+            # Stages rewrite some of their own inputs (e.g. actions_progress.json)
+            seen = snapshot(inputs)
+            print(f"\n👀 Watching {len(seen)} input files", flush=True)
+    except KeyboardInterrupt:
+        print("\n✓ Stopped watching")
+
+
+if __name__ == "__main__":
+    main()
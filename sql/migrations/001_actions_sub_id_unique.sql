@@ -0,0 +1,12 @@
+-- =========================================================
+-- actions_wp_action_number_key includes sub_id
+-- =========================================================
+-- Subactions share their parent's work package and action number
+-- (e.g. 94 and 94 (a)), so the key has to tell them apart by sub_id.
+-- Databases created from un80actions_schema.sql before this change need
+-- it once; running it again is harmless.
+set search_path = un80actions,
+    public;
+alter table actions drop constraint if exists actions_wp_action_number_key;
+alter table actions
+add constraint actions_wp_action_number_key unique (work_package_id, action_number, sub_id);
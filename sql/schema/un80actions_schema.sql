@@ -113,7 +113,7 @@ create table actions (
     doc_text text,
     public_action_status public_action_status,
     primary key (id, sub_id),
-    constraint actions_wp_action_number_key unique (work_package_id, action_number)
+    constraint actions_wp_action_number_key unique (work_package_id, action_number, sub_id)
 );
 -- Action milestones
 create table action_milestones (
@@ -13,18 +13,25 @@ interface TimelineMonth {
 }
 
 interface TimelineCategory {
+  key: string;
   category: string;
   description: string;
   items: TimelineMonth[];
 }
 
-const data = timelineData as TimelineCategory[];
+export interface WorkPackageProduct extends TimelineEntry {
+  category: string;
+  month: string;
+}
 
-const CATEGORY_KEYS: Record<string, string> = {
-  "Secretary-General's and other official reports": "reports",
-  "Secretary-General's information briefs": "briefs",
-  "Operational tools and products": "tools",
-};
+// Generated by python/products_timeline.py from the extracted summary tables
+interface Timeline {
+  months: string[];
+  categories: TimelineCategory[];
+  workPackages: Record<string, WorkPackageProduct[]>;
+}
+
+const data = timelineData as Timeline;
 
 const CATEGORY_LABELS: Record<string, string> = {
   reports: "SG reports",
@@ -32,65 +39,39 @@ const CATEGORY_LABELS: Record<string, string> = {
   tools: "Operational tools",
 };
 
-// action number → set of months
-const monthsByAction = new Map<number, Set<string>>();
-// WP number → set of months (for entries without action numbers)
-const monthsByWp = new Map<number, Set<string>>();
-// month → count of unique WPs (for chart display)
-const wpsByMonth = new Map<string, Set<number>>();
-// action number → set of category keys
-const categoriesByAction = new Map<number, Set<string>>();
-// WP number → set of category keys (for entries without action numbers)
-const categoriesByWp = new Map<number, Set<string>>();
-
-for (const cat of data) {
-  const catKey = CATEGORY_KEYS[cat.category];
-
-  for (const item of cat.items) {
-    if (!wpsByMonth.has(item.month)) {
-      wpsByMonth.set(item.month, new Set());
-    }
-    const wpSet = wpsByMonth.get(item.month)!;
+// Products of one work package, by month then category
+export function getWorkPackageProducts(
+  wpNumber: number | "",
+): WorkPackageProduct[] {
+  if (typeof wpNumber !== "number") return [];
+  return data.workPackages[String(wpNumber)] ?? [];
+}
 
-    for (const entry of item.entries) {
-      for (const wp of entry.workPackages) {
-        wpSet.add(wp);
-      }
+// Entries with action numbers apply to those actions, the others (e.g.
+// official reports) to every action of the work package
+function actionProducts(
+  actionNumber: number,
+  wpNumber: number | "",
+): WorkPackageProduct[] {
+  return getWorkPackageProducts(wpNumber).filter(
+    (entry) =>
+      !entry.actions ||
+      entry.actions.length === 0 ||
+      entry.actions.includes(actionNumber),
+  );
+}
 
-      if (entry.actions && entry.actions.length > 0) {
-        for (const a of entry.actions) {
-          if (!monthsByAction.has(a)) monthsByAction.set(a, new Set());
-          monthsByAction.get(a)!.add(item.month);
-          if (!categoriesByAction.has(a))
-            categoriesByAction.set(a, new Set());
-          categoriesByAction.get(a)!.add(catKey);
-        }
-      } else {
-        // WP-level entry (e.g. official reports) — applies to all actions in these WPs
-        for (const wp of entry.workPackages) {
-          if (!monthsByWp.has(wp)) monthsByWp.set(wp, new Set());
-          monthsByWp.get(wp)!.add(item.month);
-          if (!categoriesByWp.has(wp)) categoriesByWp.set(wp, new Set());
-          categoriesByWp.get(wp)!.add(catKey);
-        }
-      }
-    }
+// month → unique WPs (for chart display)
+const wpsByMonth = new Map<string, Set<number>>();
+for (const [wp, entries] of Object.entries(data.workPackages)) {
+  for (const entry of entries) {
+    if (!wpsByMonth.has(entry.month)) wpsByMonth.set(entry.month, new Set());
+    wpsByMonth.get(entry.month)!.add(Number(wp));
   }
 }
 
 export function getProductMonths(): { month: string; count: number }[] {
-  const monthOrder = [
-    "May",
-    "June",
-    "July",
-    "August",
-    "September",
-    "October",
-    "November",
-    "December",
-    "Later or TBD",
-  ];
-  return monthOrder
+  return data.months
     .filter((m) => wpsByMonth.has(m))
     .map((m) => ({
       month: m,
@@ -104,22 +85,9 @@ export function actionMatchesProductMonths(
   selectedMonths: string[],
 ): boolean {
   if (selectedMonths.length === 0) return true;
-
-  // Check action-level match
-  const actionMonths = monthsByAction.get(actionNumber);
-  if (actionMonths) {
-    if (selectedMonths.some((m) => actionMonths.has(m))) return true;
-  }
-
-  // Check WP-level match (for entries without action numbers, like official reports)
-  if (typeof wpNumber === "number") {
-    const wpMonths = monthsByWp.get(wpNumber);
-    if (wpMonths) {
-      if (selectedMonths.some((m) => wpMonths.has(m))) return true;
-    }
-  }
-
-  return false;
+  return actionProducts(actionNumber, wpNumber).some((entry) =>
+    selectedMonths.includes(entry.month),
+  );
 }
 
 export function getProductCategories(): { key: string; label: string }[] {
@@ -135,15 +103,7 @@ export function actionMatchesProductCategories(
   selectedCategories: string[],
 ): boolean {
   if (selectedCategories.length === 0) return true;
-
-  const actionCats = categoriesByAction.get(actionNumber);
-  if (actionCats && selectedCategories.some((c) => actionCats.has(c)))
-    return true;
-
-  if (typeof wpNumber === "number") {
-    const wpCats = categoriesByWp.get(wpNumber);
-    if (wpCats && selectedCategories.some((c) => wpCats.has(c))) return true;
-  }
-
-  return false;
+  return actionProducts(actionNumber, wpNumber).some((entry) =>
+    selectedCategories.includes(entry.category),
+  );
 }
@@ -1,5 +1,7 @@
 import { clsx, type ClassValue } from "clsx";
 import { twMerge } from "tailwind-merge";
+// Shared with python/stats.py, so the facet keys in stats.json match these values
+import nameNormalization from "./nameNormalization.json";
 
 export function cn(...inputs: ClassValue[]) {
   return twMerge(clsx(inputs));
@@ -75,6 +77,22 @@ export const formatDateMonthYear = (date: Date): string => {
  * Text formatting utility functions
  */
 
+const LEADER_ALIASES: Record<string, string> =
+  nameNormalization.leaders.aliases;
+const TEAM_MEMBER_EXCLUDE = new Set<string>(
+  nameNormalization.teamMembers.exclude,
+);
+const TEAM_MEMBER_PREFIXES: Record<string, string> =
+  nameNormalization.teamMembers.prefixes;
+
+// "EOSG (ODSG)", "EOSG(USG Policy)", "EOSG SA", ... -> "EOSG"
+const normalizeTeamMemberPrefix = (trimmed: string): string => {
+  for (const [prefix, name] of Object.entries(TEAM_MEMBER_PREFIXES)) {
+    if (trimmed.startsWith(prefix)) return name;
+  }
+  return trimmed;
+};
+
 /**
  * Normalize leader names to standard format
  * Maps variations like "ASG UNITAR" to "ED UNITAR"
@@ -97,14 +115,8 @@ export const formatDateMonthYear = (date: Date): string => {
 export const normalizeTeamMemberForDisplay = (teamMember: string): string => {
   if (!teamMember || !teamMember.trim()) return teamMember;
 
-  const trimmed = teamMember.trim();
-
   // Normalize all EOSG variants (including "EOSG (xxx)") to "EOSG"
-  if (trimmed.startsWith("EOSG")) {
-    return "EOSG";
-  }
-
-  return trimmed;
+  return normalizeTeamMemberPrefix(teamMember.trim());
 };
 
 export const normalizeTeamMember = (teamMember: string): string | null => {
@@ -113,31 +125,11 @@ export const normalizeTeamMember = (teamMember: string): string | null => {
   const trimmed = teamMember.trim();
 
   // Exclude "SA Reform"
-  if (trimmed === "SA Reform") {
+  if (TEAM_MEMBER_EXCLUDE.has(trimmed)) {
     return null;
   }
 
-  // Normalize EOSG variants to "EOSG"
-  // Check for exact matches first, then check if it starts with "EOSG"
-  if (
-    trimmed === "EOSG (ODSG)" ||
-    trimmed === "EOSG(USG Policy)" ||
-    trimmed === "EOSG (USG Policy)" ||
-    trimmed === "EOSG (SA)" ||
-    trimmed === "EOSG ODSG" ||
-    trimmed === "EOSG USG Policy" ||
-    trimmed === "EOSG SA" ||
-    trimmed === "EOSG"
-  ) {
-    return "EOSG";
-  }
-
-  // If it starts with "EOSG" but isn't one of the known variants, still normalize to "EOSG"
-  if (trimmed.startsWith("EOSG")) {
-    return "EOSG";
-  }
-
-  return trimmed;
+  return normalizeTeamMemberPrefix(trimmed);
 };
 
 export const normalizeLeaderName = (leader: string): string => {
@@ -145,11 +137,7 @@ export const normalizeLeaderName = (leader: string): string => {
   const trimmed = leader.trim();
 
   // Normalize "ASG UNITAR" to "ED UNITAR"
-  if (trimmed === "ASG UNITAR") {
-    return "ED UNITAR";
-  }
-
-  return trimmed;
+  return LEADER_ALIASES[trimmed] ?? trimmed;
 };
 
 /**